@@ -5,12 +5,33 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The live event stream (/api/accounts/live/) is an async view and holds one
+coroutine per open connection, so serve it through this module with an ASGI
+server (e.g. ``uvicorn Athlete.asgi:application``) rather than through WSGI.
+
+Requests are resolved against settings.ASGI_URLCONF, which puts the async
+read views (accounts.async_views) in front of the regular routes. Set it to
+None to serve exactly the WSGI routes.
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Athlete.settings')
 
-application = get_asgi_application()
+
+class AthleteASGIHandler(ASGIHandler):
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        urlconf = getattr(settings, 'ASGI_URLCONF', None)
+        if request is not None and urlconf:
+            request.urlconf = urlconf
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+application = AthleteASGIHandler()
@@ -3,6 +3,7 @@ Django settings for Athlete project.
 Generated by 'django-admin startproject' using Django 5.2.8.
 """
 
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Must be at top
+    'accounts.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,6 +52,8 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'Athlete.urls'
+# Athlete.asgi serves this instead: the async read views, then ROOT_URLCONF
+ASGI_URLCONF = 'Athlete.urls_asgi'
 
 TEMPLATES = [
     {
@@ -79,9 +83,69 @@ DATABASES = {
         'PASSWORD': '12345678',
         'HOST': 'localhost',
         'PORT': '5432',
+        # Reuse connections across requests, checking them before reuse
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# -----------------------------
+# Database connection pool
+# -----------------------------
+# With psycopg 3 and psycopg_pool installed, connections come from a
+# per-process pool instead; Django does not allow CONN_MAX_AGE with a pool.
+# Size max_size to the worker's threads (WSGI) or to what the database can
+# give each ASGI process.
+DATABASE_POOL = {
+    'min_size': 2,
+    'max_size': 10,
+    'timeout': 10,  # seconds to wait for a free connection
+}
+
+try:
+    import psycopg  # noqa: F401
+    import psycopg_pool  # noqa: F401
+except ImportError:
+    psycopg_pool = None
+
+if psycopg_pool is not None and DATABASE_POOL:
+    # The pool owns connection lifetime: Django must close (return) each
+    # connection after the request, and the pool checks it before lending it
+    # out again in place of CONN_HEALTH_CHECKS
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].pop('CONN_HEALTH_CHECKS', None)
+    pool_check = getattr(psycopg_pool.ConnectionPool, 'check_connection', None)  # psycopg_pool >= 3.2
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {**DATABASE_POOL, 'check': pool_check} if pool_check else DATABASE_POOL,
+    }
+
+# -----------------------------
+# Cache
+# -----------------------------
+# The roster, stress map, cohort and injury analytics caches are invalidated
+# by writes, so every worker must share one cache. Redis when redis-py is
+# installed; otherwise a file cache, shared only by the processes of one host.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',
+        'KEY_PREFIX': 'athlete',
+    }
+}
+
+try:
+    import redis  # noqa: F401
+except ImportError:
+    redis = None
+
+if redis is None:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'athlete-cache',
+        'KEY_PREFIX': 'athlete',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    }
+
 # -----------------------------
 # Password validation
 # -----------------------------
@@ -131,10 +195,48 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
 }
 
+# -----------------------------
+# Authenticated user cache
+# -----------------------------
+ACCOUNTS_USER_CACHE = {
+    'TIMEOUT': 30,              # seconds a resolved user is trusted
+    'MAX_SIZE': 10000,          # users held per process
+    'USE_DJANGO_CACHE': False,  # share entries across processes via CACHES
+}
+
+# -----------------------------
+# Request metrics (/metrics)
+# -----------------------------
+ACCOUNTS_METRICS = {
+    'ENABLED': True,
+    'TOKEN': None,                  # let scrapers in with "Authorization: Bearer <token>"; else staff only
+    'SLOW_REQUEST_SECONDS': None,   # e.g. 0.5 to log the SQL of slower requests
+    'SLOW_REQUEST_MAX_QUERIES': 100,
+}
+
+# -----------------------------
+# Log archival (manage.py archive_logs)
+# -----------------------------
+ACCOUNTS_ARCHIVE = {
+    'HORIZON_DAYS': 365,  # workouts, metrics and nutrition older than this leave the hot tables
+    'BATCH_SIZE': 5000,   # rows moved per transaction
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'accounts': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 # -----------------------------
 # Simple JWT Settings
 # -----------------------------
@@ -17,7 +17,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from accounts.metrics import metrics_view
+from accounts.views import batch_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/accounts/', include('accounts.urls')),
+    path('api/batch/', batch_view, name='batch'),
+    path('metrics', metrics_view, name='metrics'),
 ]
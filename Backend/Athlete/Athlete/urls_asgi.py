@@ -0,0 +1,14 @@
+"""
+URL configuration used by Athlete.asgi (settings.ASGI_URLCONF).
+
+The async read views in accounts.async_urls come first; every other path
+falls through to the same routes WSGI serves.
+"""
+from django.urls import path, include
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/accounts/', include('accounts.async_urls')),
+    *sync_urlpatterns,
+]
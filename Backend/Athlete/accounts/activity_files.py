@@ -0,0 +1,282 @@
+"""
+Parsers for recorded activity files (GPX, TCX and CSV exports).
+
+This module only depends on the standard library and NumPy so it can run in
+import worker processes without Django being set up. Every parser returns a
+list of workout dicts with the WorkoutLog field names; calories are left
+as None when the file does not carry them.
+"""
+import csv
+import io
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+MAX_DISTANCE_KM = 9999.99
+MAX_ACTIVITY_TYPE_LENGTH = 100
+SUPPORTED_EXTENSIONS = ('.gpx', '.tcx', '.csv')
+
+SPORT_ALIASES = {
+    'run': 'running', 'running': 'running', 'trail_running': 'running', 'treadmill_running': 'running',
+    'ride': 'cycling', 'biking': 'cycling', 'cycling': 'cycling', 'road_biking': 'cycling',
+    'mountain_biking': 'cycling', 'virtualride': 'cycling', 'swim': 'swimming', 'swimming': 'swimming',
+    'walk': 'walking', 'walking': 'walking', 'hike': 'hiking', 'hiking': 'hiking',
+    'rowing': 'rowing', 'row': 'rowing', 'weighttraining': 'strength', 'weight_training': 'strength',
+    'strength_training': 'strength',
+    'yoga': 'yoga', 'workout': 'workout',
+}
+
+# CSV header (lower-cased) -> (field, unit converter)
+CSV_COLUMNS = {
+    'date': ('date', None), 'activity date': ('date', None), 'start time': ('date', None),
+    'start_time': ('date', None),
+    'activity_type': ('activity_type', None), 'activity type': ('activity_type', None),
+    'type': ('activity_type', None), 'sport': ('activity_type', None),
+    'duration_minutes': ('duration_minutes', 'minutes'), 'duration': ('duration_minutes', 'minutes'),
+    'duration (min)': ('duration_minutes', 'minutes'), 'elapsed time': ('duration_minutes', 'seconds'),
+    'moving time': ('duration_minutes', 'seconds'), 'duration_seconds': ('duration_minutes', 'seconds'),
+    'distance_km': ('distance_km', 'km'), 'distance': ('distance_km', 'km'),
+    'distance (km)': ('distance_km', 'km'), 'distance_m': ('distance_km', 'm'),
+    'distance (m)': ('distance_km', 'm'),
+    'calories': ('calories_burned', None), 'calories_burned': ('calories_burned', None),
+    'kcal': ('calories_burned', None),
+    'average_heart_rate': ('average_heart_rate', None), 'average heart rate': ('average_heart_rate', None),
+    'avg hr': ('average_heart_rate', None), 'avg_hr': ('average_heart_rate', None),
+    'max_heart_rate': ('max_heart_rate', None), 'max heart rate': ('max_heart_rate', None),
+    'max hr': ('max_heart_rate', None), 'max_hr': ('max_heart_rate', None),
+    'notes': ('notes', None), 'name': ('notes', None), 'activity name': ('notes', None),
+    'title': ('notes', None),
+}
+CSV_DATE_FORMATS = ('%b %d, %Y, %I:%M:%S %p', '%d/%m/%Y', '%m/%d/%Y %H:%M', '%d.%m.%Y')
+
+
+class ActivityFileError(ValueError):
+    pass
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def sport(value):
+    value = (value or '').strip().lower().replace(' ', '_')
+    if not value or value.isdigit():
+        return 'other'
+    return SPORT_ALIASES.get(value, value)[:MAX_ACTIVITY_TYPE_LENGTH]
+
+
+def parse_moment(value):
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        for fmt in CSV_DATE_FORMATS:
+            try:
+                moment = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def path_distance_km(latitudes, longitudes):
+    """Haversine length of a track, vectorized over consecutive points."""
+    if len(latitudes) < 2:
+        return 0.0
+    lat = np.radians(latitudes)
+    lon = np.radians(longitudes)
+    dlat = np.diff(lat)
+    dlon = np.diff(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+    return float(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0))).sum())
+
+
+def workout(moment, activity_type, seconds, distance_km=None, calories=None,
+            heart_rates=None, average_hr=None, max_hr=None, notes=''):
+    if moment is None:
+        raise ActivityFileError("Activity has no start time.")
+    if heart_rates is not None and len(heart_rates):
+        average_hr = average_hr or float(np.mean(heart_rates))
+        max_hr = max_hr or float(np.max(heart_rates))
+    return {
+        'date': moment.astimezone(timezone.utc).date(),
+        'activity_type': sport(activity_type),
+        'duration_minutes': max(1, round((seconds or 0) / 60)),
+        'distance_km': round(min(distance_km, MAX_DISTANCE_KM), 2) if distance_km else None,
+        'calories_burned': round(calories) if calories else None,
+        'average_heart_rate': round(average_hr) if average_hr else None,
+        'max_heart_rate': round(max_hr) if max_hr else None,
+        'notes': notes or '',
+    }
+
+
+def _text(element, path):
+    found = element.find(path)
+    return found.text.strip() if found is not None and found.text else None
+
+
+def _number(text):
+    try:
+        return float(text) if text not in (None, '') else None
+    except ValueError:
+        return None
+
+
+# -----------------------------
+# GPX
+# -----------------------------
+def _local(tag):
+    return tag[tag.rfind('}') + 1:]
+
+
+def parse_gpx(data):
+    root = ET.fromstring(data)
+    workouts = []
+    for track in root.iterfind('{*}trk'):
+        # One pass over the track; per-point find() calls dominate otherwise
+        latitudes, longitudes, times, heart_rates = [], [], [], []
+        activity_type = name = None
+        for element in track.iter():
+            tag = _local(element.tag)
+            if tag == 'trkpt':
+                latitudes.append(float(element.get('lat')))
+                longitudes.append(float(element.get('lon')))
+            elif tag == 'time':
+                times.append(element.text)
+            elif tag == 'hr':
+                heart_rates.append(float(element.text))
+            elif tag == 'type' and activity_type is None:
+                activity_type = element.text
+            elif tag == 'name' and name is None:
+                name = element.text
+        first = next((moment for moment in map(parse_moment, times) if moment), None)
+        last = next((moment for moment in map(parse_moment, reversed(times)) if moment), None)
+        if first is None:
+            continue
+        workouts.append(workout(
+            first, activity_type, (last - first).total_seconds(),
+            distance_km=path_distance_km(latitudes, longitudes),
+            heart_rates=heart_rates,
+            notes=(name or '').strip(),
+        ))
+    if not workouts:
+        raise ActivityFileError("GPX file has no timed track points.")
+    return workouts
+
+
+# -----------------------------
+# TCX
+# -----------------------------
+def parse_tcx(data):
+    root = ET.fromstring(data)
+    workouts = []
+    for activity in root.iterfind('.//{*}Activity'):
+        laps = activity.findall('{*}Lap')
+        seconds = sum(_number(_text(lap, '{*}TotalTimeSeconds')) or 0 for lap in laps)
+        meters = sum(_number(_text(lap, '{*}DistanceMeters')) or 0 for lap in laps)
+        calories = sum(_number(_text(lap, '{*}Calories')) or 0 for lap in laps)
+        heart_rates = [
+            value for value in (
+                _number(element.text) for element in activity.iterfind('.//{*}Trackpoint/{*}HeartRateBpm/{*}Value')
+            ) if value
+        ]
+        lap_max = [_number(_text(lap, '{*}MaximumHeartRateBpm/{*}Value')) for lap in laps]
+        lap_max = [value for value in lap_max if value]
+        workouts.append(workout(
+            parse_moment(_text(activity, '{*}Id') or (laps[0].get('StartTime') if laps else None)),
+            activity.get('Sport'),
+            seconds,
+            distance_km=meters / 1000 if meters else None,
+            calories=calories or None,
+            heart_rates=heart_rates,
+            max_hr=max(lap_max) if lap_max else None,
+            notes=_text(activity, '{*}Notes'),
+        ))
+    if not workouts:
+        raise ActivityFileError("TCX file has no activities.")
+    return workouts
+
+
+# -----------------------------
+# CSV
+# -----------------------------
+def _csv_duration_seconds(value, unit):
+    value = (value or '').strip()
+    if not value:
+        return None
+    if ':' in value:
+        seconds = 0
+        for part in value.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    number = float(value)
+    return number * 60 if unit == 'minutes' else number
+
+
+def parse_csv(data):
+    text = data.decode('utf-8-sig') if isinstance(data, bytes) else data
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if not header:
+        raise ActivityFileError("CSV file is empty.")
+
+    # First matching column wins, so duplicated export headers are ignored
+    columns = {}
+    for index, name in enumerate(header):
+        field = CSV_COLUMNS.get(name.strip().lower())
+        if field and field[0] not in columns:
+            columns[field[0]] = (index, field[1])
+    if 'date' not in columns or 'duration_minutes' not in columns:
+        raise ActivityFileError("CSV needs at least a date and a duration column.")
+
+    def cell(row, field):
+        index, unit = columns.get(field, (None, None))
+        return (row[index] if index is not None and index < len(row) else None), unit
+
+    workouts = []
+    for line, row in enumerate(reader, start=2):
+        if not any(row):
+            continue
+        try:
+            seconds = _csv_duration_seconds(*cell(row, 'duration_minutes'))
+            distance, unit = cell(row, 'distance_km')
+            distance = _number(distance)
+            if distance is not None and unit == 'm':
+                distance /= 1000
+            workouts.append(workout(
+                parse_moment(cell(row, 'date')[0]),
+                cell(row, 'activity_type')[0],
+                seconds,
+                distance_km=distance,
+                calories=_number(cell(row, 'calories_burned')[0]),
+                average_hr=_number(cell(row, 'average_heart_rate')[0]),
+                max_hr=_number(cell(row, 'max_heart_rate')[0]),
+                notes=cell(row, 'notes')[0],
+            ))
+        except (ActivityFileError, ValueError) as exc:
+            raise ActivityFileError(f"Line {line}: {exc}") from exc
+    return workouts
+
+
+PARSERS = {
+    '.gpx': parse_gpx,
+    '.tcx': parse_tcx,
+    '.csv': parse_csv,
+}
+
+
+def parse_file(name, data):
+    """(name, workouts, error); runs in worker processes, so it never raises."""
+    extension = name[name.rfind('.'):].lower() if '.' in name else ''
+    parser = PARSERS.get(extension)
+    if parser is None:
+        return name, [], f"Unsupported file type '{extension or name}'."
+    try:
+        return name, parser(data), None
+    except (ActivityFileError, ET.ParseError, ValueError, UnicodeDecodeError) as exc:
+        return name, [], str(exc) or exc.__class__.__name__
@@ -1,6 +1,84 @@
+import json
+from datetime import date
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import CustomUser, Onboarding
+from django.core.paginator import Paginator
+from django.db import connections, models
+from django.utils.functional import cached_property
+
+from .models import CustomUser, HealthMetric, InjuryReport, NutritionLog, Onboarding, WorkoutLog
+
+# Below this many rows an exact COUNT(*) is cheap enough
+ESTIMATED_COUNT_THRESHOLD = 100_000
+
+
+# -----------------------------
+# Large Table Helpers
+# -----------------------------
+class EstimatedCountPaginator(Paginator):
+    """
+    On PostgreSQL, reports the planner's row estimate for the changelist
+    instead of running COUNT(*) over millions of rows. Small results are
+    still counted exactly.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            estimate = (json.loads(plan) if isinstance(plan, str) else plan)[0]['Plan']['Plan Rows']
+            if estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return int(estimate)
+        return super().count
+
+
+class DateHierarchyQuerySet(models.QuerySet):
+    """
+    Lists the date hierarchy's years from MIN/MAX of the date column (two
+    index lookups) instead of a DISTINCT over every row. Years with no rows
+    in between are listed too.
+    """
+    def dates(self, field_name, kind, order='ASC'):
+        if kind != 'year':
+            return super().dates(field_name, kind, order)
+        bounds = self.aggregate(first=models.Min(field_name), last=models.Max(field_name))
+        if bounds['first'] is None:
+            return []
+        years = [date(year, 1, 1) for year in range(bounds['first'].year, bounds['last'].year + 1)]
+        return years if order == 'ASC' else years[::-1]
+
+
+class LogAdmin(admin.ModelAdmin):
+    """
+    Changelists for the log tables. Every query uses an index: the default
+    ordering and date hierarchy use the (date, id) index, filters have their
+    own (field, date, id) index, and search looks up one user by email. The
+    list is paginated without COUNT(*) over the whole table.
+    """
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    search_fields = ('user__email',)
+    search_help_text = "Exact athlete email."
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    readonly_fields = ('client_id', 'sync_seq', 'created_at', 'updated_at')
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return DateHierarchyQuerySet(queryset.model, query=queryset.query, using=queryset.db)
+
+    def get_search_results(self, request, queryset, search_term):
+        # A case-sensitive match, so PostgreSQL can use the unique email index (iexact cannot)
+        email = search_term.strip()
+        if not email:
+            return queryset, False
+        return queryset.filter(user__email=email), False
 
 # -----------------------------
 # CustomUser Admin
@@ -28,11 +106,45 @@ class CustomUserAdmin(BaseUserAdmin):
 # -----------------------------
 class OnboardingAdmin(admin.ModelAdmin):
     list_display = ('user', 'age', 'gender', 'activity_level', 'primary_goals')
-    search_fields = ('user__email', 'user__full_name', 'primary_goals')
-    list_filter = ('gender', 'activity_level', 'region')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    search_fields = ('=user__email', 'user__full_name')
+    list_filter = ('gender', 'activity_level')
+
+# -----------------------------
+# Log Admins
+# -----------------------------
+class WorkoutLogAdmin(LogAdmin):
+    list_display = ('date', 'user', 'activity_type', 'duration_minutes', 'distance_km', 'calories_burned')
+    date_hierarchy = 'date'
+    ordering = ('-date', '-id')
+
+
+class HealthMetricAdmin(LogAdmin):
+    list_display = ('date_recorded', 'user', 'metric_type', 'value', 'unit', 'source')
+    list_filter = ('metric_type',)
+    date_hierarchy = 'date_recorded'
+    ordering = ('-date_recorded', '-id')
+
+
+class NutritionLogAdmin(LogAdmin):
+    list_display = ('date', 'user', 'meal_type', 'calories', 'protein_g', 'carbs_g', 'fats_g')
+    date_hierarchy = 'date'
+    ordering = ('-date', '-id')
+
+
+class InjuryReportAdmin(LogAdmin):
+    list_display = ('date_occurred', 'user', 'injury_type', 'severity', 'recovery_status', 'medical_attention')
+    list_filter = ('severity',)
+    date_hierarchy = 'date_occurred'
+    ordering = ('-date_occurred', '-id')
 
 # -----------------------------
 # Register models
 # -----------------------------
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Onboarding, OnboardingAdmin)
+admin.site.register(WorkoutLog, WorkoutLogAdmin)
+admin.site.register(HealthMetric, HealthMetricAdmin)
+admin.site.register(NutritionLog, NutritionLogAdmin)
+admin.site.register(InjuryReport, InjuryReportAdmin)
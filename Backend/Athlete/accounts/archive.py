@@ -0,0 +1,293 @@
+"""
+Archival of old log rows into packed per-user monthly chunks.
+
+Workout, health metric and nutrition rows dated before the horizon
+(ACCOUNTS_ARCHIVE['HORIZON_DAYS'] ago) move into ArchivedLogChunk: one row
+per user, resource and month that holds each column as a JSON array,
+zlib-compressed. The hot tables then hold about one horizon of rows however
+old the platform gets. Archived rows keep their ids and stay readable:
+list pages continue into the archive once a user's hot rows run out, and
+exports merge both.
+
+Rows leave the hot tables inside moving(), and the log signal receivers
+ignore deletes made there. Clients see no change and no tombstone is
+written. Rollups, admin counters and food statistics keep counting the
+rows; a late write into an archived day recomputes its rollup from both
+the hot and the archived rows (see rows_on). The detail, batch and sync
+endpoints only see hot rows. A row written with a date older than the
+horizon sorts into its archived neighbours on the next archival run.
+"""
+import json
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ArchivedLogChunk, CustomUser, FoodItem, HealthMetric, NutritionLog, WorkoutLog
+
+ARCHIVE_DEFAULTS = {
+    'HORIZON_DAYS': 365,   # rows dated before this many days ago are archived
+    'BATCH_SIZE': 5000,    # rows moved per transaction
+}
+COMPRESSION_LEVEL = 6
+# Months fetched per round trip while reading; a list page rarely needs more than one
+READ_CHUNK_SIZE = 4
+_moving = ContextVar('accounts_archive_moving', default=False)
+
+# resource -> (model, date field)
+RESOURCES = {
+    'workouts': (WorkoutLog, 'date'),
+    'health-metrics': (HealthMetric, 'date_recorded'),
+    'nutrition': (NutritionLog, 'date'),
+}
+
+
+def config():
+    return {**ARCHIVE_DEFAULTS, **getattr(settings, 'ACCOUNTS_ARCHIVE', {})}
+
+
+def cutoff(horizon_days=None):
+    """Rows dated before this are archived."""
+    return timezone.localdate() - timedelta(days=horizon_days or config()['HORIZON_DAYS'])
+
+
+def attnames(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+# -----------------------------
+# Packing
+# -----------------------------
+def _encode(value):
+    # Unlike DjangoJSONEncoder, keeps microseconds; field.to_python() reads every form back
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f"Cannot archive {type(value).__name__} values")
+
+
+def pack(model, rows):
+    """(columns, data) for row tuples in attnames(model) order."""
+    arrays = [list(column) for column in zip(*rows)]
+    payload = json.dumps(arrays, default=_encode, separators=(',', ':')).encode()
+    return attnames(model), zlib.compress(payload, COMPRESSION_LEVEL)
+
+
+def unpack(model, columns, data, row_count):
+    """
+    Row tuples in attnames(model) order with Python values. Columns added to
+    the model after a chunk was packed take their default.
+    """
+    arrays = dict(zip(columns, json.loads(zlib.decompress(bytes(data)))))
+    values = []
+    for field in model._meta.concrete_fields:
+        if field.attname in arrays:
+            values.append([None if value is None else field.to_python(value) for value in arrays[field.attname]])
+        else:
+            values.append([field.get_default()] * row_count)
+    return list(zip(*values))
+
+
+# -----------------------------
+# Archiving
+# -----------------------------
+@contextmanager
+def moving():
+    """Deletes in this block move rows into the archive; see is_moving()."""
+    token = _moving.set(True)
+    try:
+        yield
+    finally:
+        _moving.reset(token)
+
+
+def is_moving():
+    """True inside moving(): the rows deleted still exist for clients, so signal receivers skip them."""
+    return _moving.get()
+
+
+def archive_user(user_id, resource, before, batch_size=None):
+    """Move the user's rows of `resource` dated before `before` into the archive; returns the rows moved."""
+    batch_size = batch_size or config()['BATCH_SIZE']
+    moved = 0
+    while True:
+        count = _archive_batch(user_id, resource, before, batch_size)
+        moved += count
+        if count < batch_size:
+            return moved
+
+
+def _archive_batch(user_id, resource, before, batch_size):
+    model, date_field = RESOURCES[resource]
+    names = attnames(model)
+    date_index, id_index = names.index(date_field), names.index('id')
+
+    with transaction.atomic():
+        rows = list(
+            model.objects.filter(user_id=user_id, **{f'{date_field}__lt': before})
+            .order_by(date_field, 'id').select_for_update().values_list(*names)[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        by_month = defaultdict(list)
+        for row in rows:
+            by_month[row[date_index].replace(day=1)].append(row)
+        existing = {
+            chunk.month: chunk
+            for chunk in ArchivedLogChunk.objects.select_for_update().filter(
+                user_id=user_id, resource=resource, month__in=list(by_month),
+            )
+        }
+        for month, month_rows in by_month.items():
+            chunk = existing.get(month) or ArchivedLogChunk(user_id=user_id, resource=resource, month=month)
+            if chunk.pk:
+                month_rows = sorted(
+                    unpack(model, chunk.columns, chunk.data, chunk.row_count) + month_rows,
+                    key=lambda row: (row[date_index], row[id_index]),
+                )
+            chunk.columns, chunk.data = pack(model, month_rows)
+            chunk.first_date, chunk.last_date = month_rows[0][date_index], month_rows[-1][date_index]
+            chunk.row_count = len(month_rows)
+            chunk.save()
+
+        ids = [row[id_index] for row in rows]
+        if model is NutritionLog:
+            FoodItem.objects.filter(nutrition_log_id__in=ids).update(nutrition_log=None)
+        with moving():
+            model.objects.filter(pk__in=ids).delete()
+    return len(rows)
+
+
+def archive(resources=None, before=None, after_user=0, batch_size=None, progress=None):
+    """
+    Archive every user's old rows, in user id order. Users are independent, so
+    a run stopped part way resumes with `after_user` set to the last id it
+    reported. `progress`, if given, is called as progress(user_id, moved).
+    """
+    resources = resources or list(RESOURCES)
+    before = before or cutoff()
+    moved = dict.fromkeys(resources, 0)
+    user_ids = list(CustomUser.objects.filter(pk__gt=after_user).order_by('pk').values_list('pk', flat=True))
+    for user_id in user_ids:
+        for resource in resources:
+            moved[resource] += archive_user(user_id, resource, before, batch_size)
+        if progress:
+            progress(user_id, moved)
+    return moved
+
+
+def archived_through(user_id, resources):
+    """The newest archived date across `resources` for the user, or None."""
+    return ArchivedLogChunk.objects.filter(user_id=user_id, resource__in=resources).aggregate(
+        latest=Max('last_date')
+    )['latest']
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def rows_on(user_id, dates, fields):
+    """
+    {resource: [tuples of fields[resource]]} for the user's archived rows
+    dated on any of `dates`, read in one query.
+    """
+    dates = set(dates)
+    found = {resource: [] for resource in fields}
+    chunks = ArchivedLogChunk.objects.filter(
+        user_id=user_id, resource__in=list(fields), month__in={day.replace(day=1) for day in dates},
+    ).only('resource', 'columns', 'data', 'row_count')
+    for chunk in chunks:
+        model, date_field = RESOURCES[chunk.resource]
+        names = attnames(model)
+        picks = [names.index(field) for field in fields[chunk.resource]]
+        date_index = names.index(date_field)
+        found[chunk.resource].extend(
+            tuple(row[index] for index in picks)
+            for row in unpack(model, chunk.columns, chunk.data, chunk.row_count)
+            if row[date_index] in dates
+        )
+    return found
+
+
+def _chunks(user_id, resource, position, start, end):
+    queryset = ArchivedLogChunk.objects.filter(user_id=user_id, resource=resource)
+    if position:
+        queryset = queryset.filter(month__lte=position[0])
+    if start:
+        queryset = queryset.filter(last_date__gte=start)
+    if end:
+        queryset = queryset.filter(first_date__lte=end)
+    return queryset.order_by('-month').only('columns', 'data', 'row_count')
+
+
+def _newest_first(model, date_field, chunk, position, start, end):
+    names = attnames(model)
+    date_index, id_index = names.index(date_field), names.index('id')
+    instances = []
+    for row in reversed(unpack(model, chunk.columns, chunk.data, chunk.row_count)):
+        day = row[date_index]
+        if (position and (day, row[id_index]) >= position) or (start and day < start) or (end and day > end):
+            continue
+        instances.append(model.from_db(DEFAULT_DB_ALIAS, names, row))
+    return instances
+
+
+def page(user_id, resource, position=None, start=None, end=None, limit=50):
+    """
+    Up to `limit` archived rows as model instances, newest
+    first by (date, id), strictly before the keyset `position` and within
+    the inclusive date bounds.
+    """
+    model, date_field = RESOURCES[resource]
+    found = []
+    for chunk in _chunks(user_id, resource, position, start, end).iterator(chunk_size=READ_CHUNK_SIZE):
+        found.extend(_newest_first(model, date_field, chunk, position, start, end))
+        if len(found) >= limit:
+            break
+    return found[:limit]
+
+
+async def apage(user_id, resource, position=None, start=None, end=None, limit=50):
+    """page() for async views."""
+    model, date_field = RESOURCES[resource]
+    found = []
+    async for chunk in _chunks(user_id, resource, position, start, end).aiterator(chunk_size=READ_CHUNK_SIZE):
+        found.extend(_newest_first(model, date_field, chunk, position, start, end))
+        if len(found) >= limit:
+            break
+    return found[:limit]
+
+
+def export_rows(resource, users, fields, start=None, end=None):
+    """
+    (user_id, email, *fields) tuples of the archived rows of `users`, ordered
+    by (user, date, id) like accounts.export.rows.
+    """
+    model, date_field = RESOURCES[resource]
+    names = attnames(model)
+    picks = [names.index(field) for field in fields]
+    date_index = names.index(date_field)
+    chunks = ArchivedLogChunk.objects.filter(user__in=users.values('pk'), resource=resource)
+    if start:
+        chunks = chunks.filter(last_date__gte=start)
+    if end:
+        chunks = chunks.filter(first_date__lte=end)
+    chunks = chunks.order_by('user_id', 'month').values_list(
+        'user_id', 'user__email', 'columns', 'data', 'row_count'
+    )
+    for user_id, email, columns, data, row_count in chunks.iterator(chunk_size=READ_CHUNK_SIZE * 4):
+        for row in unpack(model, columns, data, row_count):
+            day = row[date_index]
+            if (start and day < start) or (end and day > end):
+                continue
+            yield (user_id, email, *(row[index] for index in picks))
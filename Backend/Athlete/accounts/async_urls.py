@@ -0,0 +1,13 @@
+from django.urls import path
+from . import async_views
+
+# Mounted ahead of accounts.urls by Athlete.urls_asgi; names match the sync routes
+urlpatterns = [
+    path('me/', async_views.current_user_view, name='current_user'),
+    path('dashboard/', async_views.athlete_dashboard_view, name='athlete_dashboard'),
+    path('coach/roster/', async_views.coach_roster_view, name='coach_roster'),
+    path('workouts/', async_views.workout_list_view, name='workout_list'),
+    path('health-metrics/', async_views.health_metric_list_view, name='health_metric_list'),
+    path('nutrition/', async_views.nutrition_list_view, name='nutrition_list'),
+    path('injuries/', async_views.injury_list_view, name='injury_list'),
+]
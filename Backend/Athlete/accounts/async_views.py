@@ -0,0 +1,153 @@
+"""
+Async versions of the hot read endpoints, served under ASGI.
+
+Athlete.asgi routes these paths through accounts.async_urls. GETs run here
+on the async ORM; every other method is handed to the DRF view in
+accounts.views, so writes behave exactly as before. Under ASGI a sync view
+holds Django's one thread-sensitive executor thread for its whole run
+(authentication, serialization, rendering); these views only hop to it for
+the queries themselves. Payloads, ETags, query counts and errors match the
+sync views.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from . import forecasts, rollups, roster, versions, views
+from .authentication import CachedJWTAuthentication
+from .filters import filter_date_range
+from .models import TrainingForecast
+
+READ_METHODS = ('GET', 'HEAD')
+
+authenticator = CachedJWTAuthentication()
+renderer = JSONRenderer()
+
+
+# -----------------------------
+# Responses
+# -----------------------------
+def _render(data, status_code=status.HTTP_200_OK, headers=None):
+    response = HttpResponse(
+        renderer.render(data), content_type=renderer.media_type, status=status_code, headers=headers,
+    )
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def _error(request, exc):
+    data = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+    headers = None
+    if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+        headers = {'WWW-Authenticate': authenticator.authenticate_header(request)}
+    return _render(data, exc.status_code, headers)
+
+
+async def _conditional(request, tag, respond):
+    """versions.conditional for async views; respond() is awaited only when the ETag does not match."""
+    etag = versions.make_etag(request, tag, renderer.format)
+    if versions.matches(request, etag):
+        response = HttpResponseNotModified(headers={'ETag': etag})
+    else:
+        response = _render(await respond())
+        response['ETag'] = etag
+    # Representations are per user, so shared caches must key on the token
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def reads(sync_view):
+    """
+    Serve GET and HEAD with the decorated coroutine, called as
+    handler(request, user, ...) once the token is checked, and every other
+    method with `sync_view`.
+    """
+    delegate = sync_to_async(sync_view)
+
+    def decorator(handler):
+        @csrf_exempt
+        async def view(request, *args, **kwargs):
+            if request.method not in READ_METHODS:
+                return await delegate(request, *args, **kwargs)
+            try:
+                authenticated = await authenticator.aauthenticate(request)
+                if authenticated is None:
+                    raise NotAuthenticated()
+                return await handler(request, authenticated[0], *args, **kwargs)
+            except APIException as exc:
+                return _error(request, exc)
+        return view
+    return decorator
+
+
+# -----------------------------
+# Current User View
+# -----------------------------
+@reads(views.current_user_view)
+async def current_user_view(request, user):
+    payload = {
+        'id': user.id,
+        'email': user.email,
+        'name': user.full_name,
+        'role': user.role,
+        'is_superuser': user.is_superuser
+    }
+
+    async def respond():
+        return payload
+
+    return await _conditional(request, versions.content_tag(f'me-{user.id}', tuple(payload.values())), respond)
+
+
+# -----------------------------
+# Log List Views
+# -----------------------------
+def log_list_view(view_class):
+    """Async GET for a log list view, using its serializer, pagination, date field and version resource."""
+    serializer_class = view_class.serializer_class
+    model = serializer_class.Meta.model
+
+    @reads(view_class.as_view())
+    async def view(request, user):
+        async def respond():
+            api_request = Request(request)
+            api_request.user = user
+            queryset = filter_date_range(model.objects.filter(user=user), api_request, view_class.date_field)
+            paginator = view_class.pagination_class()
+            rows = await paginator.apaginate_queryset(queryset, api_request, view_class)
+            data = serializer_class(rows, many=True, context={'request': api_request}).data
+            return paginator.get_paginated_response(data).data
+
+        return await _conditional(request, await versions.aresource_tag(user.pk, view_class.version_resource), respond)
+    return view
+
+
+workout_list_view = log_list_view(views.WorkoutLogListCreateView)
+health_metric_list_view = log_list_view(views.HealthMetricListCreateView)
+nutrition_list_view = log_list_view(views.NutritionLogListCreateView)
+injury_list_view = log_list_view(views.InjuryReportListCreateView)
+
+
+# -----------------------------
+# Athlete Dashboard View
+# -----------------------------
+@reads(views.athlete_dashboard_view)
+async def athlete_dashboard_view(request, user):
+    today = timezone.localdate()
+    rows = [row async for row in rollups.dashboard_rows(user, today)]
+    forecast = await TrainingForecast.objects.filter(user=user).afirst()
+    return _render({**rollups.dashboard(rows, today), 'forecast': forecasts.payload(forecast)})
+
+
+# -----------------------------
+# Coach Roster View
+# -----------------------------
+@reads(views.coach_roster_view)
+async def coach_roster_view(request, user):
+    return _render(await roster.aroster_rows(roster.athletes_for(user)))
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import CustomUser
+
+USER_CACHE_DEFAULTS = {
+    'TIMEOUT': 30,              # seconds a resolved user is trusted
+    'MAX_SIZE': 10000,          # users held per process
+    'USE_DJANGO_CACHE': False,  # also share entries through django.core.cache
+}
+DJANGO_CACHE_PREFIX = 'auth:user:'
+
+
+def _config():
+    return {**USER_CACHE_DEFAULTS, **getattr(settings, 'ACCOUNTS_USER_CACHE', {})}
+
+
+# -----------------------------
+# User Cache
+# -----------------------------
+class UserCache:
+    """
+    Size-bounded, short-TTL cache of CustomUser column values keyed by str(pk).
+
+    Only column values are cached; every hit builds a fresh instance, so
+    per-request state (cached relations, attributes set by views) never
+    leaks between requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.field_names = [field.attname for field in CustomUser._meta.concrete_fields]
+
+    def _from_values(self, values):
+        return CustomUser.from_db(DEFAULT_DB_ALIAS, self.field_names, values)
+
+    def get(self, user_id):
+        config = _config()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                expires, values = entry
+                if expires > now:
+                    self._entries.move_to_end(user_id)
+                    return self._from_values(values)
+                del self._entries[user_id]
+
+        if config['USE_DJANGO_CACHE']:
+            values = cache.get(f'{DJANGO_CACHE_PREFIX}{user_id}')
+            if values is not None:
+                self._store(user_id, values, config)
+                return self._from_values(values)
+        return None
+
+    def _store(self, user_id, values, config):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + config['TIMEOUT'], values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > config['MAX_SIZE']:
+                self._entries.popitem(last=False)
+
+    def set(self, user):
+        config = _config()
+        values = tuple(getattr(user, name) for name in self.field_names)
+        self._store(str(user.pk), values, config)
+        if config['USE_DJANGO_CACHE']:
+            cache.set(f'{DJANGO_CACHE_PREFIX}{user.pk}', values, config['TIMEOUT'])
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+        if _config()['USE_DJANGO_CACHE']:
+            cache.delete(f'{DJANGO_CACHE_PREFIX}{user_id}')
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+# -----------------------------
+# Cached JWT Authentication
+# -----------------------------
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the token's user from user_cache when it can."""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(str(user_id)) if user_id is not None else None
+        if user is None:
+            # Cache misses take the stock path, including its not-found and claim errors
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+            return user
+        return self.check_user(user, validated_token)
+
+    def check_user(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+    async def aget_user(self, validated_token):
+        """get_user for async views: cache misses use the async ORM."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from exc
+        user = user_cache.get(str(user_id))
+        if user is None:
+            try:
+                user = await CustomUser.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except CustomUser.DoesNotExist as exc:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from exc
+            self.check_user(user, validated_token)
+            user_cache.set(user)
+            return user
+        return self.check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        """authenticate() for async views; token parsing and validation need no I/O."""
+        header = self.get_header(request)
+        raw_token = self.get_raw_token(header) if header is not None else None
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
@@ -0,0 +1,142 @@
+"""
+Several log writes in one request.
+
+A batch is a list of create / update / delete operations on the caller's
+workouts, health metrics, nutrition and injury logs, validated by the same
+serializers as the single-row endpoints. Everything runs in one transaction
+after one authentication. In atomic mode the first failure rolls the whole
+batch back; otherwise each operation runs in its own savepoint and only the
+failing ones are undone.
+
+Operations may carry the sync_seq the client last saw; an update or delete
+of a row that changed since then is refused with 409 and the current row,
+and a create repeating a known client_id returns the existing row, so
+offline clients can retry uploads safely.
+"""
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from .models import HealthMetric, InjuryReport, NutritionLog, Tombstone, WorkoutLog
+from .serializers import HealthMetricSerializer, InjuryReportSerializer, NutritionLogSerializer, WorkoutLogSerializer
+
+MAX_OPERATIONS = 100
+METHODS = ('create', 'update', 'delete')
+RESOURCES = {
+    'workouts': (WorkoutLog, WorkoutLogSerializer),
+    'health-metrics': (HealthMetric, HealthMetricSerializer),
+    'nutrition': (NutritionLog, NutritionLogSerializer),
+    'injuries': (InjuryReport, InjuryReportSerializer),
+}
+
+
+class OperationFailed(Exception):
+    def __init__(self, status_code, body):
+        super().__init__(status_code)
+        self.status_code = status_code
+        self.body = body
+
+
+def parse(payload):
+    """(operations, atomic) from the request body, or a ValidationError."""
+    if not isinstance(payload, dict):
+        raise ValidationError({"operations": ["Expected an object with an 'operations' list."]})
+    operations = payload.get('operations')
+    if not isinstance(operations, list) or not operations:
+        raise ValidationError({"operations": ["Expected a non-empty list of operations."]})
+    if len(operations) > MAX_OPERATIONS:
+        raise ValidationError({"operations": [f"At most {MAX_OPERATIONS} operations per batch."]})
+    atomic = payload.get('atomic', True)
+    if not isinstance(atomic, bool):
+        raise ValidationError({"atomic": ["Expected true or false."]})
+    return operations, atomic
+
+
+def _retried_create(model, user, serializer):
+    """The row a create already made, when a known client_id is all that failed validation."""
+    errors = serializer.errors
+    if list(errors) != ['client_id'] or errors['client_id'][0].code != 'unique':
+        return None
+    return model.objects.filter(user=user, client_id=serializer.initial_data['client_id']).first()
+
+
+def _run(user, operation, context):
+    if not isinstance(operation, dict):
+        raise OperationFailed(status.HTTP_400_BAD_REQUEST, {'detail': "Expected an object."})
+    method, resource = operation.get('method'), operation.get('resource')
+    if method not in METHODS:
+        raise OperationFailed(status.HTTP_400_BAD_REQUEST, {'method': [f"Expected one of {', '.join(METHODS)}."]})
+    if resource not in RESOURCES:
+        raise OperationFailed(
+            status.HTTP_400_BAD_REQUEST, {'resource': [f"Expected one of {', '.join(RESOURCES)}."]}
+        )
+    model, serializer_class = RESOURCES[resource]
+    data = operation.get('data') or {}
+
+    if method == 'create':
+        serializer = serializer_class(data=data, context=context)
+        if not serializer.is_valid():
+            existing = _retried_create(model, user, serializer)
+            if existing is None:
+                raise OperationFailed(status.HTTP_400_BAD_REQUEST, serializer.errors)
+            # A retried upload: the row was created the first time
+            return status.HTTP_200_OK, serializer_class(existing, context=context).data
+        serializer.save(user=user)
+        return status.HTTP_201_CREATED, serializer.data
+
+    pk = operation.get('id')
+    instance = model.objects.filter(user=user, pk=pk).first() if isinstance(pk, int) else None
+    if instance is None:
+        if method == 'delete' and Tombstone.objects.filter(user=user, resource=resource, object_id=pk).exists():
+            return status.HTTP_204_NO_CONTENT, None
+        raise OperationFailed(status.HTTP_404_NOT_FOUND, {'detail': "Not found."})
+    seen = operation.get('sync_seq')
+    if seen is not None and seen != instance.sync_seq:
+        raise OperationFailed(status.HTTP_409_CONFLICT, {
+            'detail': f"Changed on the server since sync_seq {seen}.",
+            'current': serializer_class(instance, context=context).data,
+        })
+    if method == 'delete':
+        instance.delete()
+        return status.HTTP_204_NO_CONTENT, None
+
+    # Updates are partial, like PATCH on the detail endpoints
+    serializer = serializer_class(instance, data=data, partial=True, context=context)
+    if not serializer.is_valid():
+        raise OperationFailed(status.HTTP_400_BAD_REQUEST, serializer.errors)
+    serializer.save()
+    return status.HTTP_200_OK, serializer.data
+
+
+def _attempt(user, operation, context):
+    """Run one operation in a savepoint; returns (status, body) either way."""
+    try:
+        with transaction.atomic():
+            return _run(user, operation, context)
+    except OperationFailed as failure:
+        return failure.status_code, failure.body
+    except IntegrityError:
+        return status.HTTP_409_CONFLICT, {'detail': "Conflicts with an existing record."}
+
+
+def execute(user, operations, atomic=True, context=None):
+    """
+    Run `operations` for `user`; returns (committed, results) with one
+    {"index", "status", "data"|"errors"} result per operation.
+    """
+    results = []
+    with transaction.atomic():
+        for index, operation in enumerate(operations):
+            status_code, body = _attempt(user, operation, context or {})
+            failed = status_code >= 400
+            results.append({'index': index, 'status': status_code, 'errors' if failed else 'data': body})
+            if failed and atomic:
+                transaction.set_rollback(True)
+                for skipped in range(index + 1, len(operations)):
+                    results.append({
+                        'index': skipped,
+                        'status': status.HTTP_424_FAILED_DEPENDENCY,
+                        'errors': {'detail': f"Not run: operation {index} failed."},
+                    })
+                return False, results
+    return True, results
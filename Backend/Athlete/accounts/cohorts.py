@@ -0,0 +1,336 @@
+"""
+Similar-athlete search and cohort clustering over Onboarding profiles.
+
+Every active athlete's profile is encoded as a fixed-width, L2-normalized
+float32 vector, so cosine similarity against the whole population is one
+matrix-vector product. Free-form list values (sports, goals, food types)
+and the region are hashed into fixed buckets, which keeps the width stable
+as new values appear; ordered choices become scalars in [-1, 1].
+
+`index` holds the matrix for this process and grows in place. Onboarding
+and user changes append the user id to a short changelog in the shared
+cache (settings.CACHES), which every worker reads; before answering, the
+index replays the entries it has not seen (re-encoding just those users)
+and rebuilds only when it fell more than MAX_REPLAY changes behind, the
+changelog expired, or after REBUILD_SECONDS.
+"""
+import hashlib
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+from django.core.cache import cache
+
+from .models import Onboarding
+
+HASHED_FIELDS = {'sports_activities': 24, 'primary_goals': 12, 'food_types': 12, 'region': 16}
+ORDERED_FIELDS = {
+    'activity_level': ['sedentary', 'moderate', 'active', 'very-active'],
+    'experience_level': ['beginner', 'intermediate', 'advanced'],
+    'timeline': ['short-term', 'medium-term', 'long-term'],
+}
+GENDERS = ['male', 'female', 'other', 'prefer-not-to-say']
+FEATURE_WEIGHTS = {
+    'sports_activities': 1.5, 'primary_goals': 1.0, 'food_types': 0.5, 'region': 0.5,
+    'activity_level': 1.0, 'experience_level': 1.0, 'timeline': 0.5, 'gender': 0.5, 'age': 1.0,
+}
+AGE_CENTER, AGE_SCALE = 30, 15
+PROFILE_FIELDS = ['user_id', 'age', 'gender', *HASHED_FIELDS, *ORDERED_FIELDS]
+
+REBUILD_SECONDS = 15 * 60
+MAX_REPLAY = 500
+CHANGE_TIMEOUT = 60 * 60
+GENERATION_KEY = 'cohorts:generation'
+DEFAULT_NEIGHBOURS = 10
+MAX_NEIGHBOURS = 100
+
+
+def _layout():
+    offsets, start = {}, 0
+    widths = {**HASHED_FIELDS, **{field: 1 for field in ORDERED_FIELDS}, 'gender': len(GENDERS), 'age': 1}
+    for field, width in widths.items():
+        offsets[field] = slice(start, start + width)
+        start += width
+    return offsets, start
+
+
+OFFSETS, DIMENSIONS = _layout()
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+@lru_cache(maxsize=4096)
+def _bucket(field, value, buckets):
+    digest = hashlib.blake2b(f'{field}:{value}'.encode(), digest_size=4).digest()
+    return int.from_bytes(digest, 'little') % buckets
+
+
+def encode(profile):
+    """Unit-length feature vector for a dict holding PROFILE_FIELDS."""
+    # Built as a Python list: per-element numpy writes would dominate a rebuild
+    vector = [0.0] * DIMENSIONS
+    for field, buckets in HASHED_FIELDS.items():
+        values = profile.get(field) or []
+        if isinstance(values, str):
+            values = [values]
+        values = {' '.join(str(value).split()).lower() for value in values} - {''}
+        if values:
+            # Picking many sports should not outweigh the other features
+            weight = FEATURE_WEIGHTS[field] / len(values) ** 0.5
+            offset = OFFSETS[field].start
+            for value in values:
+                vector[offset + _bucket(field, value, buckets)] = weight
+
+    for field, choices in ORDERED_FIELDS.items():
+        if profile.get(field) in choices:
+            position = choices.index(profile[field]) / (len(choices) - 1)
+            vector[OFFSETS[field].start] = (position * 2 - 1) * FEATURE_WEIGHTS[field]
+    if profile.get('gender') in GENDERS:
+        vector[OFFSETS['gender'].start + GENDERS.index(profile['gender'])] = FEATURE_WEIGHTS['gender']
+    if profile.get('age') is not None:
+        scaled = min(max((profile['age'] - AGE_CENTER) / AGE_SCALE, -2), 2)
+        vector[OFFSETS['age'].start] = scaled * FEATURE_WEIGHTS['age']
+
+    norm = sum(value * value for value in vector) ** 0.5
+    return np.array(vector, dtype=np.float32) / norm if norm else np.array(vector, dtype=np.float32)
+
+
+def _profiles(user_ids=None):
+    profiles = Onboarding.objects.filter(user__role='athlete', user__is_active=True)
+    if user_ids is not None:
+        profiles = profiles.filter(user_id__in=user_ids)
+    return profiles.values(*PROFILE_FIELDS).iterator(chunk_size=5000)
+
+
+# -----------------------------
+# Change log
+# -----------------------------
+def _change_key(generation):
+    return f'cohorts:change:{generation}'
+
+
+def _next_generation():
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 0, None)
+        return cache.incr(GENERATION_KEY)
+
+
+def record_change(user_id):
+    """Note that this user's profile or eligibility changed; indexes pick it up lazily."""
+    cache.set(_change_key(_next_generation()), user_id, CHANGE_TIMEOUT)
+
+
+def invalidate():
+    """Make every index rebuild on its next query, e.g. after a bulk load."""
+    # A generation with no change entry cannot be replayed
+    _next_generation()
+
+
+# -----------------------------
+# Index
+# -----------------------------
+class CohortIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._reset(capacity=0)
+        self.loaded_at = None
+
+    def _reset(self, capacity):
+        self.matrix = np.zeros((capacity, DIMENSIONS), dtype=np.float32)
+        self.user_ids = np.zeros(capacity, dtype=np.int64)
+        self.positions = {}
+        self.size = 0
+        self.generation = None
+
+    def _upsert(self, user_id, vector):
+        position = self.positions.get(user_id)
+        if position is None:
+            if self.size == len(self.user_ids):
+                self._grow(max(1024, 2 * self.size))
+            position = self.positions[user_id] = self.size
+            self.user_ids[position] = user_id
+            self.size += 1
+        self.matrix[position] = vector
+
+    def _grow(self, capacity):
+        matrix = np.zeros((capacity, DIMENSIONS), dtype=np.float32)
+        user_ids = np.zeros(capacity, dtype=np.int64)
+        matrix[:self.size] = self.matrix[:self.size]
+        user_ids[:self.size] = self.user_ids[:self.size]
+        self.matrix, self.user_ids = matrix, user_ids
+
+    def _remove(self, user_id):
+        position = self.positions.pop(user_id, None)
+        if position is None:
+            return
+        last = self.size - 1
+        if position != last:
+            # Keep rows contiguous by moving the last row into the gap
+            self.matrix[position] = self.matrix[last]
+            self.user_ids[position] = self.user_ids[last]
+            self.positions[int(self.user_ids[position])] = position
+        self.size = last
+
+    def _load(self):
+        """A full rebuild's (generation, user_ids, matrix), computed without holding the lock."""
+        # Read the generation first so changes made during the load are replayed later
+        generation = cache.get(GENERATION_KEY)
+        rows = list(_profiles())
+        matrix = np.zeros((max(1024, len(rows)), DIMENSIONS), dtype=np.float32)
+        for position, row in enumerate(rows):
+            matrix[position] = encode(row)
+        return generation, np.array([row['user_id'] for row in rows], dtype=np.int64), matrix
+
+    def _install(self, generation, user_ids, matrix):
+        self._reset(capacity=0)
+        self.matrix = matrix
+        self.user_ids = np.zeros(len(matrix), dtype=np.int64)
+        self.user_ids[:len(user_ids)] = user_ids
+        self.positions = {user_id: position for position, user_id in enumerate(user_ids.tolist())}
+        self.size = len(user_ids)
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+
+    def _refresh(self, user_ids):
+        found = set()
+        for row in _profiles(user_ids):
+            self._upsert(row['user_id'], encode(row))
+            found.add(row['user_id'])
+        for user_id in set(user_ids) - found:
+            self._remove(user_id)
+
+    def _replay(self):
+        """Apply logged changes under the lock; False if a full rebuild is needed instead."""
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > REBUILD_SECONDS:
+            return False
+        generation = cache.get(GENERATION_KEY)
+        if generation is None or generation == self.generation:
+            return True
+        start = self.generation or 0
+        if generation < start or generation - start > MAX_REPLAY:
+            return False
+        keys = [_change_key(number) for number in range(start + 1, generation + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) < len(keys):
+            # Part of the log expired or was evicted
+            return False
+        self._refresh(set(changes.values()))
+        self.generation = generation
+        return True
+
+    def _sync(self):
+        with self._lock:
+            if self._replay():
+                return
+        # Queries keep using the old matrix while one thread rebuilds; only a cold index waits
+        if not self._rebuild_lock.acquire(blocking=self.loaded_at is None):
+            return
+        try:
+            with self._lock:
+                if self._replay():
+                    return
+            loaded = self._load()
+            with self._lock:
+                self._install(*loaded)
+        finally:
+            self._rebuild_lock.release()
+
+    def snapshot(self):
+        """(user_ids, matrix) copies of the current rows."""
+        self._sync()
+        with self._lock:
+            return self.user_ids[:self.size].copy(), self.matrix[:self.size].copy()
+
+    def similar(self, user_id, k=DEFAULT_NEIGHBOURS, candidate_ids=None):
+        """
+        [(user_id, similarity)] of the k profiles closest to user_id's,
+        best first, optionally limited to candidate_ids. None if user_id
+        has no indexed profile.
+        """
+        self._sync()
+        with self._lock:
+            position = self.positions.get(user_id)
+            if position is None:
+                return None
+            query = self.matrix[position]
+            if candidate_ids is None:
+                # Copied: rows may move once the lock is released
+                ids = self.user_ids[:self.size].copy()
+                scores = self.matrix[:self.size] @ query
+            else:
+                rows = np.fromiter(
+                    (self.positions[candidate] for candidate in candidate_ids if candidate in self.positions),
+                    dtype=np.intp,
+                )
+                ids = self.user_ids[rows]
+                scores = self.matrix[rows] @ query
+
+        scores[ids == user_id] = -np.inf
+        k = min(k, int(np.count_nonzero(ids != user_id)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(ids[row]), round(float(scores[row]), 4)) for row in top]
+
+    def clear(self):
+        with self._lock:
+            self._reset(capacity=0)
+            self.loaded_at = None
+
+
+index = CohortIndex()
+
+
+# -----------------------------
+# Clustering
+# -----------------------------
+def cluster(matrix, cohorts, iterations=50, seed=0):
+    """
+    Spherical k-means (k-means++ seeding) over unit-length rows. Returns
+    (labels, similarity of each row to its centroid, centroids).
+    """
+    rng = np.random.default_rng(seed)
+    count = len(matrix)
+    cohorts = min(cohorts, count)
+
+    centroids = np.empty((cohorts, matrix.shape[1]), dtype=np.float32)
+    centroids[0] = matrix[rng.integers(count)]
+    distance = np.maximum(1 - matrix @ centroids[0], 0)
+    for number in range(1, cohorts):
+        total = distance.sum()
+        choice = rng.choice(count, p=distance / total) if total > 0 else rng.integers(count)
+        centroids[number] = matrix[choice]
+        distance = np.minimum(distance, np.maximum(1 - matrix @ centroids[number], 0))
+
+    labels = None
+    for _ in range(iterations):
+        similarity = matrix @ centroids.T
+        new_labels = similarity.argmax(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        sizes = np.bincount(labels, minlength=cohorts)
+        # Sum each cohort's rows in one pass over the rows sorted by label
+        order = np.argsort(labels, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        sums = np.zeros_like(centroids)
+        filled = sizes > 0
+        sums[filled] = np.add.reduceat(matrix[order], starts[filled], axis=0)
+        best = similarity[np.arange(count), labels]
+        for empty in np.flatnonzero(sizes == 0):
+            # Re-seed an empty cohort with the worst-fitting profile
+            worst = int(best.argmin())
+            sums[empty] = matrix[worst]
+            best[worst] = np.inf
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = np.divide(sums, norms, out=np.zeros_like(sums), where=norms > 0)
+
+    similarity = matrix @ centroids.T
+    labels = similarity.argmax(axis=1)
+    return labels, similarity[np.arange(count), labels], centroids
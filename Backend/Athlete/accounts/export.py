@@ -0,0 +1,188 @@
+"""
+Streaming CSV / NDJSON export of the log tables.
+
+Rows are read with values_list over QuerySet.iterator(), so no model
+instances are built and only one fetch batch plus one output buffer is held
+in memory at a time, whatever the number of athletes being exported.
+Archived rows (accounts.archive) are decoded one month at a time and merged
+into the same order.
+
+Under ASGI, Django reads a sync iterator to the end before sending the
+first byte, so async_stream() runs the export in a thread of its own and
+hands chunks to the event loop a few at a time.
+"""
+import csv
+import heapq
+import io
+import json
+import queue
+import threading
+import zlib
+from contextlib import suppress
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from . import archive
+from .models import HealthMetric, InjuryReport, NutritionLog, WorkoutLog
+
+FETCH_CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+ASYNC_BUFFER_CHUNKS = 4  # encoded chunks held ahead of a slow ASGI client
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# resource -> (model, date field, exported columns); user_id and email lead every row
+RESOURCES = {
+    'workouts': (WorkoutLog, 'date', [
+        'id', 'date', 'activity_type', 'duration_minutes', 'distance_km', 'calories_burned',
+        'average_heart_rate', 'max_heart_rate', 'notes', 'created_at',
+    ]),
+    'health-metrics': (HealthMetric, 'date_recorded', [
+        'id', 'date_recorded', 'metric_type', 'value', 'unit', 'source', 'created_at',
+    ]),
+    'nutrition': (NutritionLog, 'date', [
+        'id', 'date', 'meal_type', 'food_items', 'calories', 'protein_g', 'carbs_g', 'fats_g',
+        'water_ml', 'notes', 'created_at',
+    ]),
+    'injuries': (InjuryReport, 'date_occurred', [
+        'id', 'date_occurred', 'injury_type', 'severity', 'description', 'recovery_status',
+        'medical_attention', 'created_at',
+    ]),
+}
+
+
+def columns(resource):
+    return ['user_id', 'user_email'] + RESOURCES[resource][2]
+
+
+def rows(resource, users, start=None, end=None):
+    """
+    Tuples for every row owned by `users` (a CustomUser queryset, kept as a
+    subquery), ordered along the (user, date, id) index.
+    """
+    model, date_field, fields = RESOURCES[resource]
+    queryset = model.objects.filter(user__in=users.values('pk'))
+    if start:
+        queryset = queryset.filter(**{f'{date_field}__gte': start})
+    if end:
+        queryset = queryset.filter(**{f'{date_field}__lte': end})
+    hot = queryset.order_by('user_id', date_field, 'id').values_list(
+        'user_id', 'user__email', *fields
+    ).iterator(chunk_size=FETCH_CHUNK_SIZE)
+    if resource not in archive.RESOURCES:
+        return hot
+    # Every column list starts with id, date: sort on (user_id, date, id)
+    return heapq.merge(
+        hot, archive.export_rows(resource, users, fields, start, end),
+        key=lambda row: (row[0], row[3], row[2]),
+    )
+
+
+def _cell(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(header, records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for record in records:
+        writer.writerow([_cell(value) for value in record])
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(header, records):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    pending, size = [], 0
+    for record in records:
+        line = encoder.encode(dict(zip(header, record)))
+        pending.append(line)
+        size += len(line) + 1
+        if size >= FLUSH_BYTES:
+            yield '\n'.join(pending) + '\n'
+            pending, size = [], 0
+    if pending:
+        yield '\n'.join(pending) + '\n'
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of text chunks into a single gzip member on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(resource, export_format, users, start=None, end=None, compress=False):
+    """Iterator of str (or gzip bytes) chunks for one resource export."""
+    writer = csv_chunks if export_format == 'csv' else ndjson_chunks
+    chunks = writer(columns(resource), rows(resource, users, start, end))
+    return gzip_chunks(chunks) if compress else chunks
+
+
+async def async_stream(chunks, buffered=ASYNC_BUFFER_CHUNKS):
+    """
+    Async iterator over a stream() iterator. One thread reads and encodes
+    the rows, with its own database connection, and stays at most `buffered`
+    chunks ahead of the client; it stops when the client goes away.
+    """
+    handoff = queue.Queue(maxsize=buffered)
+    stopped = threading.Event()
+    finished = object()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                handoff.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    break
+            else:
+                put(finished)
+        except Exception as exc:
+            put(exc)
+        finally:
+            chunks.close()
+            connection.close()
+            if stopped.is_set():
+                # Wake a read still waiting after the client went away
+                with suppress(queue.Full):
+                    handoff.put_nowait(finished)
+
+    threading.Thread(target=produce, name='export-stream', daemon=True).start()
+    try:
+        while True:
+            item = await sync_to_async(handoff.get, thread_sensitive=False)()
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
+
+def filename(resource, export_format, compress=False):
+    return f"{resource}.{export_format}{'.gz' if compress else ''}"
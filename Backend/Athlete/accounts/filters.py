@@ -0,0 +1,31 @@
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+
+def date_bounds(request):
+    """Parsed (start, end) from ?start=YYYY-MM-DD&end=YYYY-MM-DD; either may be None."""
+    bounds = []
+    for param in ('start', 'end'):
+        value = request.query_params.get(param)
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({param: ["Expected a date in YYYY-MM-DD format."]})
+        bounds.append(parsed)
+    return tuple(bounds)
+
+
+def filter_date_range(queryset, request, date_field):
+    """Apply inclusive ?start=YYYY-MM-DD&end=YYYY-MM-DD bounds on date_field."""
+    start, end = date_bounds(request)
+    bounds = {}
+    if start:
+        bounds[f'{date_field}__gte'] = start
+    if end:
+        bounds[f'{date_field}__lte'] = end
+    return queryset.filter(**bounds)
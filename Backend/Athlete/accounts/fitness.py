@@ -0,0 +1,139 @@
+"""
+Fitness-fatigue (Banister impulse-response) model, fitted for many athletes at once.
+
+Pure NumPy with no Django imports, so forecast workers in a spawned process
+pool can import it without setting Django up.
+
+Fitness and fatigue are exponentially decaying sums of daily load with time
+constants tau_fitness > tau_fatigue, and readiness is modelled as
+baseline + k_fitness * fitness - k_fatigue * fatigue. For every candidate
+pair of time constants the gains are fitted by ridge least squares on the
+days that have a readiness value; each athlete keeps the pair with the
+lowest error. Load for the coming week follows the athlete's recent
+weekday pattern, and readiness is projected from it.
+"""
+import numpy as np
+
+TAU_FITNESS = (28, 42, 56)
+TAU_FATIGUE = (5, 7, 10)
+HORIZON_DAYS = 7
+PATTERN_WEEKS = 4
+# Days at the start of the history used only to charge fitness and fatigue
+WARMUP_DAYS = 42
+MIN_OBSERVATIONS = 14
+RIDGE = 1e-3
+# Used for athletes with too few readiness days to fit
+PRIOR_TAUS = (42, 7)
+PRIOR_READINESS = 75.0
+
+
+def impulse_response(loads, tau):
+    """Exponentially decaying running sum of each row of `loads`."""
+    decay = np.exp(-1.0 / tau)
+    response = np.empty_like(loads)
+    level = np.zeros(loads.shape[0])
+    for day in range(loads.shape[1]):
+        level = level * decay + loads[:, day]
+        response[:, day] = level
+    return response
+
+
+def _fit_gains(fitness, fatigue, readiness, observed, counts):
+    """Per-athlete (baseline, b_fitness, b_fatigue, sse) for one pair of time constants."""
+    weights = observed.astype(np.float64)
+    safe_counts = np.maximum(counts, 1)
+    mean_fit = (fitness * weights).sum(axis=1) / safe_counts
+    mean_fat = (fatigue * weights).sum(axis=1) / safe_counts
+    mean_ready = np.where(observed, readiness, 0).sum(axis=1) / safe_counts
+
+    f = (fitness - mean_fit[:, None]) * weights
+    g = (fatigue - mean_fat[:, None]) * weights
+    r = np.where(observed, readiness - mean_ready[:, None], 0)
+    sff, sgg, sfg = (f * f).sum(axis=1), (g * g).sum(axis=1), (f * g).sum(axis=1)
+    sfr, sgr = (f * r).sum(axis=1), (g * r).sum(axis=1)
+
+    ridge = RIDGE * (sff + sgg) / 2 + 1e-12
+    determinant = (sff + ridge) * (sgg + ridge) - sfg ** 2
+    b_fit = ((sgg + ridge) * sfr - sfg * sgr) / determinant
+    b_fat = ((sff + ridge) * sgr - sfg * sfr) / determinant
+    baseline = mean_ready - b_fit * mean_fit - b_fat * mean_fat
+
+    fitted = baseline[:, None] + b_fit[:, None] * fitness + b_fat[:, None] * fatigue
+    residual = np.where(observed, readiness - fitted, 0)
+    return baseline, b_fit, b_fat, (residual ** 2).sum(axis=1)
+
+
+def weekday_pattern(loads, weeks=PATTERN_WEEKS):
+    """Mean load per weekday over the last `weeks` weeks; column h is the weekday of day T + h."""
+    recent = loads[:, -weeks * 7:]
+    return recent.reshape(loads.shape[0], -1, 7).mean(axis=1)
+
+
+def fit_and_forecast(user_ids, loads, readiness):
+    """
+    Fit every athlete (one row of `loads` / `readiness` each, readiness NaN
+    where unknown) and project the next HORIZON_DAYS days. Returns a dict of
+    arrays indexed like `user_ids`.
+    """
+    athletes = loads.shape[0]
+    observed = ~np.isnan(readiness)
+    observed[:, :WARMUP_DAYS] = False
+    counts = observed.sum(axis=1)
+
+    fitness = {tau: impulse_response(loads, tau) for tau in TAU_FITNESS}
+    fatigue = {tau: impulse_response(loads, tau) for tau in TAU_FATIGUE}
+
+    best = {
+        'sse': np.full(athletes, np.inf),
+        'tau_fitness': np.full(athletes, PRIOR_TAUS[0]),
+        'tau_fatigue': np.full(athletes, PRIOR_TAUS[1]),
+        'baseline': np.zeros(athletes), 'b_fit': np.zeros(athletes), 'b_fat': np.zeros(athletes),
+    }
+    for tau_fit in TAU_FITNESS:
+        for tau_fat in TAU_FATIGUE:
+            baseline, b_fit, b_fat, sse = _fit_gains(fitness[tau_fit], fatigue[tau_fat], readiness, observed, counts)
+            better = sse < best['sse']
+            for name, value in (
+                ('sse', sse), ('tau_fitness', tau_fit), ('tau_fatigue', tau_fat),
+                ('baseline', baseline), ('b_fit', b_fit), ('b_fat', b_fat),
+            ):
+                best[name] = np.where(better, value, best[name])
+
+    # Too few readiness days: flat projection at the athlete's mean readiness
+    fitted = counts >= MIN_OBSERVATIONS
+    any_readiness = ~np.isnan(readiness)
+    with np.errstate(invalid='ignore'):
+        mean_ready = np.where(any_readiness, readiness, 0).sum(axis=1) / any_readiness.sum(axis=1)
+    prior = np.where(np.isnan(mean_ready), PRIOR_READINESS, mean_ready)
+    baseline = np.where(fitted, best['baseline'], prior)
+    b_fit = np.where(fitted, best['b_fit'], 0.0)
+    b_fat = np.where(fitted, best['b_fat'], 0.0)
+    tau_fit = np.where(fitted, best['tau_fitness'], PRIOR_TAUS[0])
+    tau_fat = np.where(fitted, best['tau_fatigue'], PRIOR_TAUS[1])
+
+    # Current fitness and fatigue under each athlete's chosen time constants
+    fit_level = np.choose(np.searchsorted(TAU_FITNESS, tau_fit), [fitness[tau][:, -1] for tau in TAU_FITNESS])
+    fat_level = np.choose(np.searchsorted(TAU_FATIGUE, tau_fat), [fatigue[tau][:, -1] for tau in TAU_FATIGUE])
+
+    planned = weekday_pattern(loads)
+    projected = np.empty((athletes, HORIZON_DAYS))
+    level_fit, level_fat = fit_level.copy(), fat_level.copy()
+    decay_fit, decay_fat = np.exp(-1.0 / tau_fit), np.exp(-1.0 / tau_fat)
+    for day in range(HORIZON_DAYS):
+        level_fit = level_fit * decay_fit + planned[:, day]
+        level_fat = level_fat * decay_fat + planned[:, day]
+        projected[:, day] = baseline + b_fit * level_fit + b_fat * level_fat
+
+    return {
+        'user_ids': np.asarray(user_ids),
+        'tau_fitness': tau_fit,
+        'tau_fatigue': tau_fat,
+        'k_fitness': b_fit,
+        'k_fatigue': -b_fat,
+        'baseline': baseline,
+        'rmse': np.where(fitted, np.sqrt(best['sse'] / np.maximum(counts, 1)), np.nan),
+        'fitness': fit_level,
+        'fatigue': fat_level,
+        'loads': planned,
+        'readiness': np.clip(projected, 0, 100),
+    }
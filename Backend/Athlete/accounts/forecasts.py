@@ -0,0 +1,172 @@
+"""
+Nightly next-week load and readiness forecasts.
+
+run() reads DailyRollup history (built from WorkoutLog and HealthMetric, and
+kept for days whose logs were archived) for chunks of active athletes, fits
+the fitness-fatigue model in accounts.fitness across a process pool and
+upserts one TrainingForecast per athlete as each chunk finishes. Athletes
+already forecast for the run's as_of date are skipped, so a run that stops
+part way resumes where it left off. Dashboards only read the stored rows.
+"""
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from . import fitness
+from .imports import default_workers
+from .models import CustomUser, DailyRollup, TrainingForecast
+
+HISTORY_DAYS = 180
+CHUNK_SIZE = 500
+IN_FLIGHT_PER_WORKER = 2
+# Below this many chunks the pool start-up costs more than it saves
+PARALLEL_MIN_CHUNKS = 2
+FORECAST_FIELDS = [
+    'as_of', 'days', 'fitness', 'fatigue', 'tau_fitness', 'tau_fatigue',
+    'k_fitness', 'k_fatigue', 'baseline', 'rmse',
+]
+
+
+def history(user_ids, start, end):
+    """
+    (loads, readiness) float arrays with one row per id in `user_ids` order
+    and one column per day; readiness is NaN on days without a value.
+    """
+    days = (end - start).days + 1
+    loads = np.zeros((len(user_ids), days))
+    readiness = np.full((len(user_ids), days), np.nan)
+    rows = list(
+        DailyRollup.objects.filter(user_id__in=user_ids, date__range=(start, end))
+        .values_list('user_id', 'date', 'training_load', 'training_readiness')
+    )
+    if not rows:
+        return loads, readiness
+
+    owners, dates, day_loads, day_readiness = zip(*rows)
+    index = {user_id: position for position, user_id in enumerate(user_ids)}
+    positions = np.fromiter((index[owner] for owner in owners), dtype=np.int64, count=len(rows))
+    offsets = (np.array(dates, dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+    loads[positions, offsets] = day_loads
+    readiness[positions, offsets] = np.array(day_readiness, dtype=np.float64)  # None -> NaN
+    return loads, readiness
+
+
+def pending(as_of, restart=False):
+    """Ids of the active athletes still to forecast for `as_of`, in id order."""
+    athletes = CustomUser.objects.filter(role='athlete', is_active=True)
+    if not restart:
+        athletes = athletes.exclude(training_forecast__as_of=as_of)
+    return list(athletes.order_by('pk').values_list('pk', flat=True))
+
+
+# -----------------------------
+# Fitting
+# -----------------------------
+def _fit_chunks(chunks, workers):
+    """
+    Yield fitness.fit_and_forecast results as chunks complete. `chunks` yields
+    (user_ids, loads, readiness); only a few chunks per worker are loaded at
+    once, and the next ones are read while the pool fits.
+    """
+    if workers == 1:
+        for chunk in chunks:
+            yield fitness.fit_and_forecast(*chunk)
+        return
+
+    # spawn: forking a threaded server process is not safe, and workers never touch Django
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        in_flight = set()
+        while True:
+            while len(in_flight) < workers * IN_FLIGHT_PER_WORKER:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                in_flight.add(pool.submit(fitness.fit_and_forecast, *chunk))
+            if not in_flight:
+                return
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def _optional(value, digits):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def _store(result, as_of):
+    dates = [as_of + timedelta(days=offset) for offset in range(1, fitness.HORIZON_DAYS + 1)]
+    forecasts = [
+        TrainingForecast(
+            user_id=int(user_id),
+            as_of=as_of,
+            days=[
+                {
+                    'date': date.isoformat(),
+                    'day': date.strftime('%a'),
+                    'load': round(float(result['loads'][index, offset])),
+                    'readiness': round(float(result['readiness'][index, offset])),
+                }
+                for offset, date in enumerate(dates)
+            ],
+            fitness=round(float(result['fitness'][index]), 2),
+            fatigue=round(float(result['fatigue'][index]), 2),
+            tau_fitness=int(result['tau_fitness'][index]),
+            tau_fatigue=int(result['tau_fatigue'][index]),
+            k_fitness=float(result['k_fitness'][index]),
+            k_fatigue=float(result['k_fatigue'][index]),
+            baseline=round(float(result['baseline'][index]), 3),
+            rmse=_optional(result['rmse'][index], 3),
+        )
+        for index, user_id in enumerate(result['user_ids'])
+    ]
+    with transaction.atomic():
+        TrainingForecast.objects.bulk_create(
+            forecasts,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=FORECAST_FIELDS + ['computed_at'],
+        )
+    return len(forecasts)
+
+
+def run(as_of=None, workers=None, chunk_size=CHUNK_SIZE, restart=False, progress=None):
+    """
+    Forecast every active athlete not yet forecast for `as_of` (default
+    today), chunk_size athletes per task; `restart` recomputes them all.
+    `progress`, if given, is called as progress(forecast, total) after each
+    stored chunk. Returns the number of athletes forecast.
+    """
+    as_of = as_of or timezone.localdate()
+    start = as_of - timedelta(days=HISTORY_DAYS - 1)
+    athlete_ids = pending(as_of, restart)
+    offsets = range(0, len(athlete_ids), chunk_size)
+    workers = workers or default_workers()
+    if len(offsets) < PARALLEL_MIN_CHUNKS:
+        workers = 1
+
+    def chunks():
+        for offset in offsets:
+            user_ids = athlete_ids[offset:offset + chunk_size]
+            yield (user_ids, *history(user_ids, start, as_of))
+
+    forecast = 0
+    for result in _fit_chunks(chunks(), workers):
+        forecast += _store(result, as_of)
+        if progress:
+            progress(forecast, len(athlete_ids))
+    return forecast
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def payload(forecast):
+    """The dashboard form of a TrainingForecast, or None."""
+    if forecast is None:
+        return None
+    return {'as_of': forecast.as_of, 'days': forecast.days}
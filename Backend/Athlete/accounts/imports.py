@@ -0,0 +1,203 @@
+"""
+Bulk import of recorded activities into WorkoutLog.
+
+Files are parsed in a process pool (see activity_files), deduplicated
+against the (user, date, activity_type) unique key and written with batched
+bulk_create. bulk_create skips model signals, so rollups, risk scores, admin
+counters and caches are refreshed once at the end of the import.
+"""
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.db import transaction
+
+from . import live, risk, rollups, scoring, stats, stressmap, sync, versions
+from .activity_files import SUPPORTED_EXTENSIONS, parse_file
+from .models import Onboarding, WorkoutLog
+
+BATCH_SIZE = 500
+MAX_WORKERS = 8
+# Below this many files the pool start-up costs more than it saves
+PARALLEL_MIN_FILES = 8
+IN_FLIGHT_PER_WORKER = 4
+PROGRESS_EVERY = 50
+
+
+def default_workers():
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+
+
+# -----------------------------
+# Sources
+# -----------------------------
+def supported(name):
+    return name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def archive_sources(name, fileobj):
+    """(name, read) pairs for the supported members of a zip archive."""
+    archive = zipfile.ZipFile(fileobj)
+    return [
+        (f'{name}/{info.filename}', lambda info=info: archive.read(info))
+        for info in archive.infolist()
+        if not info.is_dir() and supported(info.filename)
+    ]
+
+
+def upload_sources(files):
+    """(name, read) pairs for uploaded files, expanding zip archives."""
+    sources = []
+    for upload in files:
+        if upload.name.lower().endswith('.zip'):
+            sources.extend(archive_sources(upload.name, upload))
+        else:
+            sources.append((upload.name, upload.read))
+    return sources
+
+
+def path_sources(paths):
+    """(name, read) pairs for files, directories (recursive) and zip archives on disk."""
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                sources.extend(path_sources(os.path.join(directory, name) for name in sorted(names)))
+        elif path.lower().endswith('.zip'):
+            sources.extend(archive_sources(path, path))
+        elif supported(path):
+            sources.append((path, lambda path=path: _read(path)))
+    return sources
+
+
+def _read(path):
+    with open(path, 'rb') as handle:
+        return handle.read()
+
+
+# -----------------------------
+# Parsing
+# -----------------------------
+def parse_sources(sources, workers=None):
+    """
+    Yield parse_file results as they complete. Only a few files per worker are
+    read and in flight at once, so memory does not grow with the archive.
+    """
+    workers = workers or default_workers()
+    if workers == 1 or len(sources) < PARALLEL_MIN_FILES:
+        for name, read in sources:
+            yield parse_file(name, read())
+        return
+
+    # spawn: forking a threaded server process is not safe, and workers never touch Django
+    context = multiprocessing.get_context('spawn')
+    pending = iter(sources)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        in_flight = set()
+        while True:
+            while len(in_flight) < workers * IN_FLIGHT_PER_WORKER:
+                source = next(pending, None)
+                if source is None:
+                    break
+                name, read = source
+                in_flight.add(pool.submit(parse_file, name, read()))
+            if not in_flight:
+                return
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+def _write(user, batch, seen_dates):
+    keys = {(item['date'], item['activity_type']) for item in batch}
+    with transaction.atomic():
+        existing = set(
+            WorkoutLog.objects.filter(user=user, date__in={date for date, _ in keys})
+            .values_list('date', 'activity_type')
+        )
+        fresh = [item for item in batch if (item['date'], item['activity_type']) not in existing]
+        if not fresh:
+            return 0, len(batch)
+        sync_seq = sync.next_seq(user.id)
+        # ignore_conflicts covers a workout saved by another request in the meantime
+        WorkoutLog.objects.bulk_create(
+            [WorkoutLog(user=user, sync_seq=sync_seq, **item) for item in fresh], ignore_conflicts=True
+        )
+        # The skipped rows are not reported back, but only this batch holds its sync number
+        created = WorkoutLog.objects.filter(user=user, sync_seq=sync_seq).count()
+    seen_dates.update(item['date'] for item in fresh)
+    return created, len(batch) - created
+
+
+def import_workouts(user, sources, workers=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Parse and store every workout in `sources` for `user`. `progress`, if
+    given, is called as progress(summary) every PROGRESS_EVERY files and at the end.
+    """
+    started = time.perf_counter()
+    profile = Onboarding.objects.filter(user=user).values('age', 'gender').first() or {}
+    summary = {
+        'files': len(sources), 'processed': 0, 'parsed': 0, 'created': 0,
+        'duplicates': 0, 'errors': [],
+    }
+    seen, batch, dates = set(), [], set()
+
+    def flush():
+        created, duplicates = _write(user, batch, dates)
+        summary['created'] += created
+        summary['duplicates'] += duplicates
+        batch.clear()
+
+    for name, workouts, error in parse_sources(sources, workers):
+        summary['processed'] += 1
+        if error:
+            summary['errors'].append({'file': name, 'error': error})
+        for item in workouts:
+            summary['parsed'] += 1
+            key = (item['date'], item['activity_type'])
+            if key in seen:
+                summary['duplicates'] += 1
+                continue
+            seen.add(key)
+            if item['calories_burned'] is None:
+                item['calories_burned'] = scoring.estimate_calories(
+                    item['duration_minutes'], item['average_heart_rate'],
+                    profile.get('age'), profile.get('gender'),
+                )
+            batch.append(item)
+            if len(batch) >= batch_size:
+                flush()
+        if progress and summary['processed'] % PROGRESS_EVERY == 0:
+            progress(_with_rates(summary, started))
+    if batch:
+        flush()
+
+    if summary['created']:
+        rollups.refresh_days(user.id, dates)
+        risk.score_users([user.id])
+        stats.apply_deltas({'total_workouts': summary['created']})
+        versions.bump(user.id, 'workouts')
+        stressmap.invalidate(user.id)
+        live.publish_change(user.id, {
+            'type': 'workouts', 'athlete': user.id, 'action': 'bulk', 'count': summary['created'],
+        })
+
+    summary = _with_rates(summary, started)
+    if progress:
+        progress(summary)
+    return summary
+
+
+def _with_rates(summary, started):
+    elapsed = time.perf_counter() - started
+    return {
+        **summary,
+        'elapsed_seconds': round(elapsed, 3),
+        'files_per_second': round(summary['processed'] / elapsed, 1) if elapsed else None,
+        'workouts_per_second': round(summary['parsed'] / elapsed, 1) if elapsed else None,
+    }
@@ -0,0 +1,230 @@
+"""
+Injury analytics: workload before injuries, recurrence and incidence.
+
+For a set of athletes and a period, analyze() loads the InjuryReport rows
+and only the daily loads it needs, in a few bulk queries. Everything else
+is NumPy array work with no per-injury queries:
+
+- Pre-injury load. Daily load is summed over the 28 days before each
+  injury and compared with the athlete's own baseline: the 12 weeks before
+  that, scaled to 28 days. Daily load is DailyRollup.training_load, which
+  is WorkoutLog duration x effort and is kept for archived days.
+- Recurrence. An injury counts as a recurrence when the same athlete
+  reported the same injury type within RECURRENCE_DAYS before it.
+- Incidence. Injuries per 1,000 hours of logged training in the period.
+
+Results are cached. Any InjuryReport write moves the cache generation on,
+so the next request recomputes.
+"""
+import hashlib
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import DailyRollup, InjuryReport
+
+PRE_INJURY_DAYS = 28
+BASELINE_DAYS = 84
+# Pre-injury load at least this multiple of baseline counts as a spike, as with the ACWR danger zone
+SPIKE_RATIO = 1.3
+RECURRENCE_DAYS = 365
+DEFAULT_PERIOD_DAYS = 365
+CACHE_TIMEOUT = 60 * 60  # workload edits do not invalidate, so results are at most this stale
+GENERATION_KEY = 'injuries:generation'
+
+
+def invalidate():
+    """Make every cached analysis recompute, e.g. after injuries are written in bulk."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, None)
+
+
+def _cache_key(user_ids, start, end):
+    generation = cache.get(GENERATION_KEY, 0)
+    digest = hashlib.blake2s(f"{start}|{end}|{','.join(map(str, user_ids))}".encode(), digest_size=12).hexdigest()
+    return f'injuries:analytics:{generation}:{digest}'
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+def _injuries(user_ids, start, end):
+    """Arrays (users, day numbers, injury types, severities), sorted by user then date."""
+    rows = list(
+        InjuryReport.objects.filter(user_id__in=user_ids, date_occurred__range=(start, end))
+        .order_by('user_id', 'date_occurred', 'id')
+        .values_list('user_id', 'date_occurred', 'injury_type', 'severity')
+    )
+    if not rows:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=object), np.array([], dtype=object)
+    users, dates, types, severities = zip(*rows)
+    return (
+        np.fromiter(users, dtype=np.int64, count=len(rows)),
+        np.array(dates, dtype='datetime64[D]').astype(np.int64),
+        np.array([injury_type.strip().lower() for injury_type in types], dtype=object),
+        np.array(severities, dtype=object),
+    )
+
+
+def _load_matrix(user_ids, start, end):
+    """Dense daily load, one row per id in sorted `user_ids`, one column per day from `start`."""
+    matrix = np.zeros((len(user_ids), (end - start).days + 1))
+    rows = list(
+        DailyRollup.objects.filter(user_id__in=user_ids.tolist(), date__range=(start, end), training_load__gt=0)
+        .values_list('user_id', 'date', 'training_load')
+    )
+    if rows:
+        owners, dates, loads = zip(*rows)
+        positions = np.searchsorted(user_ids, np.fromiter(owners, dtype=np.int64, count=len(rows)))
+        offsets = (np.array(dates, dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+        matrix[positions, offsets] = loads
+    return matrix
+
+
+def _training_hours(user_ids, start, end):
+    minutes = DailyRollup.objects.filter(user_id__in=user_ids, date__range=(start, end)).aggregate(
+        minutes=Sum('workout_minutes')
+    )['minutes']
+    return (minutes or 0) / 60
+
+
+# -----------------------------
+# Analysis
+# -----------------------------
+def window_loads(users, days):
+    """
+    (pre-injury load, baseline) per injury, `days` being day numbers. The
+    loads of the injured athletes come from one bulk query.
+    """
+    injured = np.unique(users)
+    origin = int(days.min()) - PRE_INJURY_DAYS - BASELINE_DAYS
+    start = np.datetime64(origin, 'D').astype(object)
+    end = np.datetime64(int(days.max()) - 1, 'D').astype(object)
+    matrix = _load_matrix(injured, start, end)
+
+    # cumulative[:, k] is the load of the days before column k
+    cumulative = np.zeros((matrix.shape[0], matrix.shape[1] + 1))
+    np.cumsum(matrix, axis=1, out=cumulative[:, 1:])
+    rows = np.searchsorted(injured, users)
+    window_end = days - origin
+    window_start = window_end - PRE_INJURY_DAYS
+    pre = cumulative[rows, window_end] - cumulative[rows, window_start]
+    baseline = (cumulative[rows, window_start] - cumulative[rows, window_start - BASELINE_DAYS]) \
+        * PRE_INJURY_DAYS / BASELINE_DAYS
+    return pre, baseline
+
+
+def recurrences(users, days, codes):
+    """True for each injury the athlete already had, same type, within RECURRENCE_DAYS."""
+    order = np.lexsort((days, users, codes))
+    same = (codes[order][1:] == codes[order][:-1]) & (users[order][1:] == users[order][:-1])
+    close = (days[order][1:] - days[order][:-1]) <= RECURRENCE_DAYS
+    recurrent = np.zeros(len(users), dtype=bool)
+    recurrent[order[1:]] = same & close
+    return recurrent
+
+
+def _per_1000_hours(count, hours):
+    return round(count / hours * 1000, 2) if hours else None
+
+
+def _mean(values):
+    values = values[np.isfinite(values)]
+    return round(float(values.mean()), 1) if len(values) else None
+
+
+def _median(values):
+    values = values[np.isfinite(values)]
+    return round(float(np.median(values)), 2) if len(values) else None
+
+
+def analyze(user_ids, start, end):
+    """Injury analytics for the athletes in `user_ids` over the inclusive period."""
+    user_ids = sorted(user_ids)
+    # Earlier injuries only decide whether one in the period is a recurrence
+    users, days, types, severities = _injuries(user_ids, start - timedelta(days=RECURRENCE_DAYS), end)
+    hours = _training_hours(user_ids, start, end)
+    payload = {
+        'start': start,
+        'end': end,
+        'athletes': len(user_ids),
+        'injuries': 0,
+        'trainingHours': round(hours, 1),
+        'incidencePer1000Hours': _per_1000_hours(0, hours),
+        'preInjuryLoad': None,
+        'byType': [],
+        'bySeverity': [],
+    }
+    if not len(users):
+        return payload
+
+    names, codes = np.unique(types, return_inverse=True)
+    recurrent = recurrences(users, days, codes)
+    in_period = days >= np.datetime64(start, 'D').astype(np.int64)
+    users, days, codes, severities, recurrent = (
+        users[in_period], days[in_period], codes[in_period], severities[in_period], recurrent[in_period],
+    )
+    if not len(users):
+        return payload
+
+    pre, baseline = window_loads(users, days)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(baseline > 0, pre / baseline, np.nan)
+
+    counts = np.bincount(codes, minlength=len(names))
+    repeat_counts = np.bincount(codes, weights=recurrent, minlength=len(names))
+    by_type = []
+    for code in np.argsort(-counts, kind='stable'):
+        if not counts[code]:
+            continue
+        chosen = codes == code
+        by_type.append({
+            'injuryType': names[code],
+            'count': int(counts[code]),
+            'recurrences': int(repeat_counts[code]),
+            'recurrenceRate': round(float(repeat_counts[code] / counts[code]), 3),
+            'incidencePer1000Hours': _per_1000_hours(int(counts[code]), hours),
+            'meanPreInjuryLoad': _mean(pre[chosen]),
+            'meanBaselineLoad': _mean(baseline[chosen]),
+            'medianLoadRatio': _median(ratio[chosen]),
+        })
+
+    severity_names, severity_counts = np.unique(severities, return_counts=True)
+    finite = ratio[np.isfinite(ratio)]
+    payload.update({
+        'injuries': len(users),
+        'incidencePer1000Hours': _per_1000_hours(len(users), hours),
+        'preInjuryLoad': {
+            'windowDays': PRE_INJURY_DAYS,
+            'baselineDays': BASELINE_DAYS,
+            'meanLoad': _mean(pre),
+            'meanBaseline': _mean(baseline),
+            'medianRatio': _median(ratio),
+            'spikeShare': round(float((finite >= SPIKE_RATIO).mean()), 3) if len(finite) else None,
+        },
+        'byType': by_type,
+        'bySeverity': [
+            {'severity': severity, 'count': int(count), 'incidencePer1000Hours': _per_1000_hours(int(count), hours)}
+            for severity, count in zip(severity_names, severity_counts)
+        ],
+    })
+    return payload
+
+
+def analytics(users, start=None, end=None):
+    """Cached analyze() for a user queryset; the period defaults to the last DEFAULT_PERIOD_DAYS days."""
+    end = end or timezone.localdate()
+    start = start or end - timedelta(days=DEFAULT_PERIOD_DAYS - 1)
+    user_ids = list(users.order_by('pk').values_list('pk', flat=True))
+    key = _cache_key(user_ids, start, end)
+    payload = cache.get(key)
+    if payload is None:
+        payload = analyze(user_ids, start, end)
+        cache.set(key, payload, CACHE_TIMEOUT)
+    return payload
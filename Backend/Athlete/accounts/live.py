@@ -0,0 +1,161 @@
+"""
+In-process pub/sub for live dashboard updates.
+
+Each open event stream subscribes to one topic per athlete it may see (its
+own user id, plus every roster athlete for a coach). Model signals publish
+into the broker from worker threads; events are handed to the stream's
+event loop with call_soon_threadsafe. Writes are published once their
+transaction commits. Derived scores are published as deltas: only fields
+that changed since the last push to that stream, so a stream that joins
+late first gets every field.
+
+The broker lives in one process, so every worker serves the streams of the
+clients connected to it; run a single ASGI worker per host or put a shared
+broker in front when scaling out.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AthleteRiskScore, DailyRollup
+
+QUEUE_SIZE = 100
+HEARTBEAT_SECONDS = 25
+
+
+class Subscription:
+    def __init__(self, topics, loop, maxsize=QUEUE_SIZE):
+        self.topics = frozenset(topics)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.last_state = {}  # (topic, channel) -> fields last pushed to this stream
+
+    def _put(self, event):
+        # A slow client loses its oldest events rather than blocking publishers
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The stream's loop has already shut down
+            pass
+
+
+class Broker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, topics, loop=None):
+        subscription = Subscription(topics, loop or asyncio.get_running_loop())
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def has_subscribers(self, topic):
+        return bool(self._subscribers.get(topic))
+
+    def connection_count(self):
+        with self._lock:
+            return len({subscription for subscribers in self._subscribers.values() for subscription in subscribers})
+
+    def publish(self, topic, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return len(subscribers)
+
+    def publish_delta(self, topic, channel, state):
+        """Publish to each subscriber only the keys of `state` that changed since its last push."""
+        deliveries = []
+        with self._lock:
+            for subscription in self._subscribers.get(topic, ()):
+                previous = subscription.last_state.get((topic, channel), {})
+                changes = {key: value for key, value in state.items() if previous.get(key, object()) != value}
+                if changes:
+                    subscription.last_state[(topic, channel)] = {**previous, **changes}
+                    deliveries.append((subscription, changes))
+        for subscription, changes in deliveries:
+            subscription.deliver({'type': channel, 'athlete': topic, 'changes': changes})
+        return len(deliveries)
+
+
+broker = Broker()
+
+
+def format_event(event):
+    payload = json.dumps(event, cls=DjangoJSONEncoder)
+    return f"event: {event.get('type', 'message')}\ndata: {payload}\n\n"
+
+
+def publish_scores(user_id):
+    """Push changed risk and readiness values for the athlete, if anyone is listening."""
+    if not broker.has_subscribers(user_id):
+        return
+
+    score = AthleteRiskScore.objects.filter(user_id=user_id).values(
+        'injury_risk', 'acwr', 'monotony', 'strain'
+    ).first()
+    if score:
+        broker.publish_delta(user_id, 'risk', {
+            'injuryRisk': score['injury_risk'],
+            'acwr': score['acwr'],
+            'monotony': score['monotony'],
+            'strain': score['strain'],
+        })
+
+    rollup = DailyRollup.objects.filter(user_id=user_id, date=timezone.localdate()).values(
+        'training_readiness', 'recovery_score', 'training_load'
+    ).first() or {}
+    broker.publish_delta(user_id, 'readiness', {
+        'trainingReadiness': rollup.get('training_readiness'),
+        'recoveryScore': rollup.get('recovery_score'),
+        'trainingLoad': round(rollup['training_load']) if rollup.get('training_load') is not None else None,
+    })
+
+
+def publish_change(user_id, event):
+    """
+    Publish `event` and the athlete's changed scores once the current
+    transaction commits, so no stream sees a write that is rolled back.
+    """
+    def send():
+        broker.publish(user_id, event)
+        publish_scores(user_id)
+
+    transaction.on_commit(send)
+
+
+async def event_stream(subscription, heartbeat=HEARTBEAT_SECONDS):
+    """SSE frames for one subscription; a comment line keeps idle proxies open."""
+    try:
+        yield format_event({'type': 'ready', 'topics': sorted(subscription.topics)})
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts import archive
+from accounts.models import ArchivedLogChunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Move workout, health metric and nutrition rows older than the archive horizon "
+        "into packed per-user monthly chunks. Each batch commits on its own, so the "
+        "command can be stopped at any point and resumed with --after-user."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon-days', type=int, help="Defaults to ACCOUNTS_ARCHIVE['HORIZON_DAYS'].")
+        parser.add_argument('--resource', action='append', choices=list(archive.RESOURCES),
+                            help="Only archive this resource; may be repeated.")
+        parser.add_argument('--batch-size', type=int, help="Rows moved per transaction.")
+        parser.add_argument('--after-user', type=int, default=0, help="Resume after this user id.")
+        parser.add_argument('--progress-every', type=int, default=500, help="Report every this many users.")
+
+    def handle(self, *args, **options):
+        before = archive.cutoff(options['horizon_days'])
+        self.stdout.write(f"Archiving rows dated before {before}.")
+        started = time.perf_counter()
+        seen = 0
+
+        def progress(user_id, moved):
+            nonlocal seen
+            seen += 1
+            if seen % options['progress_every'] == 0:
+                self.stdout.write(f"{seen} users, {sum(moved.values())} rows moved; resume with --after-user {user_id}")
+
+        moved = archive.archive(
+            options['resource'], before, options['after_user'], options['batch_size'], progress,
+        )
+        elapsed = time.perf_counter() - started
+        for resource, count in moved.items():
+            model, _ = archive.RESOURCES[resource]
+            self.stdout.write(
+                f"{resource:<16} {count:>9} moved  {model.objects.count():>10} hot  "
+                f"{ArchivedLogChunk.objects.filter(resource=resource).count():>8} archived months"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Archived {sum(moved.values())} rows for {seen} users in {elapsed:.1f}s."))
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts import synthetic
+from accounts.management.commands.benchmark_endpoints import percentile
+from Athlete.asgi import AthleteASGIHandler
+
+API = '/api/accounts'
+
+# (name, role, path) of the reads accounts.async_views serves
+ENDPOINTS = [
+    ('me', 'athlete', f'{API}/me/'),
+    ('dashboard', 'athlete', f'{API}/dashboard/'),
+    ('coach_roster', 'coach', f'{API}/coach/roster/'),
+    ('workout_list', 'athlete', f'{API}/workouts/'),
+    ('health_metric_list', 'athlete', f'{API}/health-metrics/'),
+    ('nutrition_list', 'athlete', f'{API}/nutrition/'),
+    ('injury_list', 'athlete', f'{API}/injuries/'),
+]
+# wsgi: one worker process with `concurrency` threads (gunicorn gthread);
+# asgi-sync: the WSGI routes under ASGI; asgi-async: the async read views
+MODES = ('wsgi', 'asgi-sync', 'asgi-async')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and latency of the hot read endpoints in one worker "
+        "under concurrent load: sync views behind WSGI threads, sync views under "
+        "ASGI and the async views under ASGI. Seeds and commits synthetic users "
+        "(worker threads use their own connections) and deletes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--athletes', type=int, default=20)
+        parser.add_argument('--years', type=int, default=1, help="Years of history per athlete.")
+        parser.add_argument('--concurrency', type=int, default=32, help="Requests in flight per worker.")
+        parser.add_argument('--requests', type=int, default=500, help="Timed requests per endpoint and mode.")
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+        parser.add_argument('--output', default='async-read-benchmark.json', help="Where to write the JSON results.")
+
+    def handle(self, *args, **options):
+        users, counts = synthetic.seed(
+            athletes=options['athletes'], coaches=1, admins=0, years=options['years'],
+            prefix=f'asyncbench{int(time.time())}',
+        )
+        try:
+            tokens = {role: str(AccessToken.for_user(members[0])) for role, members in users.items() if members}
+            self.stdout.write(f"Seeded {counts}.")
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']):
+                results = {
+                    mode: self.run_mode(mode, tokens, options['concurrency'], options['requests'])
+                    for mode in options['modes']
+                }
+        finally:
+            # One by one: the log signals skip their per-row work only when a user instance is the origin
+            for members in users.values():
+                for user in members:
+                    user.delete()
+
+        self.report(results, options['modes'])
+        with open(options['output'], 'w') as handle:
+            json.dump({
+                'meta': {
+                    'created_at': timezone.now().isoformat(),
+                    'database': connection.vendor,
+                    'django': django.get_version(),
+                    'python': platform.python_version(),
+                    'concurrency': options['concurrency'],
+                    'requests': options['requests'],
+                    'rows': counts,
+                },
+                'modes': results,
+            }, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+        failed = [
+            f"{mode}/{name}" for mode, endpoints in results.items()
+            for name, result in endpoints.items() if result['errors']
+        ]
+        if failed:
+            raise CommandError(f"Failed requests: {', '.join(failed)}")
+
+    def run_mode(self, mode, tokens, concurrency, requests):
+        results = {}
+        for name, role, path in ENDPOINTS:
+            if mode == 'wsgi':
+                call = self.wsgi_caller(path, tokens[role])
+                call()  # warm caches and the URL resolver
+                timings, statuses, elapsed = self.load_threads(call, concurrency, requests)
+            else:
+                urlconf = settings.ASGI_URLCONF if mode == 'asgi-async' else None
+                with override_settings(ASGI_URLCONF=urlconf):
+                    timings, statuses, elapsed = asyncio.run(
+                        self.load_asgi(path, tokens[role], concurrency, requests)
+                    )
+            results[name] = {
+                'requests_per_second': round(len(timings) / elapsed, 1),
+                'p50_ms': round(statistics.median(timings), 3),
+                'p95_ms': round(percentile(timings, 0.95), 3),
+                'errors': sum(1 for code in statuses if code >= 400),
+            }
+            self.stdout.write(
+                f"{mode:<11} {name:<20} {results[name]['requests_per_second']:>9.1f} req/s  "
+                f"p50 {results[name]['p50_ms']:>8.2f} ms  p95 {results[name]['p95_ms']:>8.2f} ms"
+            )
+        return results
+
+    # -----------------------------
+    # WSGI: a thread per request in flight
+    # -----------------------------
+    def wsgi_caller(self, path, token):
+        handler = WSGIHandler()
+        factory = RequestFactory()
+
+        def call():
+            environ = factory.get(path, HTTP_AUTHORIZATION=f'Bearer {token}').environ
+            status_line = []
+            body = handler(environ, lambda status, headers, exc_info=None: status_line.append(status))
+            b''.join(body)
+            if hasattr(body, 'close'):
+                body.close()
+            return int(status_line[0].split(' ', 1)[0])
+        return call
+
+    def load_threads(self, call, concurrency, requests):
+        remaining = iter(range(requests))
+        lock = threading.Lock()
+        timings, statuses = [], []
+
+        def worker():
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                started = time.perf_counter()
+                code = call()
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    timings.append(elapsed)
+                    statuses.append(code)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        return timings, statuses, time.perf_counter() - started
+
+    # -----------------------------
+    # ASGI: a coroutine per request in flight
+    # -----------------------------
+    async def load_asgi(self, path, token, concurrency, requests):
+        application = AthleteASGIHandler()
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'root_path': '', 'query_string': b'',
+            'headers': [(b'host', b'testserver'), (b'authorization', f'Bearer {token}'.encode())],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 10000),
+        }
+
+        async def call():
+            statuses, requested = [], []
+
+            async def receive():
+                if not requested:
+                    requested.append(True)
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # The client stays connected; Django cancels this once it has responded
+                await asyncio.get_running_loop().create_future()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+
+            await application(dict(scope), receive, send)
+            return statuses[0]
+
+        await call()
+        remaining = iter(range(requests))
+        timings, statuses = [], []
+
+        async def worker():
+            while next(remaining, None) is not None:
+                started = time.perf_counter()
+                statuses.append(await call())
+                timings.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return timings, statuses, time.perf_counter() - started
+
+    def report(self, results, modes):
+        baseline = modes[0]
+        self.stdout.write(f"\n{'endpoint':<20}" + ''.join(f"{mode + ' req/s':>18}" for mode in modes))
+        for name, _, _ in ENDPOINTS:
+            cells = []
+            for mode in modes:
+                rate = results[mode][name]['requests_per_second']
+                base = results[baseline][name]['requests_per_second']
+                cells.append(f"{rate:>9.1f} ({rate / base:>4.2f}x)" if mode != baseline else f"{rate:>18.1f}")
+            self.stdout.write(f"{name:<20}" + ''.join(f"{cell:>18}" for cell in cells))
@@ -0,0 +1,235 @@
+import json
+import platform
+import statistics
+import time
+from itertools import count
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import synthetic
+from accounts.models import HealthMetric, InjuryReport, NutritionLog, WorkoutLog
+
+API = '/api/accounts'
+
+# Most queries a warm request to each endpoint may run; exceeding one fails the run
+QUERY_BUDGETS = {
+    'register': 9,
+    'login': 1,
+    'me': 0,
+    'me_not_modified': 0,
+    'onboarding': 2,
+    'onboarding_update': 3,
+    'onboarding_not_modified': 1,
+    'dashboard': 2,
+    'risk': 1,
+    'team_forecast': 1,
+    'stress_map': 0,
+    'coach_roster': 1,
+    'admin_stats': 1,
+    'nutrition_summary': 1,
+    'nutrition_foods': 1,
+    'team_nutrition_foods': 1,
+    'team_injury_analytics': 1,
+    'sync_page': 5,
+    'workout_list': 2,
+    'workout_detail': 2,
+    'health_metric_list': 2,
+    'health_metric_detail': 2,
+    'nutrition_list': 2,
+    'nutrition_detail': 2,
+    'injury_list': 2,
+    'injury_detail': 2,
+    'workout_list_not_modified': 1,
+    'health_metric_list_not_modified': 1,
+    'nutrition_list_not_modified': 1,
+    'injury_list_not_modified': 1,
+}
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[max(0, int(round(len(ordered) * fraction)) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic users and history, then record p50/p95 latency and query "
+        "counts for every account endpoint. Runs inside a transaction that is "
+        "rolled back unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--athletes', type=int, default=50)
+        parser.add_argument('--coaches', type=int, default=5)
+        parser.add_argument('--admins', type=int, default=1)
+        parser.add_argument('--years', type=int, default=2, help="Years of history per athlete.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the generator.")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per endpoint.")
+        parser.add_argument('--output', default='endpoint-benchmark.json', help="Where to write the JSON results.")
+        parser.add_argument('--baseline', help="Earlier results file to compare against.")
+        parser.add_argument('--keep', action='store_true', help="Commit the synthetic data instead of rolling back.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']):
+            started = time.perf_counter()
+            users, counts = synthetic.seed(
+                athletes=options['athletes'], coaches=options['coaches'], admins=options['admins'],
+                years=options['years'], random_seed=options['seed'], prefix=f'bench{int(time.time())}',
+            )
+            seed_seconds = time.perf_counter() - started
+            self.stdout.write(f"Seeded {counts} in {seed_seconds:.1f}s.")
+
+            results = {}
+            for name, role, method, path, payload, revalidate in self.endpoints(users):
+                results[name] = self.measure(
+                    users[role][0] if role else None, method, path, payload, options['repeat'], revalidate,
+                )
+                results[name].update({'method': method.upper(), 'path': path})
+                self.stdout.write(
+                    f"{name:<32} p50 {results[name]['p50_ms']:>8.2f} ms  p95 {results[name]['p95_ms']:>8.2f} ms  "
+                    f"{results[name]['queries']:>3} queries  HTTP {results[name]['status']}"
+                )
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'repeat': options['repeat'],
+                'scale': {key: options[key] for key in ('athletes', 'coaches', 'admins', 'years', 'seed')},
+                'rows': counts,
+                'seed_seconds': round(seed_seconds, 2),
+            },
+            'endpoints': results,
+        }
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+        if options['baseline']:
+            self.compare(options['baseline'], results)
+
+        over_budget = [
+            f"{name} ({result['queries']} > {QUERY_BUDGETS[name]})"
+            for name, result in results.items()
+            if name in QUERY_BUDGETS and result['queries'] > QUERY_BUDGETS[name]
+        ]
+        failed = [name for name, result in results.items() if result['status'] >= 400]
+        if over_budget or failed:
+            raise CommandError(
+                "; ".join(filter(None, [
+                    over_budget and f"Over query budget: {', '.join(over_budget)}",
+                    failed and f"Failed requests: {', '.join(failed)}",
+                ]))
+            )
+
+    def endpoints(self, users):
+        athlete = users['athlete'][0]
+        emails = count()
+
+        def register():
+            return {
+                'full_name': 'Bench Athlete', 'email': f'register-{next(emails)}-{time.time_ns()}@bench.example.com',
+                'password': synthetic.PASSWORD, 'confirm_password': synthetic.PASSWORD, 'role': 'athlete',
+            }
+
+        details = {
+            name: model.objects.filter(user=athlete).order_by('-pk').values_list('pk', flat=True).first()
+            for name, model in (
+                ('workouts', WorkoutLog), ('health-metrics', HealthMetric),
+                ('nutrition', NutritionLog), ('injuries', InjuryReport),
+            )
+        }
+        # Entries ending in True replay the previous ETag, measuring the 304 path
+        endpoints = [
+            ('register', None, 'post', f'{API}/register/', register, False),
+            ('login', None, 'post', f'{API}/login/',
+             lambda: {'email': athlete.email, 'password': synthetic.PASSWORD}, False),
+            ('me', 'athlete', 'get', f'{API}/me/', None, False),
+            ('me_not_modified', 'athlete', 'get', f'{API}/me/', None, True),
+            ('onboarding', 'athlete', 'get', f'{API}/onboarding/', None, False),
+            ('onboarding_update', 'athlete', 'patch', f'{API}/onboarding/', lambda: {'motivation': 'Benchmark'}, False),
+            ('onboarding_not_modified', 'athlete', 'get', f'{API}/onboarding/', None, True),
+            ('dashboard', 'athlete', 'get', f'{API}/dashboard/', None, False),
+            ('risk', 'athlete', 'get', f'{API}/risk/', None, False),
+            ('team_forecast', 'coach', 'get', f'{API}/forecast/?scope=team', None, False),
+            ('stress_map', 'athlete', 'get', f'{API}/stress-map/', None, False),
+            ('coach_roster', 'coach', 'get', f'{API}/coach/roster/', None, False),
+            ('admin_stats', 'admin', 'get', f'{API}/admin/stats/', None, False),
+            ('nutrition_summary', 'athlete', 'get', f'{API}/nutrition/summary/?period=week', None, False),
+            ('nutrition_foods', 'athlete', 'get', f'{API}/nutrition/foods/', None, False),
+            ('team_nutrition_foods', 'coach', 'get', f'{API}/nutrition/foods/?scope=team&order=calories', None, False),
+            ('team_injury_analytics', 'coach', 'get', f'{API}/injuries/analytics/?scope=team', None, False),
+            ('sync_page', 'athlete', 'get', f'{API}/sync/?limit=500', None, False),
+        ]
+        for resource, name in (
+            ('workouts', 'workout'), ('health-metrics', 'health_metric'),
+            ('nutrition', 'nutrition'), ('injuries', 'injury'),
+        ):
+            endpoints.append((f'{name}_list', 'athlete', 'get', f'{API}/{resource}/', None, False))
+            endpoints.append((f'{name}_list_not_modified', 'athlete', 'get', f'{API}/{resource}/', None, True))
+            if details[resource]:
+                endpoints.append(
+                    (f'{name}_detail', 'athlete', 'get', f'{API}/{resource}/{details[resource]}/', None, False)
+                )
+        return endpoints
+
+    def measure(self, user, method, path, payload, repeat, revalidate=False):
+        client = APIClient()
+        headers = {}
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+        client.credentials(**headers)
+
+        def call():
+            return getattr(client, method)(path, payload() if payload else None, format='json')
+
+        # Warm caches first so the counted request shows the steady state
+        warm = call()
+        if revalidate and warm.has_header('ETag'):
+            client.credentials(**headers, HTTP_IF_NONE_MATCH=warm['ETag'])
+        with CaptureQueriesContext(connection) as queries:
+            response = call()
+        # captured_queries is read lazily from a log that the next request resets
+        query_count = len(queries)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return {
+            'status': response.status_code,
+            'queries': query_count,
+            'p50_ms': round(statistics.median(timings), 3) if timings else None,
+            'p95_ms': round(percentile(timings, 0.95), 3) if timings else None,
+            'mean_ms': round(statistics.fmean(timings), 3) if timings else None,
+        }
+
+    def compare(self, path, results):
+        try:
+            with open(path) as handle:
+                baseline = json.load(handle)['endpoints']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Could not read baseline {path}: {exc}")
+
+        self.stdout.write(f"\n{'endpoint':<32} {'p50 change':>11} {'p95 change':>11} {'queries':>9}")
+        for name, result in results.items():
+            before = baseline.get(name)
+            if not before or not before.get('p50_ms') or not result['p50_ms']:
+                continue
+            p50 = (result['p50_ms'] / before['p50_ms'] - 1) * 100
+            p95 = (result['p95_ms'] / before['p95_ms'] - 1) * 100
+            self.stdout.write(
+                f"{name:<32} {p50:>+10.1f}% {p95:>+10.1f}% {before['queries']:>4} -> {result['queries']}"
+            )
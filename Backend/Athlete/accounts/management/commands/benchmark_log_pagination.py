@@ -0,0 +1,79 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import CustomUser, WorkoutLog
+from accounts.pagination import KeysetPagination
+from accounts.views import WorkoutLogListCreateView
+
+ACTIVITIES_PER_DAY = 20
+SEED_BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        "Time first and deep workout-log pages as one user's history grows. "
+        "Runs inside a transaction that is rolled back, so nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,10000,100000,1000000',
+                            help="Comma-separated history sizes (rows per user).")
+        parser.add_argument('--repeat', type=int, default=20, help="Requests timed per page.")
+        parser.add_argument('--page-size', type=int, default=KeysetPagination.page_size)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        with transaction.atomic():
+            user = CustomUser.objects.create_user('pagination-bench@example.com', 'Pagination Bench')
+            self.stdout.write(f"{'rows':>10} {'first p50 ms':>13} {'first p95 ms':>13} {'deep p50 ms':>12} {'deep p95 ms':>12}")
+
+            seeded = 0
+            for size in sizes:
+                self.seed(user, seeded, size)
+                seeded = size
+                first = self.time_page(user, None, options)
+                middle = WorkoutLog.objects.filter(user=user).order_by('-date', '-id')[size // 2]
+                deep = self.time_page(user, KeysetPagination().encode_cursor((middle.date, middle.pk)), options)
+                self.stdout.write(
+                    f"{size:>10} {first[0]:>13.2f} {first[1]:>13.2f} {deep[0]:>12.2f} {deep[1]:>12.2f}"
+                )
+
+            transaction.set_rollback(True)
+
+    def seed(self, user, start, end):
+        base = date(2000, 1, 1)
+        for batch_start in range(start, end, SEED_BATCH_SIZE):
+            WorkoutLog.objects.bulk_create([
+                WorkoutLog(
+                    user=user,
+                    date=base + timedelta(days=index // ACTIVITIES_PER_DAY),
+                    activity_type=f'activity-{index % ACTIVITIES_PER_DAY}',
+                    duration_minutes=30 + index % 60,
+                    average_heart_rate=120 + index % 50,
+                )
+                for index in range(batch_start, min(batch_start + SEED_BATCH_SIZE, end))
+            ])
+
+    def time_page(self, user, cursor, options):
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        view = WorkoutLogListCreateView.as_view()
+        params = {'page_size': options['page_size']}
+        if cursor:
+            params['cursor'] = cursor
+
+        timings = []
+        for _ in range(options['repeat']):
+            request = factory.get('/api/accounts/workouts/', params)
+            force_authenticate(request, user=user)
+            started = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        return statistics.median(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
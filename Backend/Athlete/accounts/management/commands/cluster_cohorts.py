@@ -0,0 +1,69 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts import cohorts
+from accounts.models import AthleteCohort, Onboarding
+
+
+class Command(BaseCommand):
+    help = (
+        "Group active athletes into cohorts of similar onboarding profiles "
+        "(spherical k-means over the cohort index) and store the assignment."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cohorts', type=int, default=8, help="Number of cohorts to form.")
+        parser.add_argument('--iterations', type=int, default=50, help="Upper bound on k-means iterations.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for the k-means++ start.")
+
+    def handle(self, *args, **options):
+        if options['cohorts'] < 1:
+            raise CommandError("--cohorts must be at least 1.")
+
+        started = time.perf_counter()
+        user_ids, matrix = cohorts.index.snapshot()
+        if not len(user_ids):
+            raise CommandError("No active athlete has an onboarding profile to cluster.")
+        labels, similarity, _ = cohorts.cluster(matrix, options['cohorts'], options['iterations'], options['seed'])
+
+        computed_at = timezone.now()
+        with transaction.atomic():
+            AthleteCohort.objects.all().delete()
+            AthleteCohort.objects.bulk_create([
+                AthleteCohort(user_id=int(user_id), cohort=int(label), similarity=round(float(score), 4),
+                              computed_at=computed_at)
+                for user_id, label, score in zip(user_ids, labels, similarity)
+            ], batch_size=2000)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Assigned {len(user_ids)} athletes to {labels.max() + 1} cohorts in {elapsed:.2f}s."
+        ))
+        self.describe(dict(zip(user_ids.tolist(), labels.tolist())), similarity, labels)
+
+    def describe(self, assigned, similarity, labels):
+        sports, levels = {}, {}
+        profiles = Onboarding.objects.filter(user__role='athlete', user__is_active=True).values_list(
+            'user_id', 'sports_activities', 'experience_level'
+        )
+        for user_id, activities, level in profiles.iterator(chunk_size=5000):
+            label = assigned.get(user_id)
+            if label is None:
+                continue
+            sports.setdefault(label, Counter()).update(activities or [])
+            levels.setdefault(label, Counter())[level] += 1
+
+        for label in range(labels.max() + 1):
+            members = labels == label
+            if not members.any():
+                continue
+            top_sports = ', '.join(sport for sport, _ in sports.get(label, Counter()).most_common(2)) or '-'
+            top_level = levels.get(label, Counter()).most_common(1)
+            self.stdout.write(
+                f"  cohort {label:>3}: {int(members.sum()):>6} athletes  cohesion {similarity[members].mean():.3f}  "
+                f"{top_sports}; mostly {top_level[0][0] if top_level else '-'}"
+            )
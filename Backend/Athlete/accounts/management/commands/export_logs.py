@@ -0,0 +1,64 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from accounts import export
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Stream one log table as CSV or NDJSON for an athlete, a coach's team or every athlete."
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(export.RESOURCES))
+        parser.add_argument('--format', dest='export_format', choices=sorted(export.FORMATS), default='csv')
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument('--athlete', type=int, help="Export a single athlete by user id.")
+        scope.add_argument('--coach', type=int, help="Export every athlete coached by this user id.")
+        scope.add_argument('--all', action='store_true', help="Export every athlete.")
+        parser.add_argument('--start', help="First date to include (YYYY-MM-DD).")
+        parser.add_argument('--end', help="Last date to include (YYYY-MM-DD).")
+        parser.add_argument('--gzip', action='store_true', help="Compress the output with gzip.")
+        parser.add_argument('--output', '-o', default='-', help="Output file; '-' writes to stdout.")
+
+    def _date(self, options, name):
+        if not options[name]:
+            return None
+        value = parse_date(options[name])
+        if value is None:
+            raise CommandError(f"--{name} must be a date in YYYY-MM-DD format.")
+        return value
+
+    def handle(self, *args, **options):
+        if options['athlete']:
+            users = CustomUser.objects.filter(pk=options['athlete'])
+        elif options['coach']:
+            users = CustomUser.objects.filter(coach_id=options['coach'], role='athlete')
+        else:
+            users = CustomUser.objects.filter(role='athlete')
+
+        chunks = export.stream(
+            options['resource'], options['export_format'], users,
+            self._date(options, 'start'), self._date(options, 'end'), compress=options['gzip'],
+        )
+
+        started = time.perf_counter()
+        written = 0
+        to_stdout = options['output'] == '-'
+        out = sys.stdout.buffer if to_stdout else open(options['output'], 'wb')
+        try:
+            for chunk in chunks:
+                data = chunk if isinstance(chunk, bytes) else chunk.encode()
+                out.write(data)
+                written += len(data)
+        finally:
+            if to_stdout:
+                out.flush()
+            else:
+                out.close()
+
+        self.stderr.write(self.style.SUCCESS(
+            f"Wrote {written:,} bytes in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from accounts import forecasts
+from accounts.imports import default_workers
+
+
+class Command(BaseCommand):
+    help = (
+        "Fit each active athlete's fitness-fatigue model and store next week's load and "
+        "readiness forecast. Athletes already forecast for the date are skipped, so an "
+        "interrupted run picks up where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', help="Forecast from this date (YYYY-MM-DD); defaults to today.")
+        parser.add_argument('--workers', type=int, default=default_workers(),
+                            help="Fitting processes; 1 fits in this process.")
+        parser.add_argument('--chunk-size', type=int, default=forecasts.CHUNK_SIZE,
+                            help="Athletes loaded and fitted per task.")
+        parser.add_argument('--restart', action='store_true',
+                            help="Recompute athletes already forecast for the date.")
+
+    def handle(self, *args, **options):
+        as_of = None
+        if options['as_of']:
+            as_of = parse_date(options['as_of'])
+            if as_of is None:
+                raise CommandError("--as-of must be a date in YYYY-MM-DD format.")
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError("--workers and --chunk-size must be at least 1.")
+
+        def progress(done, total):
+            self.stdout.write(f"Forecast {done}/{total} athletes.")
+
+        started = time.perf_counter()
+        forecast = forecasts.run(
+            as_of=as_of, workers=options['workers'], chunk_size=options['chunk_size'],
+            restart=options['restart'], progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+        rate = forecast / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Forecast {forecast} athletes in {elapsed:.2f}s ({rate:,.0f} athletes/s)."
+        ))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import imports
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Import GPX, TCX and CSV activity files (or directories / zip archives of them) for one user."
+
+    def add_arguments(self, parser):
+        parser.add_argument('user', help="User id or email the workouts belong to.")
+        parser.add_argument('paths', nargs='+', help="Files, directories or .zip archives.")
+        parser.add_argument('--workers', type=int, default=imports.default_workers(),
+                            help="Parser processes.")
+        parser.add_argument('--batch-size', type=int, default=imports.BATCH_SIZE,
+                            help="Workouts written per bulk_create transaction.")
+
+    def handle(self, *args, **options):
+        lookup = {'pk': options['user']} if options['user'].isdigit() else {'email__iexact': options['user']}
+        user = CustomUser.objects.filter(**lookup).first()
+        if user is None:
+            raise CommandError(f"No user matches '{options['user']}'.")
+
+        sources = imports.path_sources(options['paths'])
+        if not sources:
+            raise CommandError("No .gpx, .tcx or .csv files found.")
+
+        def progress(summary):
+            self.stdout.write(
+                f"{summary['processed']}/{summary['files']} files, {summary['created']} created, "
+                f"{summary['files_per_second']} files/s"
+            )
+
+        summary = imports.import_workouts(
+            user, sources, workers=options['workers'], batch_size=options['batch_size'], progress=progress,
+        )
+        for error in summary['errors']:
+            self.stderr.write(f"{error['file']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {summary['created']} workouts from {summary['processed']} files "
+            f"({summary['duplicates']} duplicates, {len(summary['errors'])} failed) "
+            f"in {summary['elapsed_seconds']}s ({summary['workouts_per_second']} workouts/s)."
+        ))
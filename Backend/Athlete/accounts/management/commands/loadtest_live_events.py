@@ -0,0 +1,100 @@
+import asyncio
+import resource
+import threading
+import time
+import uuid
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts import live
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many idle live-event streams against the ASGI application in this "
+        "process and report connect time, memory, idle CPU and fan-out latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=2000)
+        parser.add_argument('--idle-seconds', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        user = CustomUser.objects.create_user(f'live-loadtest-{uuid.uuid4().hex}@example.com', 'Live Load Test')
+        try:
+            token = str(AccessToken.for_user(user))
+            report = asyncio.run(self.run(user.id, token, options['connections'], options['idle_seconds']))
+        finally:
+            user.delete()
+
+        for label, value in report:
+            self.stdout.write(f"{label:<28} {value}")
+
+    async def run(self, user_id, token, count, idle_seconds):
+        application = get_asgi_application()
+        disconnect = asyncio.Event()
+        connected = [asyncio.Event() for _ in range(count)]
+        received = [asyncio.Event() for _ in range(count)]
+        statuses = []
+
+        def client(index):
+            async def receive():
+                if not hasattr(receive, 'sent'):
+                    receive.sent = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+                    return
+                body = message.get('body', b'').decode()
+                if 'event: ready' in body:
+                    connected[index].set()
+                if 'event: loadtest' in body:
+                    received[index].set()
+
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': '/api/accounts/live/',
+                'raw_path': b'/api/accounts/live/', 'root_path': '',
+                'query_string': f'token={token}'.encode(),
+                'headers': [(b'host', b'localhost')],
+                'server': ('localhost', 8000), 'client': ('127.0.0.1', 10000 + index),
+            }
+            return application(scope, receive, send)
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(client(index)) for index in range(count)]
+        await asyncio.gather(*(event.wait() for event in connected))
+        connect_seconds = time.perf_counter() - started
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        cpu_before = resource.getrusage(resource.RUSAGE_SELF).ru_utime
+        await asyncio.sleep(idle_seconds)
+        idle_cpu = resource.getrusage(resource.RUSAGE_SELF).ru_utime - cpu_before
+
+        # Publish from another thread, the way model signals do
+        published = time.perf_counter()
+        threading.Thread(target=live.broker.publish, args=(user_id, {'type': 'loadtest'})).start()
+        await asyncio.gather(*(event.wait() for event in received))
+        fanout_ms = (time.perf_counter() - published) * 1000
+
+        disconnect.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return [
+            ('connections', count),
+            ('non-200 responses', sum(1 for status in statuses if status != 200)),
+            ('connect all (s)', f"{connect_seconds:.2f}"),
+            ('peak RSS growth (MiB)', f"{(rss_after - rss_before) / 1024:.1f}"),
+            ('RSS per connection (KiB)', f"{(rss_after - rss_before) / max(count, 1):.1f}"),
+            (f'idle CPU over {idle_seconds:g}s (s)', f"{idle_cpu:.3f}"),
+            ('fan-out to all (ms)', f"{fanout_ms:.1f}"),
+            ('streams left open', live.broker.connection_count()),
+        ]
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import provisioning
+from accounts.imports import default_workers
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Create athlete accounts from a CSV file with email, full_name and optional password and "
+        "onboarding columns (list fields separated by ';'). Every row is validated first; if any "
+        "row is invalid nothing is created."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header row.")
+        parser.add_argument('--coach', help="Coach id or email the athletes are assigned to.")
+        parser.add_argument('--workers', type=int, default=default_workers(),
+                            help="Password hashing processes.")
+
+    def handle(self, *args, **options):
+        coach = None
+        if options['coach']:
+            lookup = {'pk': options['coach']} if options['coach'].isdigit() else {'email__iexact': options['coach']}
+            coach = CustomUser.objects.filter(role='coach', **lookup).first()
+            if coach is None:
+                raise CommandError(f"No coach matches '{options['coach']}'.")
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as handle:
+                rows = provisioning.csv_rows(handle)
+        except OSError as exc:
+            raise CommandError(f"Could not read {options['path']}: {exc}")
+        if not rows:
+            raise CommandError("The file has no rows.")
+
+        started = time.perf_counter()
+        try:
+            users = provisioning.provision(rows, coach=coach, workers=options['workers'])
+        except provisioning.ProvisioningFailed as exc:
+            for error in exc.errors:
+                # Line 1 is the header
+                where = f"line {error['index'] + 2}" if error['index'] is not None else "file"
+                self.stderr.write(f"{where}: {error['errors']}")
+            raise CommandError(f"{len(exc.errors)} invalid rows; no athletes were created.")
+        elapsed = time.perf_counter() - started
+        rate = len(users) / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(users)} athletes in {elapsed:.2f}s ({rate:,.0f} athletes/s)."
+        ))
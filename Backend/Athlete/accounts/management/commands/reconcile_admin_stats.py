@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the admin dashboard counters from the user and workout tables."
+
+    def handle(self, *args, **options):
+        snapshot = stats.reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled: {snapshot.total_users} users, {snapshot.active_athletes} active athletes, "
+            f"{snapshot.active_coaches} active coaches, {snapshot.total_workouts} workouts."
+        ))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from accounts import risk
+
+
+class Command(BaseCommand):
+    help = "Rescore acute:chronic workload, monotony, strain and injury risk for every active athlete."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', help="Score as of this date (YYYY-MM-DD); defaults to today.")
+        parser.add_argument('--chunk-size', type=int, default=risk.DEFAULT_CHUNK_SIZE,
+                            help="Athletes loaded and scored per vectorized pass.")
+
+    def handle(self, *args, **options):
+        as_of = None
+        if options['as_of']:
+            as_of = parse_date(options['as_of'])
+            if as_of is None:
+                raise CommandError("--as-of must be a date in YYYY-MM-DD format.")
+
+        started = time.perf_counter()
+        scored = risk.score_all(as_of=as_of, chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - started
+        rate = scored / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {scored} athletes in {elapsed:.2f}s ({rate:,.0f} athletes/s)."
+        ))
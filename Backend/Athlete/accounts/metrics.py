@@ -0,0 +1,164 @@
+"""
+In-process request metrics with Prometheus text exposition.
+
+RequestMetricsMiddleware records one observation per request into the
+module-level `registry`: latency, DB query count and time, response size
+and status, labelled by URL name. Counters live in each worker process;
+scrape every worker (or run one per host) to see the whole picture.
+"""
+import hmac
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+METRICS_DEFAULTS = {
+    'ENABLED': True,
+    'TOKEN': None,                  # lets scrapers in with "Authorization: Bearer <token>"; staff always may
+    'SLOW_REQUEST_SECONDS': None,   # log the SQL of requests slower than this
+    'SLOW_REQUEST_MAX_QUERIES': 100,
+}
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def config():
+    return {**METRICS_DEFAULTS, **getattr(settings, 'ACCOUNTS_METRICS', {})}
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class RouteStats:
+    __slots__ = ('latency', 'queries', 'db_seconds', 'response_bytes', 'statuses')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_seconds = 0.0
+        self.response_bytes = 0
+        self.statuses = {}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route, method, status, seconds, queries, db_seconds, response_bytes):
+        key = (route, method)
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats()
+            stats.latency.observe(seconds)
+            stats.queries.observe(queries)
+            stats.db_seconds += db_seconds
+            stats.response_bytes += response_bytes
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def snapshot(self):
+        """Copy of {(route, method): RouteStats} taken under the lock."""
+        with self._lock:
+            copied = {}
+            for key, stats in self._routes.items():
+                clone = RouteStats()
+                for name in ('latency', 'queries'):
+                    source, target = getattr(stats, name), getattr(clone, name)
+                    target.counts, target.total, target.count = list(source.counts), source.total, source.count
+                clone.db_seconds = stats.db_seconds
+                clone.response_bytes = stats.response_bytes
+                clone.statuses = dict(stats.statuses)
+                copied[key] = clone
+            return copied
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+registry = Registry()
+
+
+# -----------------------------
+# Prometheus exposition
+# -----------------------------
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _histogram_lines(name, histogram, labels):
+    lines, cumulative = [], 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{_labels(**labels, le=bound)} {cumulative}')
+    lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {histogram.count}')
+    lines.append(f'{name}_sum{_labels(**labels)} {histogram.total}')
+    lines.append(f'{name}_count{_labels(**labels)} {histogram.count}')
+    return lines
+
+
+def render(snapshot):
+    sections = {
+        'http_requests_total': ('counter', 'Requests by URL name, method and status.', []),
+        'http_request_duration_seconds': ('histogram', 'Request latency in seconds.', []),
+        'http_request_db_queries': ('histogram', 'Database queries per request.', []),
+        'http_request_db_seconds_total': ('counter', 'Time spent in database queries.', []),
+        'http_response_bytes_total': ('counter', 'Response body bytes (non-streaming responses).', []),
+    }
+    for (route, method), stats in sorted(snapshot.items()):
+        labels = {'route': route, 'method': method}
+        for status, count in sorted(stats.statuses.items()):
+            sections['http_requests_total'][2].append(
+                f'http_requests_total{_labels(**labels, status=status)} {count}'
+            )
+        sections['http_request_duration_seconds'][2].extend(
+            _histogram_lines('http_request_duration_seconds', stats.latency, labels)
+        )
+        sections['http_request_db_queries'][2].extend(
+            _histogram_lines('http_request_db_queries', stats.queries, labels)
+        )
+        sections['http_request_db_seconds_total'][2].append(
+            f'http_request_db_seconds_total{_labels(**labels)} {stats.db_seconds}'
+        )
+        sections['http_response_bytes_total'][2].append(
+            f'http_response_bytes_total{_labels(**labels)} {stats.response_bytes}'
+        )
+
+    lines = []
+    for name, (kind, help_text, samples) in sections.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples)
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus text-format scrape endpoint for this worker's counters.
+
+    Open to logged-in staff and, when TOKEN is set, to requests bearing it.
+    """
+    token = config()['TOKEN']
+    header = request.headers.get('Authorization', '')
+    scraper = bool(token) and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+    if not (scraper or request.user.is_staff):
+        return HttpResponseForbidden()
+    return HttpResponse(render(registry.snapshot()), content_type='text/plain; version=0.0.4; charset=utf-8')
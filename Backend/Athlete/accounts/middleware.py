@@ -0,0 +1,125 @@
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics
+
+slow_request_logger = logging.getLogger('accounts.slow_requests')
+
+# The QueryObserver of the request being served. sync_to_async runs its
+# function in a copy of the caller's context, so the queries an async view
+# makes from a worker thread see the observer of their own request.
+current_observer = ContextVar('current_observer', default=None)
+
+
+class QueryObserver:
+    """execute_wrapper that counts and times queries, optionally keeping their SQL."""
+
+    def __init__(self, capture_sql=False, max_statements=0):
+        self.count = 0
+        self.seconds = 0.0
+        self.capture_sql = capture_sql
+        self.max_statements = max_statements
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            if self.capture_sql and len(self.statements) < self.max_statements:
+                self.statements.append((elapsed, sql))
+
+
+def observe_query(execute, sql, params, many, context):
+    """execute_wrapper on every connection; reports to the current request's observer, if any."""
+    observer = current_observer.get()
+    if observer is None:
+        return execute(sql, params, many, context)
+    return observer(execute, sql, params, many, context)
+
+
+def install_query_observer(connection):
+    """Called for every new connection (see accounts.signals), including those of worker threads."""
+    if observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(observe_query)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, status, response size and DB queries per URL name into
+    accounts.metrics.registry, and log the SQL of slow requests when
+    ACCOUNTS_METRICS['SLOW_REQUEST_SECONDS'] is set.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        options = metrics.config()
+        if not options['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_seconds = options['SLOW_REQUEST_SECONDS']
+        self.max_statements = options['SLOW_REQUEST_MAX_QUERIES']
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        observer = QueryObserver(self.slow_seconds is not None, self.max_statements)
+        started = time.perf_counter()
+        token = current_observer.set(observer)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_observer.reset(token)
+        self.record(request, response, time.perf_counter() - started, observer)
+        return response
+
+    async def __acall__(self, request):
+        observer = QueryObserver(self.slow_seconds is not None, self.max_statements)
+        started = time.perf_counter()
+        token = current_observer.set(observer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_observer.reset(token)
+        self.record(request, response, time.perf_counter() - started, observer)
+        return response
+
+    def record(self, request, response, elapsed, observer):
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        if response.streaming:
+            size = 0
+        elif response.has_header('Content-Length'):
+            size = int(response['Content-Length'])
+        else:
+            size = len(response.content)
+
+        metrics.registry.observe(
+            route, request.method, response.status_code, elapsed,
+            observer.count, observer.seconds, size,
+        )
+        if self.slow_seconds is not None and elapsed >= self.slow_seconds:
+            self.log_slow_request(request, response, route, elapsed, observer)
+
+    def log_slow_request(self, request, response, route, elapsed, observer):
+        statements = observer.statements
+        lines = [f'  {seconds * 1000:8.2f} ms  {sql}' for seconds, sql in statements]
+        if observer.count > len(statements):
+            lines.append(f'  ... {observer.count - len(statements)} more queries')
+        slow_request_logger.warning(
+            "Slow request %s %s (%s) -> %s in %.3fs, %s queries, %.3fs in DB\n%s",
+            request.method, request.path, route, response.status_code, elapsed,
+            observer.count, observer.seconds,
+            '\n'.join(lines),
+        )
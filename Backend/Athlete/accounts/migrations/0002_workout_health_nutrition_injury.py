@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InjuryReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('injury_type', models.CharField(max_length=100)),
+                ('severity', models.CharField(choices=[('minor', 'Minor'), ('moderate', 'Moderate'), ('severe', 'Severe')], max_length=10)),
+                ('description', models.TextField()),
+                ('date_occurred', models.DateField()),
+                ('recovery_status', models.CharField(default='recovering', max_length=50)),
+                ('medical_attention', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='injury_reports', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NutritionLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('meal_type', models.CharField(max_length=50)),
+                ('food_items', models.JSONField(default=list)),
+                ('calories', models.PositiveIntegerField()),
+                ('protein_g', models.DecimalField(decimal_places=1, default=0, max_digits=6)),
+                ('carbs_g', models.DecimalField(decimal_places=1, default=0, max_digits=6)),
+                ('fats_g', models.DecimalField(decimal_places=1, default=0, max_digits=6)),
+                ('water_ml', models.PositiveIntegerField(default=0)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='nutrition_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HealthMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric_type', models.CharField(choices=[('hrv', 'Heart Rate Variability'), ('sleep', 'Sleep Hours'), ('hydration', 'Hydration %'), ('stress', 'Stress Level'), ('resting_hr', 'Resting Heart Rate'), ('training_load', 'Training Load'), ('weight', 'Weight'), ('body_fat', 'Body Fat %'), ('muscle_mass', 'Muscle Mass')], max_length=20)),
+                ('value', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('unit', models.CharField(default='', max_length=20)),
+                ('date_recorded', models.DateField()),
+                ('source', models.CharField(default='manual', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='health_metrics', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'metric_type', 'date_recorded')},
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkoutLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('activity_type', models.CharField(max_length=100)),
+                ('duration_minutes', models.PositiveIntegerField()),
+                ('distance_km', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True)),
+                ('calories_burned', models.PositiveIntegerField(blank=True, null=True)),
+                ('average_heart_rate', models.PositiveIntegerField(blank=True, null=True)),
+                ('max_heart_rate', models.PositiveIntegerField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workout_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'date', 'activity_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_workout_health_nutrition_injury'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('workout_count', models.PositiveIntegerField(default=0)),
+                ('workout_minutes', models.PositiveIntegerField(default=0)),
+                ('training_load', models.FloatField(default=0)),
+                ('hrv', models.FloatField(blank=True, null=True)),
+                ('sleep', models.FloatField(blank=True, null=True)),
+                ('hydration', models.FloatField(blank=True, null=True)),
+                ('stress', models.FloatField(blank=True, null=True)),
+                ('resting_hr', models.FloatField(blank=True, null=True)),
+                ('acute_load', models.FloatField(default=0)),
+                ('chronic_load', models.FloatField(default=0)),
+                ('acwr', models.FloatField(blank=True, null=True)),
+                ('recovery_score', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('training_readiness', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('injury_risk', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_customuser_coach'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('active_athletes', models.PositiveIntegerField(default=0)),
+                ('active_coaches', models.PositiveIntegerField(default=0)),
+                ('total_workouts', models.PositiveBigIntegerField(default=0)),
+                ('signups_by_month', models.JSONField(default=dict)),
+                ('avg_injury_risk', models.FloatField(blank=True, null=True)),
+                ('low_risk_count', models.PositiveIntegerField(default=0)),
+                ('medium_risk_count', models.PositiveIntegerField(default=0)),
+                ('high_risk_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'platform stats',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_platformstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healthmetric',
+            index=models.Index(fields=['user', 'date_recorded', 'id'], name='healthmetric_user_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='injuryreport',
+            index=models.Index(fields=['user', 'date_occurred', 'id'], name='injuryreport_user_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='nutritionlog',
+            index=models.Index(fields=['user', 'date', 'id'], name='nutritionlog_user_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutlog',
+            index=models.Index(fields=['user', 'date', 'id'], name='workoutlog_user_date_id'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_log_user_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AthleteRiskScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('acute_load', models.FloatField(default=0)),
+                ('chronic_load', models.FloatField(default=0)),
+                ('acwr', models.FloatField(blank=True, null=True)),
+                ('monotony', models.FloatField(blank=True, null=True)),
+                ('strain', models.FloatField(blank=True, null=True)),
+                ('injury_risk', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='risk_score', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_athleteriskscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntradayChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric_type', models.CharField(choices=[('heart_rate', 'Heart Rate'), ('hrv', 'Heart Rate Variability'), ('stress', 'Stress Level'), ('spo2', 'Blood Oxygen %')], max_length=20)),
+                ('date', models.DateField()),
+                ('time_encoding', models.CharField(max_length=8)),
+                ('value_encoding', models.CharField(max_length=8)),
+                ('times', models.BinaryField()),
+                ('values', models.BinaryField()),
+                ('sample_count', models.PositiveIntegerField(default=0)),
+                ('min_value', models.FloatField(blank=True, null=True)),
+                ('max_value', models.FloatField(blank=True, null=True)),
+                ('sum_value', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intraday_chunks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'metric_type', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+GIN_INDEX = 'nutritionlog_food_items_gin'
+NAME_MAX_LENGTH = 100
+
+
+# A frozen copy of accounts.nutrition.parse_food_items, so later changes there
+# do not alter what this migration writes
+def parse_food_items(food_items, meal_calories):
+    foods = []
+    for item in food_items if isinstance(food_items, list) else []:
+        if isinstance(item, dict):
+            name, calories = item.get('name'), item.get('calories')
+        else:
+            name, calories = item, None
+        name = ' '.join(str(name).split()).lower()[:NAME_MAX_LENGTH] if name is not None else ''
+        if not name:
+            continue
+        try:
+            calories = max(0, int(round(float(calories)))) if calories is not None else None
+        except (TypeError, ValueError):
+            calories = None
+        foods.append([name, calories])
+
+    unpriced = [food for food in foods if food[1] is None]
+    if unpriced and meal_calories is not None:
+        remaining = max(0, meal_calories - sum(food[1] for food in foods if food[1] is not None))
+        for food in unpriced:
+            food[1] = remaining // len(unpriced)
+    return foods
+
+
+def index_existing_logs(apps, schema_editor):
+    NutritionLog = apps.get_model('accounts', 'NutritionLog')
+    FoodItem = apps.get_model('accounts', 'FoodItem')
+    rows = []
+    for log in NutritionLog.objects.only('pk', 'user_id', 'date', 'food_items', 'calories').iterator(chunk_size=2000):
+        rows.extend(
+            FoodItem(nutrition_log_id=log.pk, user_id=log.user_id, date=log.date, name=name, calories=calories)
+            for name, calories in parse_food_items(log.food_items, log.calories)
+        )
+        if len(rows) >= 2000:
+            FoodItem.objects.bulk_create(rows)
+            rows = []
+    FoodItem.objects.bulk_create(rows)
+
+
+def create_gin_index(apps, schema_editor):
+    # JSON containment (food_items__contains) is Postgres-only; other backends use FoodItem
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON accounts_nutritionlog USING gin (food_items jsonb_path_ops)'
+        )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {GIN_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_resourceversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FoodItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(max_length=100)),
+                ('calories', models.PositiveIntegerField(blank=True, null=True)),
+                ('nutrition_log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='food_entries', to='accounts.nutritionlog')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='food_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'date', 'name'], name='fooditem_user_date_name'), models.Index(fields=['name', 'date'], name='fooditem_name_date')],
+            },
+        ),
+        migrations.RunPython(index_existing_logs, migrations.RunPython.noop),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_fooditem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AthleteCohort',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort', models.PositiveSmallIntegerField(db_index=True)),
+                ('similarity', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cohort', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,136 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_athletecohort'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('client_id', models.UUIDField(blank=True, null=True)),
+                ('sync_seq', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='healthmetric',
+            name='client_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='healthmetric',
+            name='sync_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='healthmetric',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='injuryreport',
+            name='client_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='injuryreport',
+            name='sync_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='injuryreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='nutritionlog',
+            name='client_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='nutritionlog',
+            name='sync_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='nutritionlog',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='workoutlog',
+            name='client_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='workoutlog',
+            name='sync_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='workoutlog',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='resourceversion',
+            name='resource',
+            field=models.CharField(choices=[('onboarding', 'Onboarding'), ('workouts', 'Workout Logs'), ('health-metrics', 'Health Metrics'), ('nutrition', 'Nutrition Logs'), ('injuries', 'Injury Reports'), ('sync', 'Sync Sequence')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='healthmetric',
+            index=models.Index(fields=['user', 'sync_seq', 'id'], name='healthmetric_user_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='injuryreport',
+            index=models.Index(fields=['user', 'sync_seq', 'id'], name='injuryreport_user_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='nutritionlog',
+            index=models.Index(fields=['user', 'sync_seq', 'id'], name='nutritionlog_user_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutlog',
+            index=models.Index(fields=['user', 'sync_seq', 'id'], name='workoutlog_user_sync'),
+        ),
+        migrations.AddConstraint(
+            model_name='healthmetric',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id__isnull', False)), fields=('user', 'client_id'), name='healthmetric_user_client_id'),
+        ),
+        migrations.AddConstraint(
+            model_name='injuryreport',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id__isnull', False)), fields=('user', 'client_id'), name='injuryreport_user_client_id'),
+        ),
+        migrations.AddConstraint(
+            model_name='nutritionlog',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id__isnull', False)), fields=('user', 'client_id'), name='nutritionlog_user_client_id'),
+        ),
+        migrations.AddConstraint(
+            model_name='workoutlog',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id__isnull', False)), fields=('user', 'client_id'), name='workoutlog_user_client_id'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'sync_seq', 'id'], name='tombstone_user_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'resource', 'object_id'], name='tombstone_user_object'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_sync_tracking'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fooditem',
+            name='nutrition_log',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='food_entries', to='accounts.nutritionlog'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedLogChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(choices=[('workouts', 'Workout Logs'), ('health-metrics', 'Health Metrics'), ('nutrition', 'Nutrition Logs')], max_length=20)),
+                ('month', models.DateField()),
+                ('first_date', models.DateField()),
+                ('last_date', models.DateField()),
+                ('row_count', models.PositiveIntegerField()),
+                ('columns', models.JSONField()),
+                ('data', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_chunks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'resource', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_log_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField()),
+                ('days', models.JSONField(default=list)),
+                ('fitness', models.FloatField(default=0)),
+                ('fatigue', models.FloatField(default=0)),
+                ('tau_fitness', models.PositiveSmallIntegerField()),
+                ('tau_fatigue', models.PositiveSmallIntegerField()),
+                ('k_fitness', models.FloatField(default=0)),
+                ('k_fatigue', models.FloatField(default=0)),
+                ('baseline', models.FloatField(default=0)),
+                ('rmse', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='training_forecast', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
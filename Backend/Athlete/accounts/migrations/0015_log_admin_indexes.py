@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_training_forecast'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='healthmetric',
+            index=models.Index(fields=['date_recorded', 'id'], name='healthmetric_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='healthmetric',
+            index=models.Index(fields=['metric_type', 'date_recorded', 'id'], name='healthmetric_type_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='injuryreport',
+            index=models.Index(fields=['date_occurred', 'id'], name='injuryreport_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='injuryreport',
+            index=models.Index(fields=['severity', 'date_occurred', 'id'], name='injuryreport_severity_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='nutritionlog',
+            index=models.Index(fields=['date', 'id'], name='nutritionlog_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='workoutlog',
+            index=models.Index(fields=['date', 'id'], name='workoutlog_date_id'),
+        ),
+    ]
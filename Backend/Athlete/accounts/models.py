@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 
 # -----------------------------
@@ -37,6 +37,14 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     date_joined = models.DateTimeField(auto_now_add=True)
+    coach = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='athletes',
+        limit_choices_to={'role': 'coach'},
+    )
 
     # Override groups and permissions to prevent clashes
     groups = models.ManyToManyField(
@@ -102,7 +110,35 @@ class Onboarding(models.Model):
         return f"Onboarding for {self.user.email}"
 
 
-class WorkoutLog(models.Model):
+# -----------------------------
+# Sync Tracking
+# -----------------------------
+SYNC_SEQUENCE = 'sync'
+
+
+class SyncedLog(models.Model):
+    """
+    Base for the log models. Every save takes the next number of the owner's
+    sync sequence, so /sync/ can hand out the rows changed since a cursor.
+    """
+    client_id = models.UUIDField(null=True, blank=True)  # set by offline clients on create
+    sync_seq = models.PositiveBigIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # The sequence row stays locked until commit, so one user's writes
+        # become visible in sequence order and a cursor never skips a row
+        with transaction.atomic(using=kwargs.get('using')):
+            self.sync_seq = ResourceVersion.advance(self.user_id, SYNC_SEQUENCE)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'sync_seq', 'updated_at'}
+            super().save(*args, **kwargs)
+
+
+class WorkoutLog(SyncedLog):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='workout_logs')
     date = models.DateField()
     activity_type = models.CharField(max_length=100)
@@ -116,12 +152,23 @@ class WorkoutLog(models.Model):
 
     class Meta:
         unique_together = ['user', 'date', 'activity_type']
+        indexes = [
+            models.Index(fields=['user', 'date', 'id'], name='workoutlog_user_date_id'),
+            models.Index(fields=['user', 'sync_seq', 'id'], name='workoutlog_user_sync'),
+            models.Index(fields=['date', 'id'], name='workoutlog_date_id'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'client_id'], condition=models.Q(client_id__isnull=False),
+                name='workoutlog_user_client_id',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.full_name} - {self.activity_type} on {self.date}"
 
 
-class HealthMetric(models.Model):
+class HealthMetric(SyncedLog):
     METRIC_TYPES = [
         ('hrv', 'Heart Rate Variability'),
         ('sleep', 'Sleep Hours'),
@@ -144,12 +191,24 @@ class HealthMetric(models.Model):
 
     class Meta:
         unique_together = ['user', 'metric_type', 'date_recorded']
+        indexes = [
+            models.Index(fields=['user', 'date_recorded', 'id'], name='healthmetric_user_date_id'),
+            models.Index(fields=['user', 'sync_seq', 'id'], name='healthmetric_user_sync'),
+            models.Index(fields=['date_recorded', 'id'], name='healthmetric_date_id'),
+            models.Index(fields=['metric_type', 'date_recorded', 'id'], name='healthmetric_type_date_id'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'client_id'], condition=models.Q(client_id__isnull=False),
+                name='healthmetric_user_client_id',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.full_name} - {self.metric_type}: {self.value} {self.unit}"
 
 
-class NutritionLog(models.Model):
+class NutritionLog(SyncedLog):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='nutrition_logs')
     date = models.DateField()
     meal_type = models.CharField(max_length=50)  # breakfast, lunch, dinner, snack
@@ -162,11 +221,24 @@ class NutritionLog(models.Model):
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date', 'id'], name='nutritionlog_user_date_id'),
+            models.Index(fields=['user', 'sync_seq', 'id'], name='nutritionlog_user_sync'),
+            models.Index(fields=['date', 'id'], name='nutritionlog_date_id'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'client_id'], condition=models.Q(client_id__isnull=False),
+                name='nutritionlog_user_client_id',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.full_name} - {self.meal_type} on {self.date}"
 
 
-class InjuryReport(models.Model):
+class InjuryReport(SyncedLog):
     SEVERITY_CHOICES = [
         ('minor', 'Minor'),
         ('moderate', 'Moderate'),
@@ -182,5 +254,295 @@ class InjuryReport(models.Model):
     medical_attention = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date_occurred', 'id'], name='injuryreport_user_date_id'),
+            models.Index(fields=['user', 'sync_seq', 'id'], name='injuryreport_user_sync'),
+            models.Index(fields=['date_occurred', 'id'], name='injuryreport_date_id'),
+            models.Index(fields=['severity', 'date_occurred', 'id'], name='injuryreport_severity_date_id'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'client_id'], condition=models.Q(client_id__isnull=False),
+                name='injuryreport_user_client_id',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.full_name} - {self.injury_type} ({self.severity})"
+
+
+# -----------------------------
+# Daily Rollup Model
+# -----------------------------
+class DailyRollup(models.Model):
+    """Per-user, per-day summary maintained from WorkoutLog and HealthMetric writes."""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField()
+
+    # Raw daily values
+    workout_count = models.PositiveIntegerField(default=0)
+    workout_minutes = models.PositiveIntegerField(default=0)
+    training_load = models.FloatField(default=0)
+    hrv = models.FloatField(null=True, blank=True)
+    sleep = models.FloatField(null=True, blank=True)
+    hydration = models.FloatField(null=True, blank=True)
+    stress = models.FloatField(null=True, blank=True)
+    resting_hr = models.FloatField(null=True, blank=True)
+
+    # Rolling-window values
+    acute_load = models.FloatField(default=0)    # 7-day load
+    chronic_load = models.FloatField(default=0)  # 28-day load, as a weekly average
+    acwr = models.FloatField(null=True, blank=True)
+    recovery_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    training_readiness = models.PositiveSmallIntegerField(null=True, blank=True)
+    injury_risk = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['user', 'date']
+
+    def __str__(self):
+        return f"{self.user.full_name} - rollup for {self.date}"
+
+
+# -----------------------------
+# Platform Stats Model
+# -----------------------------
+class PlatformStats(models.Model):
+    """Single-row snapshot behind the admin dashboard, kept current by signals."""
+    total_users = models.PositiveIntegerField(default=0)
+    active_athletes = models.PositiveIntegerField(default=0)
+    active_coaches = models.PositiveIntegerField(default=0)
+    total_workouts = models.PositiveBigIntegerField(default=0)
+    signups_by_month = models.JSONField(default=dict)  # {"2025-01": 42, ...}
+
+    # Risk figures are refreshed by the reconcile_admin_stats command
+    avg_injury_risk = models.FloatField(null=True, blank=True)
+    low_risk_count = models.PositiveIntegerField(default=0)
+    medium_risk_count = models.PositiveIntegerField(default=0)
+    high_risk_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'platform stats'
+
+    def __str__(self):
+        return "Platform stats"
+
+
+# -----------------------------
+# Athlete Risk Score Model
+# -----------------------------
+class AthleteRiskScore(models.Model):
+    """Current workload risk for one athlete, written by the risk engine."""
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='risk_score')
+    as_of = models.DateField()
+    acute_load = models.FloatField(default=0)
+    chronic_load = models.FloatField(default=0)
+    acwr = models.FloatField(null=True, blank=True)
+    monotony = models.FloatField(null=True, blank=True)
+    strain = models.FloatField(null=True, blank=True)
+    injury_risk = models.PositiveSmallIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.full_name} - risk {self.injury_risk} as of {self.as_of}"
+
+
+# -----------------------------
+# Training Forecast Model
+# -----------------------------
+class TrainingForecast(models.Model):
+    """Next-week load and readiness for one athlete, written by the nightly forecast job."""
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='training_forecast')
+    as_of = models.DateField()
+    days = models.JSONField(default=list)  # [{"date": "2025-01-02", "load": 310.0, "readiness": 71}, ...]
+
+    # Fitted fitness-fatigue model
+    fitness = models.FloatField(default=0)
+    fatigue = models.FloatField(default=0)
+    tau_fitness = models.PositiveSmallIntegerField()
+    tau_fatigue = models.PositiveSmallIntegerField()
+    k_fitness = models.FloatField(default=0)
+    k_fatigue = models.FloatField(default=0)
+    baseline = models.FloatField(default=0)
+    rmse = models.FloatField(null=True, blank=True)  # None when the athlete had too little history to fit
+
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.full_name} - forecast as of {self.as_of}"
+
+
+# -----------------------------
+# Intraday Sample Chunk Model
+# -----------------------------
+class IntradayChunk(models.Model):
+    """One user's samples of one metric for one UTC day, packed as binary arrays."""
+    METRIC_TYPES = [
+        ('heart_rate', 'Heart Rate'),
+        ('hrv', 'Heart Rate Variability'),
+        ('stress', 'Stress Level'),
+        ('spo2', 'Blood Oxygen %'),
+    ]
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='intraday_chunks')
+    metric_type = models.CharField(max_length=20, choices=METRIC_TYPES)
+    date = models.DateField()
+
+    # Seconds since midnight, delta-encoded; values scaled and delta-encoded (or raw float32)
+    time_encoding = models.CharField(max_length=8)
+    value_encoding = models.CharField(max_length=8)
+    times = models.BinaryField()
+    values = models.BinaryField()
+
+    # Day summary, so coarse queries never decode the arrays
+    sample_count = models.PositiveIntegerField(default=0)
+    min_value = models.FloatField(null=True, blank=True)
+    max_value = models.FloatField(null=True, blank=True)
+    sum_value = models.FloatField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['user', 'metric_type', 'date']
+
+    def __str__(self):
+        return f"{self.user.full_name} - {self.metric_type} on {self.date} ({self.sample_count} samples)"
+
+
+# -----------------------------
+# Resource Version Model
+# -----------------------------
+class ResourceVersion(models.Model):
+    """Per-user write counter for one API resource (ETags) or the sync sequence."""
+    RESOURCES = [
+        ('onboarding', 'Onboarding'),
+        ('workouts', 'Workout Logs'),
+        ('health-metrics', 'Health Metrics'),
+        ('nutrition', 'Nutrition Logs'),
+        ('injuries', 'Injury Reports'),
+        (SYNC_SEQUENCE, 'Sync Sequence'),
+    ]
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='resource_versions')
+    resource = models.CharField(max_length=20, choices=RESOURCES)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['user', 'resource']
+
+    @classmethod
+    def increment(cls, user_id, resource, count=1):
+        """Add `count` to the counter, creating it on first use."""
+        counters = cls.objects.filter(user_id=user_id, resource=resource)
+        if counters.update(version=models.F('version') + count):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(user_id=user_id, resource=resource, version=count)
+        except IntegrityError:
+            # Another writer created the row first
+            counters.update(version=models.F('version') + count)
+
+    @classmethod
+    def advance(cls, user_id, resource, count=1):
+        """Add `count` to the counter and return the new value."""
+        with transaction.atomic():
+            cls.increment(user_id, resource, count)
+            return cls.objects.filter(user_id=user_id, resource=resource).values_list('version', flat=True).get()
+
+    def __str__(self):
+        return f"{self.user.full_name} - {self.resource} v{self.version}"
+
+
+# -----------------------------
+# Food Item Model
+# -----------------------------
+class FoodItem(models.Model):
+    """One food from a NutritionLog's food_items, normalized so it can be indexed."""
+    # Null once the log is archived; the item stays so food history is kept
+    nutrition_log = models.ForeignKey(
+        NutritionLog, on_delete=models.CASCADE, null=True, blank=True, related_name='food_entries'
+    )
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='food_items')
+    date = models.DateField()
+    name = models.CharField(max_length=100)  # lower-cased, whitespace collapsed
+    calories = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date', 'name'], name='fooditem_user_date_name'),
+            models.Index(fields=['name', 'date'], name='fooditem_name_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.full_name} - {self.name} on {self.date}"
+
+
+# -----------------------------
+# Athlete Cohort Model
+# -----------------------------
+class AthleteCohort(models.Model):
+    """Cohort assigned to an athlete by the cluster_cohorts command."""
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name='cohort')
+    cohort = models.PositiveSmallIntegerField(db_index=True)
+    similarity = models.FloatField()  # cosine similarity to the cohort centroid
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user.full_name} - cohort {self.cohort}"
+
+
+# -----------------------------
+# Tombstone Model
+# -----------------------------
+class Tombstone(models.Model):
+    """Record of a deleted log row, so other devices learn about the delete on sync."""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='tombstones')
+    resource = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    client_id = models.UUIDField(null=True, blank=True)
+    sync_seq = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'sync_seq', 'id'], name='tombstone_user_sync'),
+            models.Index(fields=['user', 'resource', 'object_id'], name='tombstone_user_object'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.full_name} - deleted {self.resource} {self.object_id}"
+
+
+# -----------------------------
+# Archived Log Chunk Model
+# -----------------------------
+class ArchivedLogChunk(models.Model):
+    """One user's archived rows of one log resource for one calendar month, packed as compressed columns."""
+    RESOURCES = [
+        ('workouts', 'Workout Logs'),
+        ('health-metrics', 'Health Metrics'),
+        ('nutrition', 'Nutrition Logs'),
+    ]
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='archived_chunks')
+    resource = models.CharField(max_length=20, choices=RESOURCES)
+    month = models.DateField()  # first day of the month
+    first_date = models.DateField()
+    last_date = models.DateField()
+    row_count = models.PositiveIntegerField()
+    columns = models.JSONField()  # column names, in the order of the packed arrays
+    data = models.BinaryField()  # zlib-compressed JSON: one array of values per column
+    archived_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['user', 'resource', 'month']
+
+    def __str__(self):
+        return f"{self.user.full_name} - {self.resource} {self.month:%Y-%m} ({self.row_count} rows)"
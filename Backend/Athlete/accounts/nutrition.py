@@ -0,0 +1,138 @@
+"""
+Nutrition summaries and the food-item index.
+
+Daily and weekly intake is summed in the database. Foods are copied out of
+NutritionLog.food_items into FoodItem rows (one per food, name normalized)
+whenever a log is saved, so "how often does the team eat X" and "top foods by
+calories" are indexed GROUP BYs rather than scans over JSON blobs.
+"""
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import TruncWeek
+
+from .models import FoodItem, NutritionLog
+
+NAME_MAX_LENGTH = 100
+PERIODS = ('day', 'week')
+INTAKE_FIELDS = ('calories', 'protein_g', 'carbs_g', 'fats_g', 'water_ml')
+FOOD_ORDERINGS = {'count': '-times', 'calories': '-total_calories'}
+TOP_FOODS_LIMIT = 20
+TOP_FOODS_MAX_LIMIT = 200
+
+
+def normalize(name):
+    return ' '.join(str(name).split()).lower()[:NAME_MAX_LENGTH]
+
+
+# -----------------------------
+# Food-item index
+# -----------------------------
+def parse_food_items(food_items, meal_calories):
+    """
+    [(name, calories)] for a log's food_items, which may hold plain names or
+    {"name": ..., "calories": ...} objects. Foods without their own calories
+    share whatever the meal total leaves over.
+    """
+    foods = []
+    for item in food_items if isinstance(food_items, list) else []:
+        if isinstance(item, dict):
+            name, calories = item.get('name'), item.get('calories')
+        else:
+            name, calories = item, None
+        name = normalize(name) if name is not None else ''
+        if not name:
+            continue
+        try:
+            calories = max(0, int(round(float(calories)))) if calories is not None else None
+        except (TypeError, ValueError):
+            calories = None
+        foods.append([name, calories])
+
+    unpriced = [food for food in foods if food[1] is None]
+    if unpriced and meal_calories is not None:
+        remaining = max(0, meal_calories - sum(food[1] for food in foods if food[1] is not None))
+        for food in unpriced:
+            food[1] = remaining // len(unpriced)
+    return [tuple(food) for food in foods]
+
+
+def food_item_rows(log):
+    """Unsaved FoodItem rows for one log."""
+    return [
+        FoodItem(nutrition_log_id=log.pk, user_id=log.user_id, date=log.date, name=name, calories=calories)
+        for name, calories in parse_food_items(log.food_items, log.calories)
+    ]
+
+
+def index_log(log):
+    FoodItem.objects.filter(nutrition_log_id=log.pk).delete()
+    FoodItem.objects.bulk_create(food_item_rows(log))
+
+
+def index_logs(logs, batch_size=1000):
+    """(Re)build the food items of many logs, e.g. after a bulk_create."""
+    rows = []
+    for log in logs.only('pk', 'user_id', 'date', 'food_items', 'calories').iterator(chunk_size=batch_size):
+        rows.extend(food_item_rows(log))
+    FoodItem.objects.filter(nutrition_log__in=logs).delete()
+    FoodItem.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+# -----------------------------
+# Summaries
+# -----------------------------
+def intake_by_period(users, start, end, period='day'):
+    """
+    Summed intake per day or per ISO week (keyed by the Monday) for `users`,
+    with the meal and athlete counts needed to turn totals into averages.
+    """
+    logs = NutritionLog.objects.filter(user__in=users, date__range=(start, end))
+    bucket = TruncWeek('date') if period == 'week' else F('date')
+    rows = (
+        logs.annotate(period=bucket)
+        .values('period')
+        .annotate(
+            meals=Count('id'),
+            athletes=Count('user', distinct=True),
+            # Aggregates may not reuse a model field's name
+            **{f'total_{field}': Sum(field) for field in INTAKE_FIELDS},
+        )
+        .order_by('period')
+    )
+    return [
+        {
+            'date': row['period'],
+            'meals': row['meals'],
+            'athletes': row['athletes'],
+            **{field: round(float(row[f'total_{field}'] or 0), 1) for field in INTAKE_FIELDS},
+        }
+        for row in rows
+    ]
+
+
+def top_foods(users, start=None, end=None, order='count', limit=TOP_FOODS_LIMIT, name=None):
+    """Foods eaten by `users`, with how often, by how many athletes and the calories they supplied."""
+    items = FoodItem.objects.filter(user__in=users)
+    if start:
+        items = items.filter(date__gte=start)
+    if end:
+        items = items.filter(date__lte=end)
+    if name is not None:
+        items = items.filter(name=normalize(name))
+    rows = (
+        items.values('name')
+        .annotate(
+            times=Count('id'),
+            athletes=Count('user', distinct=True),
+            total_calories=Sum('calories'),
+            last_eaten=Max('date'),
+        )
+        .order_by(FOOD_ORDERINGS[order], 'name')[:limit]
+    )
+    return [
+        {
+            'name': row['name'], 'times': row['times'], 'athletes': row['athletes'],
+            'calories': row['total_calories'] or 0, 'last_eaten': row['last_eaten'],
+        }
+        for row in rows
+    ]
@@ -0,0 +1,130 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import archive
+from .filters import date_bounds
+
+
+# -----------------------------
+# Keyset Pagination
+# -----------------------------
+class KeysetPagination(BasePagination):
+    """
+    Newest-first pagination on (date, id).
+
+    The cursor holds the last row's (date, id), so each page is a range scan
+    on the (user, date, id) index no matter how deep the client has paged.
+    The view names its date column with ``date_field``; views that set
+    ``archive_resource`` continue into the user's archived rows (see
+    accounts.archive) once a page runs short of hot rows.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = list(self._page_query(queryset, request, view))
+        if self._short(rows, view):
+            rows = self._merge(rows, archive.page(*self._archive_query(request, view)))
+        return self._take(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views, fetching the page with the async ORM."""
+        rows = [row async for row in self._page_query(queryset, request, view)]
+        if self._short(rows, view):
+            rows = self._merge(rows, await archive.apage(*self._archive_query(request, view)))
+        return self._take(rows)
+
+    def _page_query(self, queryset, request, view):
+        self.request = request
+        self.date_field = getattr(view, 'date_field', 'date')
+        self.current_page_size = self.get_page_size(request)
+
+        self.position = position = self.decode_cursor(request)
+        if position is not None:
+            date, pk = position
+            # The plain `<=` bound lets the planner seek straight to the cursor date
+            queryset = queryset.filter(
+                Q(**{f'{self.date_field}__lt': date}) | Q(pk__lt=pk),
+                **{f'{self.date_field}__lte': date}
+            )
+        return queryset.order_by(f'-{self.date_field}', '-pk')[:self.current_page_size + 1]
+
+    def _short(self, rows, view):
+        return getattr(view, 'archive_resource', None) is not None and len(rows) <= self.current_page_size
+
+    def _archive_query(self, request, view):
+        start, end = date_bounds(request)
+        return request.user.pk, view.archive_resource, self.position, start, end, self.current_page_size + 1
+
+    def _merge(self, rows, archived):
+        # Archived rows are older than the hot ones, except for late writes not archived yet
+        return sorted(rows + archived, key=lambda row: (getattr(row, self.date_field), row.pk), reverse=True)
+
+    def _take(self, rows):
+        page_size = self.current_page_size
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = (getattr(rows[-1], self.date_field), rows[-1].pk) if self.has_next else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            date, pk = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            date, pk = parse_date(date), int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return date, pk
+
+    def encode_cursor(self, position):
+        date, pk = position
+        return base64.urlsafe_b64encode(f'{date.isoformat()}|{pk}'.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,11 @@
+"""
+Password hashing for process pools. Workers are spawned without Django set
+up, so they load the hasher class from its import path and call it directly
+instead of going through make_password().
+"""
+from django.utils.module_loading import import_string
+
+
+def hash_passwords(hasher_path, passwords):
+    hasher = import_string(hasher_path)()
+    return [hasher.encode(password, hasher.salt()) for password in passwords]
@@ -0,0 +1,153 @@
+"""
+Bulk creation of athlete accounts for a new team.
+
+Every row is validated first with ProvisionAthleteSerializer: the
+registration rules, an optional onboarding profile, and email uniqueness
+checked for the whole batch in one query. If any row is invalid, nothing
+is created and the errors are reported per row. Passwords are hashed in a
+spawned process pool. Users and their Onboarding rows are then written
+with bulk_create in one transaction. bulk_create skips signals, so the
+admin counters and the cohort index are updated once at the end.
+"""
+import csv
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db import IntegrityError, transaction
+
+from . import cohorts, stats
+from .imports import default_workers
+from .models import CustomUser, Onboarding
+from .passwords import hash_passwords
+from .serializers import OnboardingSerializer, ProvisionAthleteSerializer
+
+BATCH_SIZE = 500
+MAX_ROWS = 2000  # per API request; the command takes any number
+HASH_CHUNK_SIZE = 8
+# Below this many passwords the pool start-up costs more than it saves
+PARALLEL_MIN_PASSWORDS = 8
+# CSV cells of these onboarding fields hold several values separated by LIST_SEPARATOR
+ONBOARDING_LIST_FIELDS = ('food_types', 'sports_activities', 'primary_goals')
+LIST_SEPARATOR = ';'
+
+
+class ProvisioningFailed(Exception):
+    """Nothing was created; `errors` lists {'index': n, 'errors': {...}} per failing row (0-based)."""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+def csv_rows(lines):
+    """
+    Rows for provision() from CSV with a header row: email, full_name,
+    password and any onboarding fields. Empty cells are left out.
+    """
+    rows = []
+    for record in csv.DictReader(lines):
+        row, profile = {}, {}
+        for column, value in record.items():
+            if column is None or not (value or '').strip():
+                continue  # cells past the header, or empty
+            value = value.strip()
+            if column in ONBOARDING_LIST_FIELDS:
+                profile[column] = [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+            elif column in OnboardingSerializer.Meta.fields:
+                profile[column] = value
+            else:
+                row[column] = value
+        if profile:
+            row['onboarding'] = profile
+        rows.append(row)
+    return rows
+
+
+def validate(rows):
+    """Validated data for every row, or ProvisioningFailed."""
+    errors, validated = [], []
+    for index, row in enumerate(rows):
+        serializer = ProvisionAthleteSerializer(data=row)
+        if serializer.is_valid():
+            data = dict(serializer.validated_data)
+            data['email'] = CustomUser.objects.normalize_email(data['email'])
+            validated.append((index, data))
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+
+    taken = set(
+        CustomUser.objects.filter(email__in=[data['email'] for _, data in validated])
+        .values_list('email', flat=True)
+    )
+    seen = set()
+    for index, data in validated:
+        if data['email'] in taken:
+            errors.append({'index': index, 'errors': {'email': ["A user with this email already exists."]}})
+        elif data['email'] in seen:
+            errors.append({'index': index, 'errors': {'email': ["This email appears more than once."]}})
+        seen.add(data['email'])
+
+    if errors:
+        raise ProvisioningFailed(sorted(errors, key=lambda error: error['index']))
+    return [data for _, data in validated]
+
+
+def hash_all(passwords, workers=None):
+    """
+    make_password() for each password, in order, with the default hasher.
+    A missing password gives an unusable one.
+    """
+    hashes = [make_password(None) for _ in passwords]
+    indexes = [index for index, password in enumerate(passwords) if password is not None]
+    workers = workers or default_workers()
+    hasher = type(get_hasher())
+    hasher_path = f'{hasher.__module__}.{hasher.__qualname__}'
+    chunks = [
+        [passwords[index] for index in indexes[offset:offset + HASH_CHUNK_SIZE]]
+        for offset in range(0, len(indexes), HASH_CHUNK_SIZE)
+    ]
+
+    if workers == 1 or len(indexes) < PARALLEL_MIN_PASSWORDS:
+        hashed = [hash_passwords(hasher_path, chunk) for chunk in chunks]
+    else:
+        # spawn: forking a threaded server process is not safe, and workers never touch Django
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as pool:
+            hashed = list(pool.map(partial(hash_passwords, hasher_path), chunks))
+
+    for index, password_hash in zip(indexes, (password_hash for chunk in hashed for password_hash in chunk)):
+        hashes[index] = password_hash
+    return hashes
+
+
+def provision(rows, coach=None, workers=None):
+    """Create an athlete for every row, assigned to `coach`; returns the users."""
+    validated = validate(rows)
+    hashes = hash_all([data.get('password') for data in validated], workers)
+    users = [
+        CustomUser(
+            email=data['email'], full_name=data['full_name'], role='athlete', coach=coach, password=password_hash,
+        )
+        for data, password_hash in zip(validated, hashes)
+    ]
+
+    try:
+        with transaction.atomic():
+            CustomUser.objects.bulk_create(users, batch_size=BATCH_SIZE)
+            profiles = [
+                Onboarding(user=user, **data['onboarding'])
+                for user, data in zip(users, validated) if 'onboarding' in data
+            ]
+            Onboarding.objects.bulk_create(profiles, batch_size=BATCH_SIZE)
+            if users:
+                stats.apply_deltas({field: len(users) for field in stats.user_counter_fields('athlete', True)})
+                stats.record_signup(users[0].date_joined, delta=len(users))
+    except IntegrityError:
+        # Another request registered one of the emails after validation
+        raise ProvisioningFailed([{'index': None, 'errors': {'email': ["An email was registered meanwhile; retry."]}}])
+
+    if profiles:
+        cohorts.invalidate()
+    return users
@@ -0,0 +1,149 @@
+"""
+Vectorized workload risk engine.
+
+Daily loads (DailyRollup.training_load, i.e. workout duration x effort or the
+device-reported training_load metric) are packed into a dense
+(athletes x days) array and every rolling window is computed in one NumPy
+pass: acute:chronic workload ratio, Foster monotony and strain.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from . import roster, scoring
+from .models import AthleteRiskScore, CustomUser, DailyRollup
+
+DEFAULT_CHUNK_SIZE = 5000
+RISK_FIELDS = ['as_of', 'acute_load', 'chronic_load', 'acwr', 'monotony', 'strain', 'injury_risk']
+
+
+def load_matrix(user_ids, start, end):
+    """Dense float array of daily load, one row per user id (sorted), one column per day."""
+    user_ids = np.asarray(sorted(user_ids), dtype=np.int64)
+    days = (end - start).days + 1
+    matrix = np.zeros((len(user_ids), days), dtype=np.float64)
+    if not len(user_ids):
+        return user_ids, matrix
+
+    rows = list(
+        DailyRollup.objects.filter(
+            user_id__gte=int(user_ids[0]),
+            user_id__lte=int(user_ids[-1]),
+            date__range=(start, end),
+        ).values_list('user_id', 'date', 'training_load')
+    )
+    if not rows:
+        return user_ids, matrix
+
+    owners, dates, loads = zip(*rows)
+    owners = np.fromiter(owners, dtype=np.int64, count=len(rows))
+    offsets = (np.array(dates, dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+    loads = np.fromiter(loads, dtype=np.float64, count=len(rows))
+
+    # The id range can include coaches or inactive users; drop their rows
+    positions = np.searchsorted(user_ids, owners).clip(max=len(user_ids) - 1)
+    keep = user_ids[positions] == owners
+    np.add.at(matrix, (positions[keep], offsets[keep]), loads[keep])
+    return user_ids, matrix
+
+
+def _window_sums(values, window):
+    """Trailing `window`-day sums for every column, computed from one cumulative sum."""
+    cumulative = np.cumsum(values, axis=1)
+    shifted = np.zeros_like(cumulative)
+    shifted[:, window:] = cumulative[:, :-window]
+    return cumulative - shifted
+
+
+def rolling_metrics(matrix):
+    """
+    Per-day ACWR, monotony and strain for every athlete.
+
+    Returns a dict of (athletes x days) arrays; NaN where a value is undefined
+    (no chronic load yet, or a week with no training).
+    """
+    acute_days, chronic_days = scoring.ACUTE_WINDOW_DAYS, scoring.CHRONIC_WINDOW_DAYS
+    acute = _window_sums(matrix, acute_days)
+    chronic = _window_sums(matrix, chronic_days) * acute_days / chronic_days
+
+    mean = acute / acute_days
+    variance = _window_sums(matrix ** 2, acute_days) / acute_days - mean ** 2
+    std = np.sqrt(np.clip(variance, 0, None))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(chronic > 0, acute / chronic, np.nan)
+        monotony = np.where(std > 0, mean / std, np.where(mean > 0, scoring.MONOTONY_CAP, np.nan))
+    monotony = np.minimum(monotony, scoring.MONOTONY_CAP)
+    strain = acute * monotony
+
+    return {
+        'acute_load': acute,
+        'chronic_load': chronic,
+        'acwr': ratio,
+        'monotony': monotony,
+        'strain': strain,
+        'injury_risk': injury_risk(ratio, monotony),
+    }
+
+
+def injury_risk(ratio, monotony):
+    """Array form of scoring.injury_risk; NaN where the ratio is undefined."""
+    risk = (
+        20
+        + np.clip(ratio - 1.3, 0, None) * 80
+        + np.clip(0.8 - ratio, 0, None) * 25
+        + np.clip(np.nan_to_num(monotony) - scoring.MONOTONY_THRESHOLD, 0, None) * 15
+    )
+    return np.round(np.clip(risk, 0, 100))
+
+
+def _optional(value, digits):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def score_users(user_ids, as_of=None):
+    """Score the given users as of `as_of` (default today) and store the results."""
+    as_of = as_of or timezone.localdate()
+    start = as_of - timedelta(days=scoring.CHRONIC_WINDOW_DAYS - 1)
+    user_ids, matrix = load_matrix(user_ids, start, as_of)
+    if not len(user_ids):
+        return 0
+
+    # Only the last column is stored; the full series is available to callers of rolling_metrics
+    latest = {name: values[:, -1] for name, values in rolling_metrics(matrix).items()}
+    scores = [
+        AthleteRiskScore(
+            user_id=int(user_id),
+            as_of=as_of,
+            acute_load=round(float(latest['acute_load'][index]), 2),
+            chronic_load=round(float(latest['chronic_load'][index]), 2),
+            acwr=_optional(latest['acwr'][index], 3),
+            monotony=_optional(latest['monotony'][index], 3),
+            strain=_optional(latest['strain'][index], 2),
+            injury_risk=None if np.isnan(latest['injury_risk'][index]) else int(latest['injury_risk'][index]),
+        )
+        for index, user_id in enumerate(user_ids)
+    ]
+    with transaction.atomic():
+        AthleteRiskScore.objects.bulk_create(
+            scores,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=RISK_FIELDS + ['updated_at'],
+        )
+    cache.delete_many([roster.cache_key(int(user_id)) for user_id in user_ids])
+    return len(scores)
+
+
+def score_all(as_of=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rescore every active athlete, chunk_size athletes per vectorized pass."""
+    athlete_ids = list(
+        CustomUser.objects.filter(role='athlete', is_active=True).order_by('pk').values_list('pk', flat=True)
+    )
+    scored = 0
+    for offset in range(0, len(athlete_ids), chunk_size):
+        scored += score_users(athlete_ids[offset:offset + chunk_size], as_of)
+    return scored
@@ -0,0 +1,204 @@
+"""
+Incremental maintenance of DailyRollup rows.
+
+A write to a WorkoutLog or HealthMetric only touches its own day plus the
+days whose rolling windows include it (the following CHRONIC_WINDOW_DAYS - 1).
+"""
+from datetime import timedelta
+
+from django.db import transaction
+
+from . import archive, scoring
+from .models import DailyRollup, HealthMetric, WorkoutLog
+
+ROLLUP_METRICS = ('hrv', 'sleep', 'hydration', 'stress', 'resting_hr', 'training_load')
+ROLLUP_FIELDS = [
+    'workout_count', 'workout_minutes', 'training_load',
+    'hrv', 'sleep', 'hydration', 'stress', 'resting_hr',
+]
+# Columns read back from ArchivedLogChunk, in the order the loops below unpack
+ARCHIVED_FIELDS = {
+    'workouts': ['date', 'duration_minutes', 'average_heart_rate'],
+    'health-metrics': ['date_recorded', 'metric_type', 'value'],
+}
+WINDOW_FIELDS = [
+    'acute_load', 'chronic_load', 'acwr',
+    'recovery_score', 'training_readiness', 'injury_risk',
+]
+
+
+def _daily_values(user_id, dates):
+    """
+    Raw per-day aggregates for the given dates, three queries in total. Rows
+    already archived still count, so a late write into an archived day adds
+    to that day instead of replacing it.
+    """
+    values = {date: {'workout_count': 0, 'workout_minutes': 0, 'training_load': 0.0} for date in dates}
+    archived = archive.rows_on(user_id, dates, ARCHIVED_FIELDS)
+
+    workouts = list(WorkoutLog.objects.filter(user_id=user_id, date__in=dates).values_list(
+        'date', 'duration_minutes', 'average_heart_rate'
+    ))
+    for date, duration, heart_rate in archived['workouts'] + workouts:
+        day = values[date]
+        day['workout_count'] += 1
+        day['workout_minutes'] += duration
+        day['training_load'] += scoring.workout_load(duration, heart_rate)
+
+    metrics = list(HealthMetric.objects.filter(
+        user_id=user_id, date_recorded__in=dates, metric_type__in=ROLLUP_METRICS
+    ).values_list('date_recorded', 'metric_type', 'value'))
+    archived_metrics = [row for row in archived['health-metrics'] if row[1] in ROLLUP_METRICS]
+    # Hot rows come last, so a reading re-sent after archival wins
+    for date, metric_type, value in archived_metrics + metrics:
+        # A device-reported training load takes precedence over the estimate
+        values[date][metric_type] = float(value)
+        values[date]['has_metrics'] = True
+
+    return values
+
+
+def _has_data(day):
+    return day['workout_count'] or day.get('has_metrics', False)
+
+
+def _mean(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def _refresh_windows(user_id, start, end):
+    """Recompute rolling-window fields for rollups dated start..end."""
+    window_start = start - timedelta(days=scoring.CHRONIC_WINDOW_DAYS - 1)
+    rows = list(
+        DailyRollup.objects.filter(user_id=user_id, date__range=(window_start, end)).order_by('date')
+    )
+    by_date = {row.date: row for row in rows}
+
+    changed = []
+    for row in rows:
+        if row.date < start:
+            continue
+        window = [
+            by_date.get(row.date - timedelta(days=offset))
+            for offset in range(scoring.CHRONIC_WINDOW_DAYS)
+        ]
+        window = [day for day in window if day is not None]
+        acute = sum(day.training_load for day in window
+                    if (row.date - day.date).days < scoring.ACUTE_WINDOW_DAYS)
+        chronic = sum(day.training_load for day in window) * scoring.ACUTE_WINDOW_DAYS / scoring.CHRONIC_WINDOW_DAYS
+        ratio = scoring.acwr(acute, chronic)
+        recovery = scoring.recovery_score(
+            hrv=row.hrv,
+            hrv_baseline=_mean(day.hrv for day in window),
+            sleep=row.sleep,
+            resting_hr=row.resting_hr,
+            resting_hr_baseline=_mean(day.resting_hr for day in window),
+        )
+
+        row.acute_load = round(acute, 2)
+        row.chronic_load = round(chronic, 2)
+        row.acwr = None if ratio is None else round(ratio, 3)
+        row.recovery_score = recovery
+        row.training_readiness = scoring.training_readiness(recovery, ratio)
+        row.injury_risk = scoring.injury_risk(ratio)
+        changed.append(row)
+
+    if changed:
+        DailyRollup.objects.bulk_update(changed, WINDOW_FIELDS)
+
+
+def refresh_days(user_id, dates):
+    """Rebuild the rollups for the given days and every window that depends on them."""
+    dates = set(dates)
+    if not dates:
+        return
+
+    with transaction.atomic():
+        values = _daily_values(user_id, dates)
+        empty = [date for date, day in values.items() if not _has_data(day)]
+        if empty:
+            DailyRollup.objects.filter(user_id=user_id, date__in=empty).delete()
+
+        rows = [
+            DailyRollup(user_id=user_id, date=date, **{field: day.get(field) for field in ROLLUP_FIELDS})
+            for date, day in values.items() if _has_data(day)
+        ]
+        if rows:
+            DailyRollup.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['user', 'date'],
+                update_fields=ROLLUP_FIELDS + ['updated_at'],
+            )
+
+        _refresh_windows(
+            user_id,
+            min(dates),
+            max(dates) + timedelta(days=scoring.CHRONIC_WINDOW_DAYS - 1),
+        )
+
+
+def rebuild_user(user_id):
+    """Recompute every rollup for one athlete from scratch, except on archived days."""
+    dates = set(WorkoutLog.objects.filter(user_id=user_id).values_list('date', flat=True))
+    dates |= set(HealthMetric.objects.filter(
+        user_id=user_id, metric_type__in=ROLLUP_METRICS
+    ).values_list('date_recorded', flat=True))
+    stale = DailyRollup.objects.filter(user_id=user_id).exclude(date__in=dates)
+    # The logs behind archived days are no longer in the hot tables; keep their rollups
+    archived_through = archive.archived_through(user_id, ['workouts', 'health-metrics'])
+    if archived_through:
+        dates = {date for date in dates if date > archived_through}
+        stale = stale.filter(date__gt=archived_through)
+    stale.delete()
+    refresh_days(user_id, dates)
+
+
+def weekly_progress(rows, end, days=scoring.ACUTE_WINDOW_DAYS):
+    """Dashboard series for the `days` days ending at `end`, zero-filled."""
+    by_date = {row.date: row for row in rows}
+    series = []
+    for offset in range(days - 1, -1, -1):
+        date = end - timedelta(days=offset)
+        row = by_date.get(date)
+        series.append({
+            'date': date.isoformat(),
+            'day': date.strftime('%a'),
+            'readiness': row.training_readiness if row else None,
+            'load': round(row.training_load) if row else 0,
+        })
+    return series
+
+
+def dashboard_rows(user, end, days=scoring.ACUTE_WINDOW_DAYS):
+    return DailyRollup.objects.filter(
+        user=user,
+        date__range=(end - timedelta(days=days - 1), end),
+    ).order_by('date')
+
+
+def dashboard(rows, end, days=scoring.ACUTE_WINDOW_DAYS):
+    """Readiness, recovery, risk and the load series from the dashboard_rows."""
+    def latest(field):
+        for row in reversed(rows):
+            value = getattr(row, field)
+            if value is not None:
+                return value
+        return None
+
+    return {
+        'as_of': rows[-1].date if rows else None,
+        'metrics': {
+            'hrv': latest('hrv'),
+            'sleep': latest('sleep'),
+            'hydration': latest('hydration'),
+            'stress': latest('stress'),
+            'restingHeartRate': latest('resting_hr'),
+            'trainingLoad': round(rows[-1].training_load) if rows else None,
+        },
+        'injuryRisk': latest('injury_risk'),
+        'trainingReadiness': latest('training_readiness'),
+        'recoveryScore': latest('recovery_score'),
+        'weeklyProgress': weekly_progress(rows, end, days),
+    }
@@ -0,0 +1,100 @@
+"""
+Coach roster rows, built with a constant number of queries and cached per athlete.
+"""
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from rest_framework.exceptions import PermissionDenied
+
+from .models import CustomUser, DailyRollup, WorkoutLog
+
+ROSTER_CACHE_TIMEOUT = 60 * 15
+ROSTER_CACHE_PREFIX = 'roster:athlete:'
+
+
+def cache_key(athlete_id):
+    return f'{ROSTER_CACHE_PREFIX}{athlete_id}'
+
+
+def invalidate(athlete_id):
+    cache.delete(cache_key(athlete_id))
+
+
+def status_for(injury_risk):
+    if injury_risk is None or injury_risk < 40:
+        return 'success'
+    if injury_risk < 70:
+        return 'warning'
+    return 'destructive'
+
+
+def athletes_for(user):
+    """The athletes on `user`'s roster: their own for coaches, everyone for admins."""
+    if user.role == 'coach':
+        return user.athletes.filter(role='athlete', is_active=True)
+    if user.role == 'admin' or user.is_superuser:
+        return CustomUser.objects.filter(role='athlete', is_active=True)
+    raise PermissionDenied("Only coaches can view a roster.")
+
+
+def _annotated(athlete_ids):
+    latest_workout = WorkoutLog.objects.filter(user=OuterRef('pk')).order_by('-date', '-created_at')
+    latest_rollup = DailyRollup.objects.filter(user=OuterRef('pk')).order_by('-date')
+    return (
+        CustomUser.objects.filter(pk__in=athlete_ids)
+        .select_related('onboarding', 'risk_score')
+        .annotate(
+            last_workout_date=Subquery(latest_workout.values('date')[:1]),
+            last_workout_at=Subquery(latest_workout.values('created_at')[:1]),
+            last_activity=Subquery(latest_workout.values('activity_type')[:1]),
+            readiness=Subquery(latest_rollup.values('training_readiness')[:1]),
+        )
+    )
+
+
+def _row(athlete):
+    onboarding = getattr(athlete, 'onboarding', None)
+    sports = onboarding.sports_activities if onboarding else []
+    risk_score = getattr(athlete, 'risk_score', None)
+    injury_risk = risk_score.injury_risk if risk_score else None
+    return {
+        'id': athlete.id,
+        'name': athlete.full_name,
+        'email': athlete.email,
+        'sport': sports[0] if sports else athlete.last_activity,
+        'injuryRisk': injury_risk,
+        'readiness': athlete.readiness,
+        'lastWorkout': athlete.last_workout_date.isoformat() if athlete.last_workout_date else None,
+        'lastWorkoutAt': athlete.last_workout_at.isoformat() if athlete.last_workout_at else None,
+        'status': status_for(injury_risk),
+    }
+
+
+def roster_rows(athletes):
+    """
+    Roster rows for the athletes queryset: one query for the ids, one cache
+    read, and at most one annotated query for the rows that were not cached.
+    """
+    athlete_ids = list(athletes.order_by('full_name', 'pk').values_list('pk', flat=True))
+    cached = cache.get_many([cache_key(athlete_id) for athlete_id in athlete_ids])
+
+    missing = [athlete_id for athlete_id in athlete_ids if cache_key(athlete_id) not in cached]
+    if missing:
+        fresh = {cache_key(athlete.pk): _row(athlete) for athlete in _annotated(missing)}
+        cache.set_many(fresh, ROSTER_CACHE_TIMEOUT)
+        cached.update(fresh)
+
+    return [cached[cache_key(athlete_id)] for athlete_id in athlete_ids if cache_key(athlete_id) in cached]
+
+
+async def aroster_rows(athletes):
+    """roster_rows for async views, with the same queries through the async ORM and cache API."""
+    athlete_ids = [pk async for pk in athletes.order_by('full_name', 'pk').values_list('pk', flat=True)]
+    cached = await cache.aget_many([cache_key(athlete_id) for athlete_id in athlete_ids])
+
+    missing = [athlete_id for athlete_id in athlete_ids if cache_key(athlete_id) not in cached]
+    if missing:
+        fresh = {cache_key(athlete.pk): _row(athlete) async for athlete in _annotated(missing)}
+        await cache.aset_many(fresh, ROSTER_CACHE_TIMEOUT)
+        cached.update(fresh)
+
+    return [cached[cache_key(athlete_id)] for athlete_id in athlete_ids if cache_key(athlete_id) in cached]
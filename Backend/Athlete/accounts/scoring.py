@@ -0,0 +1,90 @@
+"""
+Training load and readiness formulas.
+
+Loads use a session-RPE style unit (minutes x perceived effort), with effort
+estimated from average heart rate when the athlete did not report one.
+"""
+
+ACUTE_WINDOW_DAYS = 7
+CHRONIC_WINDOW_DAYS = 28
+DEFAULT_EFFORT = 5.0
+MONOTONY_THRESHOLD = 2.0
+MONOTONY_CAP = 10.0
+
+
+def clamp(value, low=0.0, high=100.0):
+    return max(low, min(high, value))
+
+
+def workout_effort(average_heart_rate):
+    """Map average heart rate onto a 1-10 effort scale."""
+    if not average_heart_rate:
+        return DEFAULT_EFFORT
+    return clamp((average_heart_rate - 60) / 13.0, 1.0, 10.0)
+
+
+def workout_load(duration_minutes, average_heart_rate=None):
+    return float(duration_minutes or 0) * workout_effort(average_heart_rate)
+
+
+def acwr(acute_load, chronic_load):
+    """Acute:chronic workload ratio, or None while there is no chronic base."""
+    if not chronic_load:
+        return None
+    return acute_load / chronic_load
+
+
+def injury_risk(ratio, monotony=None):
+    """
+    0-100 risk score; lowest inside the 0.8-1.3 ACWR sweet spot and raised
+    further when training monotony climbs above 2.
+    """
+    if ratio is None:
+        return None
+    risk = 20 + max(0.0, ratio - 1.3) * 80 + max(0.0, 0.8 - ratio) * 25
+    if monotony is not None:
+        risk += max(0.0, monotony - MONOTONY_THRESHOLD) * 15
+    return round(clamp(risk))
+
+
+def recovery_score(hrv=None, hrv_baseline=None, sleep=None, resting_hr=None, resting_hr_baseline=None):
+    """Average of the available HRV, sleep and resting-HR components."""
+    components = []
+    if sleep is not None:
+        components.append(clamp(sleep / 8.0 * 100))
+    if hrv is not None and hrv_baseline:
+        components.append(clamp(50 + 100 * (hrv / hrv_baseline - 1)))
+    if resting_hr is not None and resting_hr_baseline:
+        components.append(clamp(50 - 100 * (resting_hr / resting_hr_baseline - 1)))
+    if not components:
+        return None
+    return round(sum(components) / len(components))
+
+
+def training_readiness(recovery, ratio):
+    """Recovery, discounted when acute load runs ahead of chronic load."""
+    if recovery is None and ratio is None:
+        return None
+    base = 75.0 if recovery is None else float(recovery)
+    overload = max(0.0, (ratio or 0.0) - 1.0)
+    return round(clamp(base - overload * 40))
+
+
+# Keytel et al. (2005) heart-rate energy expenditure; body mass is not
+# collected at onboarding, so a reference mass stands in for it
+REFERENCE_BODY_MASS_KG = 70.0
+REFERENCE_AGE = 30
+
+
+def estimate_calories(duration_minutes, average_heart_rate, age=None, gender=None):
+    """Estimated kcal for a session, or None without a heart rate."""
+    if not duration_minutes or not average_heart_rate:
+        return None
+    age = age or REFERENCE_AGE
+    if gender == 'female':
+        per_minute = (-20.4022 + 0.4472 * average_heart_rate - 0.1263 * REFERENCE_BODY_MASS_KG
+                      + 0.074 * age) / 4.184
+    else:
+        per_minute = (-55.0969 + 0.6309 * average_heart_rate + 0.1988 * REFERENCE_BODY_MASS_KG
+                      + 0.2017 * age) / 4.184
+    return max(0, round(per_minute * duration_minutes))
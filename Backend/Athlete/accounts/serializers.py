@@ -62,6 +62,23 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
+# -----------------------------
+# Team Provisioning Serializer
+# -----------------------------
+class ProvisionAthleteSerializer(serializers.ModelSerializer):
+    """
+    One athlete in a bulk provisioning request. Email uniqueness is checked
+    for the whole batch at once by accounts.provisioning.
+    """
+    password = serializers.CharField(write_only=True, min_length=8, required=False)
+    onboarding = OnboardingSerializer(required=False)
+
+    class Meta:
+        model = CustomUser
+        fields = ['full_name', 'email', 'password', 'onboarding']
+        extra_kwargs = {'email': {'validators': []}}
+
+
 # -----------------------------
 # Login Serializer
 # -----------------------------
@@ -88,54 +105,81 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
 
+# -----------------------------
+# Offline client ids
+# -----------------------------
+class ClientIdMixin:
+    """
+    client_id is chosen by an offline client when it creates a row and is
+    unique per user. It cannot be changed afterwards, and a create reusing
+    one fails validation instead of the (user, client_id) constraint.
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            fields['client_id'].read_only = True
+        return fields
+
+    def validate_client_id(self, value):
+        request = self.context.get('request')
+        if value is not None and request is not None:
+            if self.Meta.model.objects.filter(user=request.user, client_id=value).exists():
+                raise serializers.ValidationError("This client_id is already in use.", code='unique')
+        return value
+
+
 # -----------------------------
 # Workout Log Serializer
 # -----------------------------
-class WorkoutLogSerializer(serializers.ModelSerializer):
+class WorkoutLogSerializer(ClientIdMixin, serializers.ModelSerializer):
     class Meta:
         model = WorkoutLog
         fields = [
             'id', 'date', 'activity_type', 'duration_minutes', 'distance_km',
             'calories_burned', 'average_heart_rate', 'max_heart_rate',
-            'notes', 'created_at'
+            'notes', 'created_at',
+            'client_id', 'sync_seq', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'sync_seq', 'updated_at']
 
 
 # -----------------------------
 # Health Metric Serializer
 # -----------------------------
-class HealthMetricSerializer(serializers.ModelSerializer):
+class HealthMetricSerializer(ClientIdMixin, serializers.ModelSerializer):
     class Meta:
         model = HealthMetric
         fields = [
             'id', 'metric_type', 'value', 'unit', 'date_recorded',
-            'source', 'created_at'
+            'source', 'created_at',
+            'client_id', 'sync_seq', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'sync_seq', 'updated_at']
 
 
 # -----------------------------
 # Nutrition Log Serializer
 # -----------------------------
-class NutritionLogSerializer(serializers.ModelSerializer):
+class NutritionLogSerializer(ClientIdMixin, serializers.ModelSerializer):
     class Meta:
         model = NutritionLog
         fields = [
             'id', 'date', 'meal_type', 'food_items', 'calories', 'protein_g',
-            'carbs_g', 'fats_g', 'water_ml', 'notes', 'created_at'
+            'carbs_g', 'fats_g', 'water_ml', 'notes', 'created_at',
+            'client_id', 'sync_seq', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'sync_seq', 'updated_at']
 
 
 # -----------------------------
 # Injury Report Serializer
 # -----------------------------
-class InjuryReportSerializer(serializers.ModelSerializer):
+class InjuryReportSerializer(ClientIdMixin, serializers.ModelSerializer):
     class Meta:
         model = InjuryReport
         fields = [
             'id', 'injury_type', 'severity', 'description', 'date_occurred',
-            'recovery_status', 'medical_attention', 'created_at'
+            'recovery_status', 'medical_attention', 'created_at',
+            'client_id', 'sync_seq', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'sync_seq', 'updated_at']
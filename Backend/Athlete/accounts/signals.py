@@ -0,0 +1,279 @@
+from functools import wraps
+
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils.dateparse import parse_date
+
+from . import archive, cohorts, injuries, live, nutrition, risk, rollups, roster, stats, stressmap, sync, versions
+from .authentication import user_cache
+from .middleware import install_query_observer
+from .models import CustomUser, HealthMetric, InjuryReport, NutritionLog, Onboarding, WorkoutLog
+
+# Date field that places each log on the rollup calendar
+ROLLUP_DATE_FIELDS = {
+    WorkoutLog: 'date',
+    HealthMetric: 'date_recorded',
+}
+
+
+def _user_cascade(kwargs):
+    """
+    True when a log's delete cascades from deleting its user, either one
+    instance or a queryset (as the admin's delete action does).
+    """
+    origin = kwargs.get('origin')
+    return getattr(origin, 'model', type(origin)) is CustomUser
+
+
+def _ignore_archiving(handler):
+    """Skip the receiver for the deletes that move logs into the archive."""
+    @wraps(handler)
+    def wrapper(sender, **kwargs):
+        if archive.is_moving():
+            return None
+        return handler(sender, **kwargs)
+    return wrapper
+
+
+# -----------------------------
+# Daily Rollup Maintenance
+# -----------------------------
+@receiver(pre_save, sender=WorkoutLog)
+@receiver(pre_save, sender=HealthMetric)
+def remember_rollup_date(sender, instance, **kwargs):
+    """Keep the stored date so a log moved to another day refreshes both days."""
+    instance._previous_rollup_date = None
+    if instance.pk:
+        field = ROLLUP_DATE_FIELDS[sender]
+        instance._previous_rollup_date = (
+            sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+        )
+
+
+@receiver(post_save, sender=WorkoutLog)
+@receiver(post_save, sender=HealthMetric)
+@receiver(post_delete, sender=WorkoutLog)
+@receiver(post_delete, sender=HealthMetric)
+@_ignore_archiving
+def refresh_rollup(sender, instance, **kwargs):
+    # Rollups go away with the user; nothing to refresh on a cascade
+    if _user_cascade(kwargs):
+        return
+
+    date = getattr(instance, ROLLUP_DATE_FIELDS[sender])
+    dates = {parse_date(date) if isinstance(date, str) else date}
+    previous = getattr(instance, '_previous_rollup_date', None)
+    if previous:
+        dates.add(previous)
+    rollups.refresh_days(instance.user_id, dates)
+    risk.score_users([instance.user_id])
+
+
+# -----------------------------
+# Coach Roster Cache
+# -----------------------------
+@receiver(post_save, sender=WorkoutLog)
+@receiver(post_save, sender=HealthMetric)
+@receiver(post_save, sender=Onboarding)
+@receiver(post_delete, sender=WorkoutLog)
+@receiver(post_delete, sender=HealthMetric)
+@receiver(post_delete, sender=Onboarding)
+@_ignore_archiving
+def invalidate_roster_row(sender, instance, **kwargs):
+    roster.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_roster_row(sender, instance, **kwargs):
+    roster.invalidate(instance.pk)
+
+
+# -----------------------------
+# Admin Stats Counters
+# -----------------------------
+@receiver(pre_save, sender=CustomUser)
+def remember_user_counters(sender, instance, **kwargs):
+    instance._previous_counters = None
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).values_list('role', 'is_active').first()
+        if previous:
+            instance._previous_counters = stats.user_counter_fields(*previous)
+
+
+@receiver(post_save, sender=CustomUser)
+def count_user(sender, instance, created, **kwargs):
+    current = stats.user_counter_fields(instance.role, instance.is_active)
+    previous = [] if created else (getattr(instance, '_previous_counters', None) or current)
+
+    deltas = {field: 1 for field in current}
+    for field in previous:
+        deltas[field] = deltas.get(field, 0) - 1
+    stats.apply_deltas(deltas)
+    if created:
+        stats.record_signup(instance.date_joined)
+
+
+@receiver(post_delete, sender=CustomUser)
+def uncount_user(sender, instance, **kwargs):
+    stats.apply_deltas({field: -1 for field in stats.user_counter_fields(instance.role, instance.is_active)})
+    stats.record_signup(instance.date_joined, delta=-1)
+
+
+@receiver(post_save, sender=WorkoutLog)
+def count_workout(sender, instance, created, **kwargs):
+    if created:
+        stats.apply_deltas({'total_workouts': 1})
+
+
+@receiver(post_delete, sender=WorkoutLog)
+@_ignore_archiving
+def uncount_workout(sender, instance, **kwargs):
+    stats.apply_deltas({'total_workouts': -1})
+
+
+# -----------------------------
+# Stress Map Cache
+# -----------------------------
+@receiver(post_save, sender=WorkoutLog)
+@receiver(post_save, sender=InjuryReport)
+@receiver(post_delete, sender=WorkoutLog)
+@receiver(post_delete, sender=InjuryReport)
+@_ignore_archiving
+def invalidate_stress_map(sender, instance, **kwargs):
+    stressmap.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=HealthMetric)
+@receiver(post_delete, sender=HealthMetric)
+@_ignore_archiving
+def invalidate_stress_map_on_stress_reading(sender, instance, **kwargs):
+    if instance.metric_type == 'stress':
+        stressmap.invalidate(instance.user_id)
+
+
+# -----------------------------
+# Live Event Publishing
+# -----------------------------
+@receiver(post_save, sender=WorkoutLog)
+@receiver(post_delete, sender=WorkoutLog)
+@_ignore_archiving
+def publish_workout(sender, instance, **kwargs):
+    if not live.broker.has_subscribers(instance.user_id) or _user_cascade(kwargs):
+        return
+    live.publish_change(instance.user_id, {
+        'type': 'workout',
+        'athlete': instance.user_id,
+        'action': 'saved' if 'created' in kwargs else 'deleted',
+        'id': instance.pk,
+        'date': instance.date,
+        'activity_type': instance.activity_type,
+        'duration_minutes': instance.duration_minutes,
+    })
+
+
+@receiver(post_save, sender=HealthMetric)
+@receiver(post_delete, sender=HealthMetric)
+@_ignore_archiving
+def publish_metric(sender, instance, **kwargs):
+    if not live.broker.has_subscribers(instance.user_id) or _user_cascade(kwargs):
+        return
+    live.publish_change(instance.user_id, {
+        'type': 'metric',
+        'athlete': instance.user_id,
+        'action': 'saved' if 'created' in kwargs else 'deleted',
+        'metric_type': instance.metric_type,
+        'value': instance.value,
+        'date_recorded': instance.date_recorded,
+    })
+
+
+# -----------------------------
+# Food Item Index
+# -----------------------------
+@receiver(post_save, sender=NutritionLog)
+def index_food_items(sender, instance, **kwargs):
+    # Deleting a log removes its items through the foreign key cascade
+    nutrition.index_log(instance)
+
+
+# -----------------------------
+# Injury Analytics
+# -----------------------------
+@receiver(post_save, sender=InjuryReport)
+@receiver(post_delete, sender=InjuryReport)
+def invalidate_injury_analytics(sender, instance, **kwargs):
+    injuries.invalidate()
+
+
+# -----------------------------
+# Cohort Index
+# -----------------------------
+@receiver(post_save, sender=Onboarding)
+@receiver(post_delete, sender=Onboarding)
+def record_profile_change(sender, instance, **kwargs):
+    cohorts.record_change(instance.user_id)
+
+
+@receiver(post_save, sender=CustomUser)
+def record_eligibility_change(sender, instance, created, **kwargs):
+    # Only athletes that are active are indexed; other user saves do not matter
+    previous = getattr(instance, '_previous_counters', None)
+    current = stats.user_counter_fields(instance.role, instance.is_active)
+    if not created and previous is not None and previous != current:
+        cohorts.record_change(instance.pk)
+
+
+# -----------------------------
+# Conditional GET Versions
+# -----------------------------
+@receiver(post_save, sender=Onboarding)
+@receiver(post_save, sender=WorkoutLog)
+@receiver(post_save, sender=HealthMetric)
+@receiver(post_save, sender=NutritionLog)
+@receiver(post_save, sender=InjuryReport)
+@receiver(post_delete, sender=Onboarding)
+@receiver(post_delete, sender=WorkoutLog)
+@receiver(post_delete, sender=HealthMetric)
+@receiver(post_delete, sender=NutritionLog)
+@receiver(post_delete, sender=InjuryReport)
+@_ignore_archiving
+def bump_resource_version(sender, instance, **kwargs):
+    # The counters are deleted along with the user
+    if _user_cascade(kwargs):
+        return
+    versions.bump(instance.user_id, versions.MODEL_RESOURCES[sender])
+
+
+# -----------------------------
+# Sync Tombstones
+# -----------------------------
+@receiver(post_delete, sender=WorkoutLog)
+@receiver(post_delete, sender=HealthMetric)
+@receiver(post_delete, sender=NutritionLog)
+@receiver(post_delete, sender=InjuryReport)
+@_ignore_archiving
+def record_tombstone(sender, instance, **kwargs):
+    # Runs inside the delete's transaction; nothing is left to sync for a deleted user
+    if _user_cascade(kwargs):
+        return
+    sync.record_delete(versions.MODEL_RESOURCES[sender], instance)
+
+
+# -----------------------------
+# Authentication User Cache
+# -----------------------------
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+# -----------------------------
+# Request Metrics
+# -----------------------------
+@receiver(connection_created)
+def observe_connection_queries(sender, connection, **kwargs):
+    # Async views query from sync_to_async threads with connections of their own
+    install_query_observer(connection)
@@ -0,0 +1,128 @@
+"""
+Admin dashboard counters.
+
+Signals apply small F() deltas to the single PlatformStats row; the
+reconcile_admin_stats command recomputes everything from the source tables.
+"""
+from django.db import transaction
+from django.db.models import Avg, Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import ArchivedLogChunk, AthleteRiskScore, CustomUser, PlatformStats, WorkoutLog
+
+STATS_PK = 1
+LOW_RISK_BELOW = 40
+HIGH_RISK_FROM = 70
+USER_GROWTH_MONTHS = 6
+
+
+def get_stats():
+    stats, _ = PlatformStats.objects.get_or_create(pk=STATS_PK)
+    return stats
+
+
+def _month_key(moment):
+    if timezone.is_aware(moment):
+        moment = timezone.localtime(moment)
+    return moment.strftime('%Y-%m')
+
+
+def user_counter_fields(role, is_active):
+    """Counters a user with this role/active flag contributes to."""
+    fields = ['total_users']
+    if is_active and role == 'athlete':
+        fields.append('active_athletes')
+    if is_active and role == 'coach':
+        fields.append('active_coaches')
+    return fields
+
+
+def apply_deltas(deltas):
+    """Add {field: delta} to the stats row without reading it first."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    get_stats()
+    PlatformStats.objects.filter(pk=STATS_PK).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def record_signup(date_joined, delta=1):
+    with transaction.atomic():
+        get_stats()
+        stats = PlatformStats.objects.select_for_update().get(pk=STATS_PK)
+        month = _month_key(date_joined or timezone.now())
+        stats.signups_by_month[month] = max(0, stats.signups_by_month.get(month, 0) + delta)
+        stats.save(update_fields=['signups_by_month', 'updated_at'])
+
+
+def user_growth(stats, months=USER_GROWTH_MONTHS):
+    """Cumulative user totals at the end of each of the last `months` months."""
+    today = timezone.localdate()
+    keys = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        keys.append(f'{year:04d}-{month:02d}')
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+    series = []
+    total = stats.total_users
+    for key in keys:
+        series.append({'month': key, 'users': total})
+        total -= stats.signups_by_month.get(key, 0)
+    return list(reversed(series))
+
+
+def as_dashboard(stats):
+    return {
+        'totalUsers': stats.total_users,
+        'activeAthletes': stats.active_athletes,
+        'activeCoaches': stats.active_coaches,
+        'totalWorkouts': stats.total_workouts,
+        'avgInjuryRisk': round(stats.avg_injury_risk) if stats.avg_injury_risk is not None else None,
+        'userGrowth': user_growth(stats),
+        'riskDistribution': [
+            {'level': 'Low Risk', 'count': stats.low_risk_count},
+            {'level': 'Medium Risk', 'count': stats.medium_risk_count},
+            {'level': 'High Risk', 'count': stats.high_risk_count},
+        ],
+        'updatedAt': stats.updated_at,
+        'reconciledAt': stats.reconciled_at,
+    }
+
+
+def reconcile():
+    """Recompute every counter from the source tables."""
+    users = CustomUser.objects.aggregate(
+        total_users=Count('pk'),
+        active_athletes=Count('pk', filter=Q(is_active=True, role='athlete')),
+        active_coaches=Count('pk', filter=Q(is_active=True, role='coach')),
+    )
+    signups = {
+        row['month'].strftime('%Y-%m'): row['count']
+        for row in CustomUser.objects.annotate(month=TruncMonth('date_joined'))
+        .values('month').annotate(count=Count('pk')).order_by()
+    }
+
+    risks = AthleteRiskScore.objects.filter(
+        user__role='athlete', user__is_active=True, injury_risk__isnull=False
+    ).aggregate(
+        avg_injury_risk=Avg('injury_risk'),
+        low_risk_count=Count('pk', filter=Q(injury_risk__lt=LOW_RISK_BELOW)),
+        medium_risk_count=Count('pk', filter=Q(injury_risk__gte=LOW_RISK_BELOW, injury_risk__lt=HIGH_RISK_FROM)),
+        high_risk_count=Count('pk', filter=Q(injury_risk__gte=HIGH_RISK_FROM)),
+    )
+
+    stats = get_stats()
+    for field, value in {**users, **risks}.items():
+        setattr(stats, field, value)
+    # Archived workouts still count, as they did before they were moved
+    archived = ArchivedLogChunk.objects.filter(resource='workouts').aggregate(rows=Sum('row_count'))['rows']
+    stats.total_workouts = WorkoutLog.objects.count() + (archived or 0)
+    stats.signups_by_month = signups
+    stats.reconciled_at = timezone.now()
+    stats.save()
+    return stats
@@ -0,0 +1,239 @@
+"""
+Per-region body stress, computed from recent workouts, open injuries and the
+athlete's latest stress reading.
+
+Daily load per activity class is folded through four decay kernels (level,
+fatigue, joint load, stress) and then mapped onto the 24 body regions with a
+single product against the precomputed (activity x region) weight matrix.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import scoring
+from .models import HealthMetric, InjuryReport, WorkoutLog
+
+# Entries live in the shared cache (settings.CACHES) and writes delete them
+# there, so every worker recomputes on its next read; the timeout only bounds
+# staleness after changes that skip the signals, such as queryset updates
+STRESS_MAP_CACHE_TIMEOUT = 5 * 60
+LOOKBACK_DAYS = 14
+BASELINE_STRESS = 35.0
+
+REGIONS = [
+    ('front', 'head'), ('front', 'neck'), ('front', 'shoulders'), ('front', 'chest'),
+    ('front', 'arms'), ('front', 'elbows'), ('front', 'wrists'), ('front', 'hands'),
+    ('front', 'abdomen'), ('front', 'hips'), ('front', 'thighs'), ('front', 'knees'),
+    ('front', 'shins'), ('front', 'ankles'), ('front', 'feet'),
+    ('back', 'head'), ('back', 'neck'), ('back', 'upperBack'), ('back', 'midBack'),
+    ('back', 'lowerBack'), ('back', 'glutes'), ('back', 'hamstrings'), ('back', 'calves'),
+    ('back', 'heels'),
+]
+MEASURES = ['level', 'fatigue', 'jointLoad', 'stress']
+
+# Region emphasis per activity class (regions not listed get the baseline weight)
+ACTIVITY_REGION_WEIGHTS = {
+    'running': {
+        'hips': .6, 'thighs': .7, 'knees': .9, 'shins': .8, 'ankles': .8, 'feet': .8, 'glutes': .6,
+        'hamstrings': .8, 'calves': .9, 'heels': .7, 'lowerBack': .4, 'abdomen': .3,
+    },
+    'cycling': {
+        'thighs': .9, 'knees': .8, 'hips': .6, 'glutes': .7, 'hamstrings': .5, 'calves': .5,
+        'lowerBack': .5, 'neck': .3, 'wrists': .3, 'hands': .3, 'shoulders': .2,
+    },
+    'swimming': {
+        'shoulders': .9, 'arms': .7, 'chest': .6, 'upperBack': .8, 'midBack': .5, 'neck': .4,
+        'elbows': .4, 'thighs': .3, 'ankles': .3, 'lowerBack': .3,
+    },
+    'strength': {
+        'shoulders': .8, 'chest': .7, 'arms': .8, 'elbows': .6, 'wrists': .6, 'hands': .5,
+        'abdomen': .5, 'hips': .5, 'thighs': .7, 'knees': .6, 'upperBack': .6, 'midBack': .6,
+        'lowerBack': .8, 'glutes': .7, 'hamstrings': .6,
+    },
+    'crossfit': {
+        'shoulders': .8, 'chest': .6, 'arms': .7, 'elbows': .5, 'wrists': .6, 'hands': .5,
+        'abdomen': .6, 'hips': .6, 'thighs': .7, 'knees': .7, 'shins': .4, 'ankles': .5,
+        'upperBack': .6, 'midBack': .5, 'lowerBack': .7, 'glutes': .6, 'hamstrings': .6, 'calves': .5,
+    },
+    'rowing': {
+        'shoulders': .6, 'arms': .7, 'hands': .6, 'thighs': .6, 'upperBack': .8, 'midBack': .7,
+        'lowerBack': .8, 'glutes': .5, 'hamstrings': .5,
+    },
+    'walking': {
+        'hips': .4, 'thighs': .4, 'knees': .5, 'shins': .4, 'ankles': .5, 'feet': .6,
+        'hamstrings': .4, 'calves': .5, 'heels': .5,
+    },
+    'hiking': {
+        'hips': .5, 'thighs': .7, 'knees': .8, 'shins': .5, 'ankles': .7, 'feet': .7,
+        'lowerBack': .5, 'glutes': .6, 'hamstrings': .5, 'calves': .7, 'heels': .5,
+    },
+    'mobility': {
+        'neck': .2, 'shoulders': .3, 'wrists': .4, 'hips': .4, 'lowerBack': .3, 'hamstrings': .4,
+    },
+    'team': {
+        'hips': .6, 'thighs': .7, 'knees': .8, 'shins': .6, 'ankles': .8, 'feet': .6,
+        'hamstrings': .8, 'calves': .7, 'heels': .5, 'glutes': .5, 'shoulders': .3,
+    },
+    'racquet': {
+        'shoulders': .7, 'arms': .5, 'elbows': .7, 'wrists': .6, 'hands': .4, 'knees': .6,
+        'ankles': .6, 'calves': .5, 'lowerBack': .4,
+    },
+    'other': {},
+}
+BASELINE_WEIGHT = {'other': .3}
+DEFAULT_BASELINE_WEIGHT = .05
+
+# Impact factor applied to the joint-load measure
+ACTIVITY_IMPACT = {
+    'running': 1.0, 'crossfit': .9, 'team': .9, 'strength': .8, 'racquet': .8, 'hiking': .7,
+    'walking': .5, 'rowing': .4, 'cycling': .3, 'mobility': .2, 'swimming': .1, 'other': .5,
+}
+
+ACTIVITY_KEYWORDS = [
+    ('crossfit', 'crossfit'), ('hiit', 'crossfit'),
+    ('run', 'running'), ('jog', 'running'), ('sprint', 'running'), ('interval', 'running'),
+    ('cycl', 'cycling'), ('bike', 'cycling'), ('spin', 'cycling'),
+    ('swim', 'swimming'),
+    ('weight', 'strength'), ('lift', 'strength'), ('strength', 'strength'), ('gym', 'strength'),
+    ('row', 'rowing'),
+    ('walk', 'walking'),
+    ('hike', 'hiking'), ('hiking', 'hiking'), ('trek', 'hiking'),
+    ('yoga', 'mobility'), ('pilates', 'mobility'), ('stretch', 'mobility'),
+    ('football', 'team'), ('soccer', 'team'), ('basketball', 'team'), ('rugby', 'team'),
+    ('hockey', 'team'), ('netball', 'team'), ('volleyball', 'team'),
+    ('tennis', 'racquet'), ('squash', 'racquet'), ('badminton', 'racquet'), ('padel', 'racquet'),
+]
+
+INJURY_KEYWORDS = [
+    ('knee', ['knees']), ('ankle', ['ankles']), ('achilles', ['heels', 'calves']),
+    ('hamstring', ['hamstrings']), ('calf', ['calves']), ('shin', ['shins']),
+    ('quad', ['thighs']), ('thigh', ['thighs']), ('groin', ['hips']), ('hip', ['hips']),
+    ('glute', ['glutes']), ('lower back', ['lowerBack']), ('back', ['lowerBack', 'midBack']),
+    ('shoulder', ['shoulders']), ('rotator', ['shoulders']), ('elbow', ['elbows']),
+    ('wrist', ['wrists']), ('hand', ['hands']), ('neck', ['neck']), ('foot', ['feet']),
+    ('plantar', ['feet', 'heels']), ('concussion', ['head']),
+]
+INJURY_SEVERITY_BOOST = {'minor': 10, 'moderate': 20, 'severe': 35}
+
+# Saturation scale per measure: a region at `scale` load reads about 67
+MEASURE_SCALES = np.array([1000.0, 500.0, 1000.0, 1000.0])
+
+ACTIVITIES = list(ACTIVITY_REGION_WEIGHTS)
+ACTIVITY_INDEX = {activity: index for index, activity in enumerate(ACTIVITIES)}
+REGION_NAMES = [name for _, name in REGIONS]
+REGION_COLUMNS = {}
+for _column, _name in enumerate(REGION_NAMES):
+    REGION_COLUMNS.setdefault(_name, []).append(_column)
+
+
+def _weight_matrix():
+    weights = np.empty((len(ACTIVITIES), len(REGIONS)))
+    for row, activity in enumerate(ACTIVITIES):
+        weights[row, :] = BASELINE_WEIGHT.get(activity, DEFAULT_BASELINE_WEIGHT)
+        for column, name in enumerate(REGION_NAMES):
+            if name in ACTIVITY_REGION_WEIGHTS[activity]:
+                weights[row, column] = ACTIVITY_REGION_WEIGHTS[activity][name]
+    return weights
+
+
+def _kernels():
+    """(measures x days) decay weights; column 0 is today."""
+    days = np.arange(LOOKBACK_DAYS)
+    level = np.clip(1 - days / 7.0, 0, None)
+    fatigue = 0.5 ** days
+    stress = 0.85 ** days
+    return np.vstack([level, fatigue, level, stress])
+
+
+WEIGHTS = _weight_matrix()
+KERNELS = _kernels()
+IMPACT = np.array([ACTIVITY_IMPACT[activity] for activity in ACTIVITIES])
+
+
+def activity_class(activity_type):
+    activity_type = (activity_type or '').lower()
+    for keyword, activity in ACTIVITY_KEYWORDS:
+        if keyword in activity_type:
+            return activity
+    return 'other'
+
+
+def injured_regions(injury_type):
+    injury_type = (injury_type or '').lower()
+    for keyword, regions in INJURY_KEYWORDS:
+        if keyword in injury_type:
+            return regions
+    return []
+
+
+def compute(daily_loads, injuries=(), stress=None):
+    """
+    daily_loads: (days x activities) load array, row 0 is today.
+    injuries: iterable of (injury_type, severity) for unresolved injuries.
+    stress: latest stress reading, scaled against BASELINE_STRESS.
+
+    Returns a (measures x regions) array of 10-100 scores.
+    """
+    exposure = KERNELS @ daily_loads          # measures x activities
+    exposure[2] *= IMPACT                      # joint load favours high-impact work
+    region_load = exposure @ WEIGHTS           # measures x regions
+    scores = 10 + 90 * (1 - np.exp(-region_load / MEASURE_SCALES[:, None]))
+
+    for injury_type, severity in injuries:
+        boost = INJURY_SEVERITY_BOOST.get(severity, 0)
+        for region in injured_regions(injury_type):
+            scores[:, REGION_COLUMNS[region]] += boost
+
+    if stress is not None:
+        scores[3] *= np.clip(stress / BASELINE_STRESS, 0.5, 2.0)
+    return np.clip(np.round(scores), 10, 100)
+
+
+def as_payload(scores):
+    payload = {'front': {}, 'back': {}}
+    for column, (side, name) in enumerate(REGIONS):
+        payload[side][name] = {measure: int(scores[row, column]) for row, measure in enumerate(MEASURES)}
+    return payload
+
+
+def build(user_id, today):
+    start = today - timedelta(days=LOOKBACK_DAYS - 1)
+    daily_loads = np.zeros((LOOKBACK_DAYS, len(ACTIVITIES)))
+    workouts = WorkoutLog.objects.filter(user_id=user_id, date__range=(start, today)).values_list(
+        'date', 'activity_type', 'duration_minutes', 'average_heart_rate'
+    )
+    for date, activity_type, duration, heart_rate in workouts:
+        daily_loads[(today - date).days, ACTIVITY_INDEX[activity_class(activity_type)]] += (
+            scoring.workout_load(duration, heart_rate)
+        )
+
+    injuries = InjuryReport.objects.filter(user_id=user_id).exclude(
+        recovery_status__iexact='recovered'
+    ).values_list('injury_type', 'severity')
+    stress = HealthMetric.objects.filter(
+        user_id=user_id, metric_type='stress', date_recorded__lte=today
+    ).order_by('-date_recorded').values_list('value', flat=True).first()
+
+    scores = compute(daily_loads, list(injuries), None if stress is None else float(stress))
+    return as_payload(scores)
+
+
+def cache_key(user_id, today):
+    return f'stressmap:{user_id}:{today.isoformat()}'
+
+
+def invalidate(user_id):
+    cache.delete(cache_key(user_id, timezone.localdate()))
+
+
+def get_stress_map(user_id):
+    """Cached stress map for today; recomputed only after the athlete's data changes."""
+    today = timezone.localdate()
+    key = cache_key(user_id, today)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build(user_id, today)
+        cache.set(key, payload, STRESS_MAP_CACHE_TIMEOUT)
+    return payload
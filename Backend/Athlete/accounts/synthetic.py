@@ -0,0 +1,210 @@
+"""
+Synthetic athletes, coaches and log history for benchmarks.
+
+Distributions follow the frontend's dummyData.ts: metrics vary about +/-5%
+around its base values (HRV 65, sleep 7.5 h, hydration 85%, stress 35,
+resting HR 52), workouts are ~45 minute sessions burning ~520 kcal, and
+nutrition targets 2400 kcal with 150/280/70 g of protein/carbs/fat.
+Everything is written with bulk_create, then rollups, risk scores and the
+admin counters are rebuilt once.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import cohorts, injuries, nutrition, risk, rollups, stats
+from .models import (
+    CustomUser, HealthMetric, InjuryReport, NutritionLog, Onboarding, WorkoutLog
+)
+
+PASSWORD = 'synthetic-password'
+EMAIL_DOMAIN = 'synthetic.example.com'
+BATCH_SIZE = 5000
+
+METRIC_BASES = {
+    # metric: (base, low, high, unit, decimals)
+    'hrv': (65, 20, 100, 'ms', 0),
+    'sleep': (7.5, 4, 12, 'hours', 1),
+    'hydration': (85, 50, 100, '%', 0),
+    'stress': (35, 10, 90, '', 0),
+    'resting_hr': (52, 40, 80, 'bpm', 0),
+}
+SPORTS = {
+    # sport: (session types, km per minute or None)
+    'Running': (['Easy Run', 'Interval Training', 'Tempo Run', 'Long Run'], 0.18),
+    'Weightlifting': (['Strength Training', 'Olympic Lifting', 'Mobility'], None),
+    'CrossFit': (['CrossFit WOD', 'HIIT', 'Strength Training'], None),
+    'Swimming': (['Swim Endurance', 'Swim Intervals', 'Strength Training'], 0.04),
+    'Cycling': (['Road Ride', 'Spin Class', 'Hill Repeats'], 0.45),
+}
+MEALS = {
+    # meal: (share of daily calories, food choices)
+    'breakfast': (0.25, ['oatmeal', 'berries', 'banana', 'peanut butter', 'eggs', 'yogurt']),
+    'lunch': (0.35, ['grilled chicken', 'quinoa', 'vegetables', 'rice', 'salad', 'wrap']),
+    'dinner': (0.30, ['salmon', 'sweet potato', 'broccoli', 'pasta', 'lean beef', 'tofu']),
+    'snack': (0.10, ['protein shake', 'fruit', 'nuts', 'granola bar']),
+}
+DAILY_CALORIES = 2400
+MACRO_TARGETS = {'protein_g': 150, 'carbs_g': 280, 'fats_g': 70}
+INJURY_TYPES = [
+    'knee strain', 'ankle sprain', 'hamstring strain', 'lower back pain', 'shoulder impingement',
+    'achilles tendinopathy', 'shin splints', 'wrist sprain', 'plantar fasciitis',
+]
+INJURIES_PER_YEAR = 1.5
+REGIONS = ['Nairobi', 'London', 'New York', 'Sydney', 'Berlin', 'Toronto']
+
+
+def _varied(rng, base, size, spread=0.05):
+    """dummyData.ts style: uniform +/-spread around base plus a weekly cycle."""
+    days = np.arange(size)
+    return base * (1 + rng.uniform(-spread, spread, size) + 0.05 * np.sin(days * 2 * np.pi / 7))
+
+
+def _users(role, count, prefix, password_hash, coaches=()):
+    users = [
+        CustomUser(
+            email=f'{prefix}-{role}{index}@{EMAIL_DOMAIN}',
+            full_name=f'{role.title()} {index}',
+            role=role,
+            password=password_hash,
+            is_staff=role == 'admin',
+            coach=coaches[index % len(coaches)] if coaches else None,
+        )
+        for index in range(count)
+    ]
+    CustomUser.objects.bulk_create(users, batch_size=BATCH_SIZE)
+    return list(CustomUser.objects.filter(email__startswith=f'{prefix}-{role}').order_by('pk'))
+
+
+def _onboarding(rng, athlete, sport):
+    return Onboarding(
+        user=athlete,
+        age=int(rng.integers(18, 41)),
+        gender=str(rng.choice(['male', 'female'])),
+        region=str(rng.choice(REGIONS)),
+        food_types=['high-protein', 'whole-foods'],
+        sports_activities=[sport],
+        activity_level=str(rng.choice(['active', 'very-active'])),
+        primary_goals=['performance', 'injury-prevention'],
+        experience_level=str(rng.choice(['beginner', 'intermediate', 'advanced'])),
+        timeline=str(rng.choice(['short-term', 'medium-term', 'long-term'])),
+    )
+
+
+def _workouts(rng, athlete, sport, dates):
+    session_types, km_per_minute = SPORTS[sport]
+    trained = rng.random(len(dates)) < 0.8           # ~5-6 sessions a week
+    doubles = rng.random(len(dates)) < 0.1
+    rows = []
+    for day in np.flatnonzero(trained):
+        count = 2 if doubles[day] else 1
+        for activity_type in rng.choice(session_types, size=count, replace=False):
+            duration = int(np.clip(rng.normal(45, 12), 15, 150))
+            average_hr = int(np.clip(rng.normal(140, 12), 95, 185))
+            rows.append(WorkoutLog(
+                user=athlete,
+                date=dates[day],
+                activity_type=str(activity_type),
+                duration_minutes=duration,
+                distance_km=round(duration * km_per_minute * rng.uniform(0.85, 1.15), 2) if km_per_minute else None,
+                calories_burned=int(duration * 520 / 45 * rng.uniform(0.9, 1.1)),
+                average_heart_rate=average_hr,
+                max_heart_rate=average_hr + int(rng.integers(15, 31)),
+            ))
+    return rows
+
+
+def _metrics(rng, athlete, dates):
+    rows = []
+    baseline = rng.normal(1, 0.08)                   # athletes differ from one another
+    for metric_type, (base, low, high, unit, decimals) in METRIC_BASES.items():
+        values = np.clip(_varied(rng, base * baseline, len(dates)), low, high).round(decimals)
+        rows.extend(
+            HealthMetric(user=athlete, metric_type=metric_type, value=float(value), unit=unit,
+                         date_recorded=date, source='synthetic')
+            for date, value in zip(dates, values)
+        )
+    return rows
+
+
+def _nutrition(rng, athlete, dates):
+    rows = []
+    for date in dates:
+        for meal_type, (share, foods) in MEALS.items():
+            if meal_type == 'snack' and rng.random() < 0.5:
+                continue
+            factor = share * rng.uniform(0.9, 1.1)
+            rows.append(NutritionLog(
+                user=athlete,
+                date=date,
+                meal_type=meal_type,
+                food_items=[str(food) for food in rng.choice(foods, size=2, replace=False)],
+                calories=int(DAILY_CALORIES * factor),
+                water_ml=int(3200 * share * rng.uniform(0.8, 1.2)),
+                **{field: round(target * factor, 1) for field, target in MACRO_TARGETS.items()},
+            ))
+    return rows
+
+
+def _injuries(rng, athlete, dates, today):
+    count = rng.poisson(INJURIES_PER_YEAR * len(dates) / 365)
+    rows = []
+    for date in sorted(rng.choice(dates, size=min(count, len(dates)), replace=False)):
+        severity = str(rng.choice(['minor', 'moderate', 'severe'], p=[0.6, 0.3, 0.1]))
+        rows.append(InjuryReport(
+            user=athlete,
+            injury_type=str(rng.choice(INJURY_TYPES)),
+            severity=severity,
+            description=f'Synthetic {severity} injury',
+            date_occurred=date,
+            recovery_status='recovering' if (today - date).days < 30 else 'recovered',
+            medical_attention=severity != 'minor',
+        ))
+    return rows
+
+
+@transaction.atomic
+def seed(athletes=50, coaches=5, admins=1, years=2, random_seed=0, prefix='synthetic'):
+    """
+    Create the users and their history; returns the created users by role
+    and the row counts per model. All users share PASSWORD.
+    """
+    rng = np.random.default_rng(random_seed)
+    password_hash = make_password(PASSWORD)
+    today = timezone.localdate()
+    dates = [today - timedelta(days=offset) for offset in range(years * 365 - 1, -1, -1)]
+
+    created = {'admin': _users('admin', admins, prefix, password_hash)}
+    created['coach'] = _users('coach', coaches, prefix, password_hash)
+    created['athlete'] = _users('athlete', athletes, prefix, password_hash, created['coach'])
+
+    counts = {}
+    sports = list(SPORTS)
+    onboarding = []
+    for index, athlete in enumerate(created['athlete']):
+        sport = sports[index % len(sports)]
+        onboarding.append(_onboarding(rng, athlete, sport))
+        for model, rows in (
+            (WorkoutLog, _workouts(rng, athlete, sport, dates)),
+            (HealthMetric, _metrics(rng, athlete, dates)),
+            (NutritionLog, _nutrition(rng, athlete, dates)),
+            (InjuryReport, _injuries(rng, athlete, dates, today)),
+        ):
+            model.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+            counts[model.__name__] = counts.get(model.__name__, 0) + len(rows)
+    Onboarding.objects.bulk_create(onboarding, batch_size=BATCH_SIZE)
+    counts['Onboarding'] = len(onboarding)
+    counts['CustomUser'] = sum(len(users) for users in created.values())
+
+    # bulk_create skips signals, so derive everything once at the end
+    for athlete in created['athlete']:
+        rollups.rebuild_user(athlete.pk)
+    risk.score_users([athlete.pk for athlete in created['athlete']])
+    nutrition.index_logs(NutritionLog.objects.filter(user__in=created['athlete']))
+    cohorts.invalidate()
+    injuries.invalidate()
+    stats.reconcile()
+    return created, counts
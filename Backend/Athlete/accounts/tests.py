@@ -1,3 +1,1463 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import tempfile
+import threading
+from datetime import date, timedelta
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts import (
+    cohorts, export, fitness, forecasts, imports, live, metrics, risk, rollups, roster, scoring, stats, stressmap,
+    timeseries, versions,
+)
+from accounts.activity_files import parse_file
+from accounts.authentication import user_cache
+from accounts.management.commands.benchmark_endpoints import QUERY_BUDGETS
+from accounts.models import (
+    ArchivedLogChunk, AthleteRiskScore, CustomUser, DailyRollup, FoodItem, HealthMetric, InjuryReport, IntradayChunk,
+    NutritionLog, Onboarding, PlatformStats, TrainingForecast, WorkoutLog,
+)
+from accounts.views import HEALTH_METRIC_BULK_MAX_ROWS
+
+
+# -----------------------------
+# Health Metric Bulk Ingest Tests
+# -----------------------------
+class HealthMetricBulkTests(TestCase):
+    url = '/api/accounts/health-metrics/bulk/'
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('bulk@example.com', 'Bulk User', role='athlete')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        HealthMetric.objects.create(user=self.user, metric_type='hrv', value=50, unit='ms',
+                                    date_recorded=date(2024, 1, 1))
+
+    def test_rows_report_their_own_status(self):
+        readings = [
+            {'metric_type': 'hrv', 'value': 55, 'unit': 'ms', 'date_recorded': '2024-01-01'},
+            {'metric_type': 'sleep', 'value': 6, 'unit': 'h', 'date_recorded': '2024-01-02'},
+            {'metric_type': 'sleep', 'value': 8, 'unit': 'h', 'date_recorded': '2024-01-02'},
+            {'metric_type': 'stress', 'value': 'high', 'date_recorded': '2024-01-02'},
+            {'metric_type': 'resting_hr', 'value': 52, 'unit': 'bpm', 'date_recorded': '2024-01-03'},
+        ]
+        response = self.client.post(self.url, {'readings': readings}, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['status'] for result in response.data['results']],
+                         ['updated', 'superseded', 'created', 'invalid', 'created'])
+        self.assertIn('value', response.data['results'][3]['errors'])
+        self.assertEqual(response.data['counts'], {'updated': 1, 'superseded': 1, 'created': 2, 'invalid': 1})
+        self.assertEqual(response.data['written'], 3)
+        stored = dict(HealthMetric.objects.filter(user=self.user).values_list('metric_type', 'value'))
+        self.assertEqual({metric: float(value) for metric, value in stored.items()},
+                         {'hrv': 55, 'sleep': 8, 'resting_hr': 52})
+
+    def test_upload_refreshes_rollups_versions_and_risk(self):
+        AthleteRiskScore.objects.filter(user=self.user).delete()
+        version = versions.current(self.user.id, 'health-metrics')
+        readings = [
+            {'metric_type': 'hrv', 'value': 61, 'unit': 'ms', 'date_recorded': '2024-01-01'},
+            {'metric_type': 'sleep', 'value': 7.5, 'unit': 'h', 'date_recorded': '2024-01-02'},
+        ]
+        response = self.client.post(self.url, readings, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        rollups = dict(DailyRollup.objects.filter(user=self.user).values_list('date', 'hrv'))
+        self.assertEqual(rollups[date(2024, 1, 1)], 61)
+        self.assertEqual(DailyRollup.objects.get(user=self.user, date=date(2024, 1, 2)).sleep, 7.5)
+        self.assertGreater(versions.current(self.user.id, 'health-metrics'), version)
+        self.assertTrue(AthleteRiskScore.objects.filter(user=self.user, as_of=timezone.localdate()).exists())
+
+    def test_payload_shape_and_size_are_checked(self):
+        self.assertEqual(self.client.post(self.url, {'readings': 'nope'}, format='json').status_code, 400)
+        too_many = [{}] * (HEALTH_METRIC_BULK_MAX_ROWS + 1)
+        self.assertEqual(self.client.post(self.url, too_many, format='json').status_code, 400)
+
+
+# -----------------------------
+# Coach Roster Tests
+# -----------------------------
+class CoachRosterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coach = CustomUser.objects.create_user('coach@example.com', 'Coach', 'password123', role='coach')
+        self.client = APIClient()
+        self.client.force_authenticate(self.coach)
+
+    def add_athletes(self, count):
+        start = CustomUser.objects.filter(role='athlete').count()
+        for index in range(start, start + count):
+            athlete = CustomUser.objects.create_user(
+                f'athlete{index}@example.com', f'Athlete {index}', coach=self.coach
+            )
+            for offset in range(3):
+                WorkoutLog.objects.create(
+                    user=athlete, date=date(2025, 1, 1) + timedelta(days=offset),
+                    activity_type='running', duration_minutes=45, average_heart_rate=150
+                )
+            HealthMetric.objects.create(user=athlete, metric_type='hrv', value=65, date_recorded=date(2025, 1, 3))
+
+    def roster_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/accounts/coach/roster/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data
+
+    def test_query_count_is_flat_as_roster_grows(self):
+        self.add_athletes(2)
+        small_count, small_rows = self.roster_queries()
+        self.add_athletes(25)
+        large_count, large_rows = self.roster_queries()
+
+        self.assertEqual(len(small_rows), 2)
+        self.assertEqual(len(large_rows), 27)
+        self.assertEqual(small_count, large_count)
+
+    def test_rows_are_cached_and_invalidated_on_write(self):
+        self.add_athletes(3)
+        self.client.get('/api/accounts/coach/roster/')
+
+        with self.assertNumQueries(1):
+            rows = self.client.get('/api/accounts/coach/roster/').data
+        self.assertEqual(rows[0]['lastWorkout'], '2025-01-03')
+
+        athlete = CustomUser.objects.get(email='athlete0@example.com')
+        WorkoutLog.objects.create(user=athlete, date=date(2025, 1, 9), activity_type='cycling', duration_minutes=60)
+
+        rows = {row['id']: row for row in self.client.get('/api/accounts/coach/roster/').data}
+        self.assertEqual(rows[athlete.id]['lastWorkout'], '2025-01-09')
+
+    def test_athletes_cannot_view_a_roster(self):
+        athlete = CustomUser.objects.create_user('solo@example.com', 'Solo', 'password123')
+        self.client.force_authenticate(athlete)
+        self.assertEqual(self.client.get('/api/accounts/coach/roster/').status_code, 403)
+
+
+# -----------------------------
+# Cached JWT Authentication Tests
+# -----------------------------
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = CustomUser.objects.create_user('cached@example.com', 'Cached User')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_me_needs_no_queries_once_cached(self):
+        self.assertEqual(self.client.get('/api/accounts/me/').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/accounts/me/')
+        self.assertEqual(response.data['email'], 'cached@example.com')
+
+    def test_role_and_active_changes_invalidate_the_cache(self):
+        self.client.get('/api/accounts/me/')
+        self.user.role = 'coach'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/accounts/me/').data['role'], 'coach')
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/accounts/me/').status_code, 401)
+
+
+# -----------------------------
+# Daily Rollup Tests
+# -----------------------------
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('rollup@example.com', 'Rollup User', role='athlete')
+
+    def log_day(self, user, day):
+        WorkoutLog.objects.create(user=user, date=day, activity_type='run', duration_minutes=40,
+                                  average_heart_rate=150)
+        HealthMetric.objects.create(user=user, metric_type='hrv', value=60, unit='ms', date_recorded=day)
+        NutritionLog.objects.create(user=user, date=day, meal_type='lunch', calories=700)
+        InjuryReport.objects.create(user=user, injury_type='Strain', severity='minor', description='',
+                                    date_occurred=day)
+
+    def snapshot(self):
+        fields = [field.name for field in DailyRollup._meta.concrete_fields if field.name not in ('id', 'updated_at')]
+        return list(DailyRollup.objects.filter(user=self.user).order_by('date').values(*fields))
+
+    def test_incremental_refresh_matches_a_full_rebuild(self):
+        start = date(2024, 1, 1)
+        for day in range(40):
+            WorkoutLog.objects.create(user=self.user, date=start + timedelta(days=day), activity_type='run',
+                                      duration_minutes=30 + day % 7 * 10, average_heart_rate=140 + day % 5)
+            HealthMetric.objects.create(user=self.user, metric_type='hrv', value=55 + day % 9, unit='ms',
+                                        date_recorded=start + timedelta(days=day))
+
+        # Move one workout to another day, change another and drop a reading
+        moved = WorkoutLog.objects.get(user=self.user, date=start + timedelta(days=10))
+        moved.date, moved.duration_minutes = start + timedelta(days=45), 120
+        moved.save()
+        edited = WorkoutLog.objects.get(user=self.user, date=start + timedelta(days=20))
+        edited.average_heart_rate = 175
+        edited.save()
+        HealthMetric.objects.get(user=self.user, date_recorded=start + timedelta(days=30)).delete()
+
+        incremental = self.snapshot()
+        rollups.rebuild_user(self.user.id)
+        self.assertEqual(incremental, self.snapshot())
+        self.assertNotIn(start + timedelta(days=10), [row['date'] for row in incremental if row['workout_count']])
+
+    def test_deleting_users_through_a_queryset_cascades_cleanly(self):
+        other = CustomUser.objects.create_user('rollup2@example.com', 'Other User', role='athlete')
+        for user in (self.user, other):
+            self.log_day(user, date(2024, 1, 1))
+        self.assertTrue(DailyRollup.objects.filter(user=self.user).exists())
+
+        # As the admin's delete action does
+        CustomUser.objects.filter(pk__in=[self.user.pk, other.pk]).delete()
+        # Deferred foreign keys are only checked at commit
+        connection.check_constraints()
+        self.assertFalse(DailyRollup.objects.exists())
+        self.assertFalse(AthleteRiskScore.objects.exists())
+
+
+# -----------------------------
+# Admin Stats Tests
+# -----------------------------
+class AdminStatsTests(TestCase):
+    fields = ('total_users', 'active_athletes', 'active_coaches', 'total_workouts')
+
+    def counters(self):
+        row = stats.get_stats()
+        return {field: getattr(row, field) for field in self.fields}
+
+    def assertCountersMoved(self, before, **deltas):
+        self.assertEqual(self.counters(), {field: value + deltas.get(field, 0) for field, value in before.items()})
+
+    def test_counters_follow_user_lifecycle(self):
+        before = self.counters()
+        user = CustomUser.objects.create_user('counted@example.com', 'Counted', role='athlete')
+        self.assertCountersMoved(before, total_users=1, active_athletes=1)
+        month = user.date_joined.strftime('%Y-%m')
+        self.assertEqual(stats.get_stats().signups_by_month[month], 1)
+
+        user.role = 'coach'
+        user.save()
+        self.assertCountersMoved(before, total_users=1, active_coaches=1)
+
+        user.is_active = False
+        user.save()
+        self.assertCountersMoved(before, total_users=1)
+        # Saving without a change moves nothing
+        user.save()
+        self.assertCountersMoved(before, total_users=1)
+
+        user.role, user.is_active = 'athlete', True
+        user.save()
+        for day in range(3):
+            WorkoutLog.objects.create(user=user, date=date(2024, 1, 1 + day), activity_type='run',
+                                      duration_minutes=30)
+        WorkoutLog.objects.filter(user=user).first().delete()
+        self.assertCountersMoved(before, total_users=1, active_athletes=1, total_workouts=2)
+
+        # The user's workouts go with them
+        user.delete()
+        self.assertCountersMoved(before)
+        self.assertEqual(stats.get_stats().signups_by_month[month], 0)
+
+    def test_reconcile_agrees_with_the_signal_counters(self):
+        coach = CustomUser.objects.create_user('stats-coach@example.com', 'Coach', role='coach')
+        for index in range(4):
+            athlete = CustomUser.objects.create_user(f'stats{index}@example.com', f'Athlete {index}', coach=coach)
+            WorkoutLog.objects.create(user=athlete, date=date(2024, 1, 1), activity_type='run', duration_minutes=30)
+        athlete.is_active = False
+        athlete.save()
+        expected = self.counters()
+
+        PlatformStats.objects.filter(pk=stats.STATS_PK).update(
+            total_users=0, active_athletes=0, active_coaches=0, total_workouts=0, signups_by_month={}
+        )
+        reconciled = stats.reconcile()
+
+        self.assertEqual(self.counters(), expected)
+        self.assertEqual(expected['active_athletes'], CustomUser.objects.filter(role='athlete', is_active=True).count())
+        self.assertEqual(sum(reconciled.signups_by_month.values()), CustomUser.objects.count())
+        self.assertIsNotNone(reconciled.reconciled_at)
+
+
+# -----------------------------
+# Injury Risk Engine Tests
+# -----------------------------
+class RiskEngineTests(TestCase):
+    as_of = date(2024, 3, 1)
+
+    def history(self, loads):
+        """28 daily loads ending on as_of, padded with rest days at the front."""
+        return [0.0] * (28 - len(loads)) + list(loads)
+
+    def train(self, user, loads):
+        # 20 minutes without a heart rate is a load of 20 x effort 5 = 100
+        for offset, load in enumerate(reversed(loads)):
+            if load:
+                WorkoutLog.objects.create(user=user, date=self.as_of - timedelta(days=offset), activity_type='run',
+                                          duration_minutes=load // 5)
+
+    def test_rolling_metrics_match_hand_worked_values(self):
+        build_up = self.history([50] * 21 + [100, 200, 100, 200, 100, 200, 100])
+        matrix = np.array([build_up, self.history([100] * 28)])
+        latest = {name: values[:, -1] for name, values in risk.rolling_metrics(matrix).items()}
+
+        # Acute 1000; chronic (21 x 50 + 1000) x 7 / 28 = 512.5
+        self.assertAlmostEqual(latest['acute_load'][0], 1000)
+        self.assertAlmostEqual(latest['chronic_load'][0], 512.5)
+        self.assertAlmostEqual(latest['acwr'][0], 1000 / 512.5)
+        # Mean 1000 / 7, population std of 4 x 100 and 3 x 200
+        mean, std = 1000 / 7, (160000 / 7 - (1000 / 7) ** 2) ** 0.5
+        self.assertAlmostEqual(latest['monotony'][0], mean / std)
+        self.assertAlmostEqual(latest['strain'][0], 1000 * mean / std)
+        self.assertEqual(latest['injury_risk'][0], scoring.injury_risk(1000 / 512.5, mean / std))
+        self.assertEqual(latest['injury_risk'][0], 85)
+
+        # Identical days have no spread: monotony is capped, and the cap drives the risk
+        self.assertAlmostEqual(latest['acwr'][1], 1.0)
+        self.assertEqual(latest['monotony'][1], scoring.MONOTONY_CAP)
+        self.assertAlmostEqual(latest['strain'][1], 700 * scoring.MONOTONY_CAP)
+        self.assertEqual(latest['injury_risk'][1], 100)
+
+    def test_zero_load_and_short_histories(self):
+        matrix = np.array([
+            self.history([]),
+            self.history([100, 100, 100]),
+            self.history([100] + [0] * 9),
+        ])
+        latest = {name: values[:, -1] for name, values in risk.rolling_metrics(matrix).items()}
+
+        # Nothing logged: every ratio is undefined
+        self.assertEqual(latest['acute_load'][0], 0)
+        for name in ('acwr', 'monotony', 'strain', 'injury_risk'):
+            self.assertTrue(np.isnan(latest[name][0]), name)
+        # Three days of history: chronic is the 28-day load scaled to a week
+        self.assertAlmostEqual(latest['chronic_load'][1], 75)
+        self.assertAlmostEqual(latest['acwr'][1], 4.0)
+        self.assertAlmostEqual(latest['monotony'][1], (300 / 7) / (30000 / 7 - (300 / 7) ** 2) ** 0.5)
+        self.assertEqual(latest['injury_risk'][1], 100)
+        # A rest week after training: ACWR 0 sits below the sweet spot, monotony is undefined
+        self.assertEqual(latest['acwr'][2], 0)
+        self.assertEqual(latest['injury_risk'][2], 20 + 0.8 * 25)
+        self.assertTrue(np.isnan(latest['monotony'][2]))
+
+    def test_score_users_stores_scores_and_clears_roster_rows(self):
+        athlete = CustomUser.objects.create_user('risky@example.com', 'Risky', role='athlete')
+        idle = CustomUser.objects.create_user('idle@example.com', 'Idle', role='athlete')
+        self.train(athlete, [50] * 21 + [100, 200, 100, 200, 100, 200, 100])
+        cache.set(roster.cache_key(athlete.id), {'stale': True})
+
+        self.assertEqual(risk.score_users([athlete.id, idle.id], self.as_of), 2)
+        score = AthleteRiskScore.objects.get(user=athlete)
+        self.assertEqual(score.as_of, self.as_of)
+        self.assertEqual((score.acute_load, score.chronic_load, score.acwr), (1000, 512.5, 1.951))
+        self.assertEqual(score.injury_risk, 85)
+        self.assertIsNone(cache.get(roster.cache_key(athlete.id)))
+
+        idle_score = AthleteRiskScore.objects.get(user=idle)
+        self.assertEqual((idle_score.acute_load, idle_score.acwr, idle_score.injury_risk), (0, None, None))
+
+    def test_command_rescores_active_athletes(self):
+        athletes = [
+            CustomUser.objects.create_user(f'scored{index}@example.com', f'Scored {index}', role='athlete')
+            for index in range(3)
+        ]
+        for athlete in athletes:
+            self.train(athlete, [100] * 28)
+        athletes[2].is_active = False
+        athletes[2].save()
+        CustomUser.objects.create_user('scored-coach@example.com', 'Coach', role='coach')
+        AthleteRiskScore.objects.all().delete()
+
+        out = io.StringIO()
+        call_command('score_injury_risk', as_of=self.as_of.isoformat(), chunk_size=1, stdout=out)
+        self.assertIn('Scored 2 athletes', out.getvalue())
+        scores = AthleteRiskScore.objects.order_by('user_id')
+        self.assertEqual([score.user_id for score in scores], [athletes[0].id, athletes[1].id])
+        self.assertEqual({(score.as_of, score.acwr, score.injury_risk) for score in scores}, {(self.as_of, 1.0, 100)})
+
+        with self.assertRaises(CommandError):
+            call_command('score_injury_risk', as_of='yesterday', stdout=io.StringIO())
+
+
+# -----------------------------
+# Keyset Pagination Tests
+# -----------------------------
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('pages@example.com', 'Pages User', role='athlete')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Several workouts share each date, so only the id breaks ties
+        for offset in range(11):
+            WorkoutLog.objects.create(user=self.user, date=date(2024, 3, 1) - timedelta(days=offset // 4),
+                                      activity_type=f'activity {offset % 4}', duration_minutes=30)
+
+    def pages(self, path):
+        pages = []
+        while path:
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200)
+            pages.append([row['id'] for row in response.data['results']])
+            path = response.data['next']
+            # A cursor that does not advance would page forever
+            self.assertLessEqual(len(pages), 11)
+        return pages
+
+    def test_pages_split_equal_dates_without_gaps_or_repeats(self):
+        expected = list(WorkoutLog.objects.filter(user=self.user).order_by('-date', '-pk').values_list('pk', flat=True))
+        for page_size in (1, 3, 4, 5, 11):
+            pages = self.pages(f'/api/accounts/workouts/?page_size={page_size}')
+            self.assertEqual([pk for page in pages for pk in page], expected)
+            self.assertTrue(all(len(page) == page_size for page in pages[:-1]))
+
+    def test_cursor_is_stable_while_newer_rows_arrive(self):
+        expected = list(WorkoutLog.objects.filter(user=self.user).order_by('-date', '-pk').values_list('pk', flat=True))
+        first = self.client.get('/api/accounts/workouts/?page_size=3').data
+        # A write on the cursor's own date, newer than the page just read
+        WorkoutLog.objects.create(user=self.user, date=date(2024, 3, 1), activity_type='swim', duration_minutes=20)
+
+        rest = self.pages(first['next'])
+        self.assertEqual([row['id'] for row in first['results']] + [pk for page in rest for pk in page], expected)
+
+    def test_tampered_cursors_are_rejected(self):
+        # Bad base64, no separator, an impossible date, a non-date, a non-integer id, non-ASCII
+        for cursor in ('%00', 'bm8tc2VwYXJhdG9y', 'MjAyNC0xMy0wMXwx', 'c29vbnwx', 'MjAyNC0wMy0wMXx4', 'é'):
+            response = self.client.get('/api/accounts/workouts/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
+            self.assertEqual(response.data['detail'], 'Invalid cursor')
+
+
+# -----------------------------
+# Stress Map Tests
+# -----------------------------
+class StressMapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user('stress@example.com', 'Stress User', role='athlete')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def stress_map(self):
+        response = self.client.get('/api/accounts/stress-map/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_training_raises_the_trained_regions(self):
+        rested = self.stress_map()
+        WorkoutLog.objects.create(user=self.user, date=timezone.localdate(), activity_type='Running',
+                                  duration_minutes=90, average_heart_rate=165)
+        trained = self.stress_map()
+
+        calves = trained['back']['calves']['fatigue'] - rested['back']['calves']['fatigue']
+        head = trained['front']['head']['fatigue'] - rested['front']['head']['fatigue']
+        self.assertGreater(calves, head)
+
+    def test_map_is_cached_until_the_athlete_logs_something(self):
+        before = self.stress_map()
+        with self.assertNumQueries(0):
+            stressmap.get_stress_map(self.user.id)
+
+        InjuryReport.objects.create(user=self.user, injury_type='Knee sprain', severity='severe',
+                                    description='', date_occurred=timezone.localdate())
+        self.assertGreater(self.stress_map()['front']['knees']['level'], before['front']['knees']['level'])
+
+
+# -----------------------------
+# Live Event Tests
+# -----------------------------
+class LiveEventTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('live@example.com', 'Live User', role='athlete')
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def subscribe(self):
+        subscription = live.broker.subscribe([self.user.id], loop=self.loop)
+        self.addCleanup(live.broker.unsubscribe, subscription)
+        return subscription
+
+    def received(self, subscription):
+        # Run the deliveries queued with call_soon_threadsafe
+        self.loop.run_until_complete(asyncio.sleep(0))
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        return events
+
+    def test_writes_are_published_after_commit(self):
+        subscription = self.subscribe()
+        with self.captureOnCommitCallbacks() as callbacks:
+            WorkoutLog.objects.create(user=self.user, date=timezone.localdate(), activity_type='run',
+                                      duration_minutes=30)
+        self.assertEqual(self.received(subscription), [])
+
+        for callback in callbacks:
+            callback()
+        events = self.received(subscription)
+        self.assertEqual(events[0]['type'], 'workout')
+        self.assertIn('readiness', [event['type'] for event in events])
+
+    def test_score_deltas_are_tracked_per_subscriber(self):
+        first = self.subscribe()
+        live.broker.publish_delta(self.user.id, 'readiness', {'recoveryScore': 70, 'trainingLoad': 300})
+        live.broker.publish_delta(self.user.id, 'readiness', {'recoveryScore': 70, 'trainingLoad': 350})
+        second = self.subscribe()
+        live.broker.publish_delta(self.user.id, 'readiness', {'recoveryScore': 70, 'trainingLoad': 400})
+
+        self.assertEqual([event['changes'] for event in self.received(first)], [
+            {'recoveryScore': 70, 'trainingLoad': 300}, {'trainingLoad': 350}, {'trainingLoad': 400},
+        ])
+        self.assertEqual([event['changes'] for event in self.received(second)],
+                         [{'recoveryScore': 70, 'trainingLoad': 400}])
+
+
+# -----------------------------
+# Intraday Sample Tests
+# -----------------------------
+class IntradaySampleTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('intraday@example.com', 'Intraday User', role='athlete')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.midnight = (date(2024, 3, 1) - timeseries.EPOCH).days * timeseries.SECONDS_PER_DAY
+
+    def test_times_round_trip_in_both_widths(self):
+        for seconds, encoding in (([0, 1, 5, 60000], 'du16'), ([10, 80000], 'du32')):
+            seconds = np.array(seconds, dtype=np.int64)
+            used, data = timeseries.encode_times(seconds)
+            self.assertEqual(used, encoding)
+            np.testing.assert_array_equal(timeseries.decode_times(used, data), seconds)
+
+    def test_values_use_scaled_deltas_and_fall_back_to_float(self):
+        values = np.array([61.2, 60.9, 75.4])
+        encoding, data = timeseries.encode_values(values, 10)
+        self.assertEqual(encoding, 'd16x10')
+        np.testing.assert_allclose(timeseries.decode_values(encoding, data), values)
+
+        values = np.array([0.0, 5000.5])
+        encoding, data = timeseries.encode_values(values, 10)
+        self.assertEqual(encoding, 'f32')
+        np.testing.assert_allclose(timeseries.decode_values(encoding, data), values)
+
+    def test_merge_sorts_and_lets_the_newer_sample_win(self):
+        seconds, values = timeseries._merge(
+            np.array([10, 30]), np.array([1.0, 3.0]), np.array([30, 20]), np.array([9.0, 2.0])
+        )
+        np.testing.assert_array_equal(seconds, [10, 20, 30])
+        np.testing.assert_array_equal(values, [1.0, 2.0, 9.0])
+
+    def test_uploads_merge_into_day_buckets(self):
+        url = '/api/accounts/intraday/heart_rate/'
+        first = [[self.midnight + offset, 60 + offset] for offset in range(0, 600, 60)]
+        self.assertEqual(self.client.post(url, {'samples': first}, format='json').status_code, 201)
+        response = self.client.post(url, {'samples': [[self.midnight, 100], [self.midnight + 30, 80]]},
+                                    format='json')
+        self.assertEqual(response.data['days'], [{'date': date(2024, 3, 1), 'sample_count': 11}])
+
+        buckets = self.client.get(url, {'start': '2024-03-01', 'resolution': 300}).data['buckets']
+        self.assertEqual([bucket['count'] for bucket in buckets], [6, 5])
+        # The re-sent midnight sample replaced the first upload's 60
+        self.assertEqual((buckets[0]['min'], buckets[0]['max']), (80, 300))
+
+    def test_invalid_requests_are_rejected(self):
+        url = '/api/accounts/intraday/heart_rate/'
+        for params in ({'start': '2024-02-30'}, {'start': '2024-01-01', 'end': '2024-03-01'}):
+            self.assertEqual(self.client.get(url, params).status_code, 400, params)
+        for samples in ([[self.midnight, True]], [[True, 60]]):
+            self.assertEqual(self.client.post(url, {'samples': samples}, format='json').status_code, 400)
+
+    def test_out_of_range_samples_are_rejected(self):
+        url = '/api/accounts/intraday/heart_rate/'
+        for timestamp in (-1, 1e12, 1e20, 1e300, '1969-12-31T23:59:59Z'):
+            response = self.client.post(url, {'samples': [[timestamp, 60]]}, format='json')
+            self.assertEqual(response.status_code, 400, timestamp)
+        for value in (1e300, -1e300, 3.5e38):
+            response = self.client.post(url, {'samples': [[self.midnight, value]]}, format='json')
+            self.assertEqual(response.status_code, 400, value)
+        self.assertFalse(IntradayChunk.objects.exists())
+
+        # The last second of 9999-12-31 and the largest float32 are still accepted
+        response = self.client.post(url, {'samples': [[timeseries.MAX_TIMESTAMP - 1, 3.4e38]]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['days'], [{'date': date.max, 'sample_count': 1}])
+
+
+# -----------------------------
+# Endpoint Benchmark Tests
+# -----------------------------
+class EndpointBenchmarkTests(TestCase):
+    def test_every_endpoint_stays_within_its_query_budget(self):
+        cache.clear()
+        user_cache.clear()
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            # Raises CommandError on a failed request or a blown query budget
+            call_command('benchmark_endpoints', athletes=2, coaches=1, years=1, repeat=1,
+                         output=output, stdout=io.StringIO())
+            with open(output) as handle:
+                results = json.load(handle)
+
+        self.assertEqual(set(results['endpoints']), set(QUERY_BUDGETS))
+        self.assertFalse(CustomUser.objects.filter(email__endswith='synthetic.example.com').exists())
+
+
+# -----------------------------
+# Request Metrics Tests
+# -----------------------------
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        metrics.registry.clear()
+        self.user = CustomUser.objects.create_user('metrics@example.com', 'Metrics', role='athlete')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_requests_are_exported_by_url_name(self):
+        self.client.get('/api/accounts/workouts/')
+        self.client.get('/api/accounts/workouts/')
+        self.client.get('/api/accounts/does-not-exist/')
+
+        staff = CustomUser.objects.create_user('ops@example.com', 'Ops', is_staff=True)
+        self.client.force_login(staff)
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('http_requests_total{route="workout_list",method="GET",status="200"} 2', body)
+        self.assertIn('http_requests_total{route="unmatched",method="GET",status="404"} 1', body)
+        self.assertIn('http_request_db_queries_count{route="workout_list",method="GET"} 2', body)
+        self.assertIn('http_request_duration_seconds_bucket{route="workout_list",method="GET",le="+Inf"} 2', body)
+
+    async def test_async_requests_record_their_queries(self):
+        client = AsyncClient()
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        await client.get('/api/accounts/workouts/', headers=headers)
+        await client.get('/api/accounts/workouts/', headers=headers)
+
+        stats = metrics.registry.snapshot()[('workout_list', 'GET')]
+        self.assertEqual(stats.queries.count, 2)
+        # The view's queries run in a sync_to_async thread
+        self.assertGreaterEqual(stats.queries.total, 2)
+        self.assertGreater(stats.db_seconds, 0)
+
+    @override_settings(ACCOUNTS_METRICS={'SLOW_REQUEST_SECONDS': 0})
+    def test_slow_requests_log_their_sql(self):
+        with self.assertLogs('accounts.slow_requests', 'WARNING') as logs:
+            self.client.get('/api/accounts/workouts/')
+        self.assertIn('workout_list', logs.output[0])
+        self.assertIn('accounts_workoutlog', logs.output[0])
+
+    def test_metrics_are_staff_only_without_a_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    @override_settings(ACCOUNTS_METRICS={'TOKEN': 'scrape-secret'})
+    def test_metrics_accept_the_scrape_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+
+# -----------------------------
+# Conditional GET Tests
+# -----------------------------
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = CustomUser.objects.create_user('etag@example.com', 'Etag User', role='athlete')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        WorkoutLog.objects.create(user=self.user, date=date(2024, 1, 1), activity_type='run', duration_minutes=30)
+
+    def test_unchanged_list_answers_304_without_reading_the_logs(self):
+        etag = self.client.get('/api/accounts/workouts/')['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/accounts/workouts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('accounts_workoutlog', queries[0]['sql'])
+
+    def test_writes_and_other_pages_change_the_etag(self):
+        etag = self.client.get('/api/accounts/workouts/')['ETag']
+        self.assertNotEqual(self.client.get('/api/accounts/workouts/?start=2024-01-01')['ETag'], etag)
+
+        self.client.post('/api/accounts/workouts/', {
+            'date': '2024-01-02', 'activity_type': 'ride', 'duration_minutes': 45,
+        }, format='json')
+        response = self.client.get('/api/accounts/workouts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_me_revalidates_without_queries(self):
+        etag = self.client.get('/api/accounts/me/')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/accounts/me/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+# -----------------------------
+# Nutrition Summary Tests
+# -----------------------------
+class NutritionSummaryTests(TestCase):
+    def setUp(self):
+        self.coach = CustomUser.objects.create_user('dietcoach@example.com', 'Diet Coach', role='coach')
+        self.athlete = CustomUser.objects.create_user('eater@example.com', 'Eater', role='athlete', coach=self.coach)
+        self.other = CustomUser.objects.create_user('other@example.com', 'Other', role='athlete', coach=self.coach)
+        self.client = APIClient()
+        self.client.force_authenticate(self.athlete)
+        # Monday 2024-01-01 and Sunday 2024-01-07 share a week; 2024-01-08 starts the next
+        for user, day, foods, calories in [
+            (self.athlete, date(2024, 1, 1), ['Oatmeal', 'banana'], 600),
+            (self.athlete, date(2024, 1, 1), [{'name': 'Salmon', 'calories': 500}, 'rice'], 800),
+            (self.athlete, date(2024, 1, 7), ['oatmeal '], 400),
+            (self.athlete, date(2024, 1, 8), ['eggs'], 300),
+            (self.other, date(2024, 1, 1), ['oatmeal'], 350),
+        ]:
+            NutritionLog.objects.create(user=user, date=day, meal_type='meal', food_items=foods,
+                                        calories=calories, protein_g=10, water_ml=250)
+
+    def test_daily_and_weekly_totals(self):
+        response = self.client.get('/api/accounts/nutrition/summary/?start=2024-01-01&end=2024-01-08')
+        first = response.data['results'][0]
+        self.assertEqual((str(first['date']), first['meals'], first['calories'], first['protein_g']),
+                         ('2024-01-01', 2, 1400.0, 20.0))
+
+        response = self.client.get('/api/accounts/nutrition/summary/?period=week&start=2024-01-01&end=2024-01-08')
+        self.assertEqual([(str(row['date']), row['calories']) for row in response.data['results']],
+                         [('2024-01-01', 1800.0), ('2024-01-08', 300.0)])
+
+    def test_food_index_follows_edits_and_splits_meal_calories(self):
+        foods = {row['name']: row for row in self.client.get('/api/accounts/nutrition/foods/').data}
+        self.assertEqual(foods['oatmeal']['times'], 2)
+        self.assertEqual((foods['salmon']['calories'], foods['rice']['calories']), (500, 300))
+
+        log = NutritionLog.objects.get(user=self.athlete, date=date(2024, 1, 8))
+        log.food_items = ['toast']
+        log.save()
+        names = [row['name'] for row in self.client.get('/api/accounts/nutrition/foods/?order=calories').data]
+        self.assertEqual(names[:2], ['oatmeal', 'salmon'])
+        self.assertIn('toast', names)
+        self.assertNotIn('eggs', names)
+
+    def test_team_food_counts_need_a_coach(self):
+        self.assertEqual(self.client.get('/api/accounts/nutrition/foods/?scope=team').status_code, 403)
+        self.client.force_authenticate(self.coach)
+        response = self.client.get('/api/accounts/nutrition/foods/?scope=team&name=OATMEAL')
+        self.assertEqual([(row['times'], row['athletes']) for row in response.data], [(3, 2)])
+
+
+# -----------------------------
+# Cohort Tests
+# -----------------------------
+class CohortTests(TestCase):
+    def setUp(self):
+        cohorts.index.clear()
+        self.coach = CustomUser.objects.create_user('cohortcoach@example.com', 'Cohort Coach', role='coach')
+        self.client = APIClient()
+        self.client.force_authenticate(self.coach)
+        self.athletes = {}
+        for name, sport, level, age in [
+            ('runner', 'Running', 'advanced', 28), ('runner2', 'Running', 'advanced', 30),
+            ('swimmer', 'Swimming', 'beginner', 45), ('yogi', 'Yoga', 'beginner', 52),
+        ]:
+            athlete = CustomUser.objects.create_user(f'{name}@example.com', name, role='athlete', coach=self.coach)
+            Onboarding.objects.create(
+                user=athlete, age=age, gender='female', region='North', food_types=['Protein'],
+                sports_activities=[sport], activity_level='active', primary_goals=['Endurance'],
+                experience_level=level, timeline='medium-term',
+            )
+            self.athletes[name] = athlete
+
+    def similar(self, name, **params):
+        return self.client.get(f"/api/accounts/athletes/{self.athletes[name].pk}/similar/", params)
+
+    def test_nearest_profile_comes_first(self):
+        results = self.similar('runner', k=2).data['results']
+        self.assertEqual([row['athlete'] for row in results][0], self.athletes['runner2'].pk)
+        self.assertEqual(len(results), 2)
+        self.assertGreater(results[0]['similarity'], results[1]['similarity'])
+
+    def test_profile_edits_reach_a_loaded_index(self):
+        self.similar('runner')
+        profile = self.athletes['yogi'].onboarding
+        profile.sports_activities, profile.experience_level, profile.age = ['Running'], 'advanced', 28
+        profile.save()
+        self.assertEqual(self.similar('runner', k=1).data['results'][0]['athlete'], self.athletes['yogi'].pk)
+
+        self.athletes['yogi'].is_active = False
+        self.athletes['yogi'].save()
+        self.assertNotIn(self.athletes['yogi'].pk, [row['athlete'] for row in self.similar('runner').data['results']])
+
+    def test_cluster_command_groups_similar_athletes(self):
+        call_command('cluster_cohorts', cohorts=2, stdout=io.StringIO())
+        runner = self.similar('runner').data
+        by_athlete = {row['athlete']: row['cohort'] for row in runner['results']}
+        self.assertEqual(by_athlete[self.athletes['runner2'].pk], runner['cohort'])
+        self.assertNotEqual(by_athlete[self.athletes['yogi'].pk], runner['cohort'])
+
+    def test_only_roster_athletes_can_be_compared(self):
+        outsider = CustomUser.objects.create_user('outsider@example.com', 'Outsider', role='athlete')
+        self.assertEqual(self.client.get(f'/api/accounts/athletes/{outsider.pk}/similar/').status_code, 403)
+        self.client.force_authenticate(self.athletes['runner'])
+        self.assertEqual(self.similar('runner2').status_code, 403)
+
+
+# -----------------------------
+# Batch API Tests
+# -----------------------------
+class BatchApiTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('batch@example.com', 'Batch User', role='athlete')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.metric = HealthMetric.objects.create(user=self.user, metric_type='hrv', value=50, unit='ms',
+                                                  date_recorded=date(2024, 1, 1))
+
+    def operations(self, workout_date='2024-01-02'):
+        return [
+            {'method': 'create', 'resource': 'workouts',
+             'data': {'date': workout_date, 'activity_type': 'run', 'duration_minutes': 40}},
+            {'method': 'update', 'resource': 'health-metrics', 'id': self.metric.pk, 'data': {'value': 62}},
+            {'method': 'create', 'resource': 'nutrition',
+             'data': {'date': '2024-01-02', 'meal_type': 'lunch', 'food_items': ['rice'], 'calories': 700}},
+        ]
+
+    def test_atomic_batch_commits_every_operation(self):
+        response = self.client.post('/api/batch/', {'operations': self.operations()}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], [201, 200, 201])
+        self.metric.refresh_from_db()
+        self.assertEqual(float(self.metric.value), 62)
+        self.assertEqual(WorkoutLog.objects.filter(user=self.user).count(), 1)
+
+    def test_atomic_batch_rolls_back_on_the_first_failure(self):
+        operations = self.operations()
+        operations.insert(1, {'method': 'delete', 'resource': 'injuries', 'id': 999999})
+        response = self.client.post('/api/batch/', {'operations': operations}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result['status'] for result in response.data['results']], [201, 404, 424, 424])
+        self.assertFalse(WorkoutLog.objects.filter(user=self.user).exists())
+
+    def test_best_effort_batch_keeps_the_operations_that_succeeded(self):
+        workout = WorkoutLog.objects.create(user=self.user, date=date(2024, 1, 2), activity_type='run',
+                                            duration_minutes=30)
+        operations = self.operations()
+        operations.append({'method': 'update', 'resource': 'workouts', 'id': workout.pk,
+                           'data': {'duration_minutes': -5}})
+        response = self.client.post('/api/batch/', {'atomic': False, 'operations': operations}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], [409, 200, 201, 400])
+        self.assertEqual(NutritionLog.objects.filter(user=self.user).count(), 1)
+
+    def test_other_users_rows_are_not_found(self):
+        other = CustomUser.objects.create_user('batch-other@example.com', 'Other', role='athlete')
+        metric = HealthMetric.objects.create(user=other, metric_type='hrv', value=40, unit='ms',
+                                             date_recorded=date(2024, 1, 1))
+        response = self.client.post('/api/batch/', {'atomic': False, 'operations': [
+            {'method': 'delete', 'resource': 'health-metrics', 'id': metric.pk},
+        ]}, format='json')
+        self.assertEqual(response.data['results'][0]['status'], 404)
+        self.assertTrue(HealthMetric.objects.filter(pk=metric.pk).exists())
+
+
+# -----------------------------
+# Delta Sync Tests
+# -----------------------------
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('sync@example.com', 'Sync User', role='athlete')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.workout = WorkoutLog.objects.create(user=self.user, date=date(2024, 1, 1), activity_type='run',
+                                                 duration_minutes=30)
+        self.metric = HealthMetric.objects.create(user=self.user, metric_type='hrv', value=50, unit='ms',
+                                                  date_recorded=date(2024, 1, 1))
+
+    def pull(self, since=None, **params):
+        return self.client.get('/api/accounts/sync/', {**params, **({'since': since} if since else {})}).data
+
+    def test_pull_returns_only_changes_after_the_cursor(self):
+        first = self.pull()
+        self.assertEqual(len(first['changes']['workouts']) + len(first['changes']['health-metrics']), 2)
+
+        self.assertEqual(sum(map(len, self.pull(first['cursor'])['changes'].values())), 0)
+        self.metric.value = 55
+        self.metric.save()
+        workout_id = self.workout.pk
+        self.workout.delete()
+
+        delta = self.pull(first['cursor'])
+        self.assertEqual([row['id'] for row in delta['changes']['health-metrics']], [self.metric.pk])
+        self.assertEqual(delta['changes']['workouts'], [])
+        self.assertEqual([row['id'] for row in delta['deleted']['workouts']], [workout_id])
+
+    def test_pages_follow_the_cursor_without_gaps(self):
+        for day in range(2, 7):
+            HealthMetric.objects.create(user=self.user, metric_type='sleep', value=7, unit='h',
+                                        date_recorded=date(2024, 1, day))
+        seen, cursor, more = [], None, True
+        while more:
+            page = self.pull(cursor, limit=2)
+            seen += [(resource, row['id']) for resource, rows in page['changes'].items() for row in rows]
+            cursor, more = page['cursor'], page['more']
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_upload_detects_conflicts_and_ignores_retried_creates(self):
+        seen_seq = self.pull()['changes']['workouts'][0]['sync_seq']
+        self.client.patch(f'/api/accounts/workouts/{self.workout.pk}/', {'notes': 'edited on web'}, format='json')
+
+        client_id = '0f8fad5b-d9cb-469f-a165-70867728950e'
+        operations = [
+            {'method': 'update', 'resource': 'workouts', 'id': self.workout.pk, 'sync_seq': seen_seq,
+             'data': {'notes': 'edited offline'}},
+            {'method': 'create', 'resource': 'nutrition', 'data': {
+                'client_id': client_id, 'date': '2024-01-01', 'meal_type': 'lunch', 'calories': 600}},
+        ]
+        response = self.client.post('/api/accounts/sync/', {'operations': operations}, format='json')
+        self.assertEqual([result['status'] for result in response.data['results']], [409, 201])
+        self.assertEqual(response.data['results'][0]['errors']['current']['notes'], 'edited on web')
+
+        retry = self.client.post('/api/accounts/sync/', {'operations': operations[1:]}, format='json')
+        self.assertEqual(retry.data['results'][0]['status'], 200)
+        self.assertEqual(NutritionLog.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_upload_rejects_reused_client_ids(self):
+        taken = '0f8fad5b-d9cb-469f-a165-70867728950e'
+        self.metric.client_id = taken
+        self.metric.save()
+        fresh = '7c9e6679-7425-40de-944b-e07fc1f90ae7'
+        readings = [
+            {'metric_type': 'hrv', 'value': 52, 'unit': 'ms', 'date_recorded': '2024-01-01', 'client_id': taken},
+            {'metric_type': 'sleep', 'value': 7, 'unit': 'h', 'date_recorded': '2024-01-01', 'client_id': taken},
+            {'metric_type': 'sleep', 'value': 8, 'unit': 'h', 'date_recorded': '2024-01-02', 'client_id': fresh},
+            {'metric_type': 'sleep', 'value': 6, 'unit': 'h', 'date_recorded': '2024-01-03', 'client_id': fresh},
+        ]
+        response = self.client.post('/api/accounts/health-metrics/bulk/', readings, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['status'] for result in response.data['results']],
+                         ['updated', 'invalid', 'created', 'invalid'])
+        self.assertIn('client_id', response.data['results'][1]['errors'])
+        self.assertEqual(HealthMetric.objects.filter(user=self.user).count(), 2)
+
+    def test_list_create_rejects_a_reused_client_id(self):
+        client_id = '0f8fad5b-d9cb-469f-a165-70867728950e'
+        workout = {'date': '2024-01-02', 'activity_type': 'run', 'duration_minutes': 30, 'client_id': client_id}
+        self.assertEqual(self.client.post('/api/accounts/workouts/', workout, format='json').status_code, 201)
+
+        response = self.client.post('/api/accounts/workouts/', {**workout, 'date': '2024-01-03'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('client_id', response.data)
+        # Ids are only unique per user
+        other = CustomUser.objects.create_user('sync-other@example.com', 'Other', role='athlete')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.post('/api/accounts/workouts/', workout, format='json').status_code, 201)
+
+    def test_client_id_cannot_be_changed_on_update(self):
+        taken = '0f8fad5b-d9cb-469f-a165-70867728950e'
+        WorkoutLog.objects.create(user=self.user, date=date(2024, 1, 2), activity_type='run', duration_minutes=30,
+                                  client_id=taken)
+
+        response = self.client.patch(f'/api/accounts/workouts/{self.workout.pk}/',
+                                     {'client_id': taken, 'notes': 'edited'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.workout.refresh_from_db()
+        self.assertIsNone(self.workout.client_id)
+        self.assertEqual(self.workout.notes, 'edited')
+
+
+# -----------------------------
+# Export Streaming Tests
+# -----------------------------
+class AsyncExportTests(TransactionTestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('export@example.com', 'Export User', role='athlete')
+        for day in range(3):
+            WorkoutLog.objects.create(user=self.user, date=date(2024, 1, 1) + timedelta(days=day),
+                                      activity_type='run', duration_minutes=30)
+
+    async def test_asgi_exports_stream_from_an_async_iterator(self):
+        token = AccessToken.for_user(self.user)
+        response = await AsyncClient().get('/api/accounts/export/workouts.csv',
+                                           headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(len(body.splitlines()), 4)
+
+    def test_reading_stops_when_the_client_goes_away(self):
+        produced = []
+
+        def chunks():
+            for index in range(1000):
+                produced.append(index)
+                yield str(index)
+
+        async def read_one():
+            stream = export.async_stream(chunks(), buffered=2)
+            first = await anext(stream)
+            await stream.aclose()
+            return first
+
+        self.assertEqual(asyncio.run(read_one()), '0')
+        for thread in threading.enumerate():
+            if thread.name == 'export-stream':
+                thread.join(timeout=5)
+                self.assertFalse(thread.is_alive())
+        self.assertLess(len(produced), 10)
+
+
+# -----------------------------
+# Workout Import Tests
+# -----------------------------
+GPX_ACTIVITY = b"""<?xml version="1.0"?>
+<gpx xmlns="http://www.topografix.com/GPX/1/1"><trk><name>Morning run</name><type>running</type><trkseg>
+<trkpt lat="52.0000" lon="4.0000"><time>2024-05-01T07:00:00Z</time></trkpt>
+<trkpt lat="52.0090" lon="4.0000"><time>2024-05-01T07:05:00Z</time></trkpt>
+</trkseg></trk></gpx>"""
+
+TCX_ACTIVITY = b"""<?xml version="1.0"?>
+<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2"><Activities>
+<Activity Sport="Biking"><Id>2024-05-02T18:00:00Z</Id><Lap StartTime="2024-05-02T18:00:00Z">
+<TotalTimeSeconds>3600</TotalTimeSeconds><DistanceMeters>30000</DistanceMeters><Calories>800</Calories>
+</Lap></Activity></Activities></TrainingCenterDatabase>"""
+
+
+class WorkoutImportTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('import@example.com', 'Import User', role='athlete')
+
+    def csv_file(self, first_day, days):
+        lines = ['Date,Type,Duration,Distance (km),Avg HR']
+        lines += [f'{first_day + timedelta(days=day)},Run,45,8.5,150' for day in range(days)]
+        return '\n'.join(lines).encode()
+
+    def test_files_parse_into_workouts(self):
+        _, (run,), error = parse_file('run.gpx', GPX_ACTIVITY)
+        self.assertIsNone(error)
+        self.assertEqual((run['date'], run['activity_type'], run['duration_minutes']),
+                         (date(2024, 5, 1), 'running', 5))
+        self.assertAlmostEqual(run['distance_km'], 1.0, places=1)
+
+        _, (ride,), _ = parse_file('ride.tcx', TCX_ACTIVITY)
+        self.assertEqual((ride['activity_type'], ride['duration_minutes'], ride['distance_km'],
+                          ride['calories_burned']), ('cycling', 60, 30.0, 800))
+
+        _, rows, _ = parse_file('log.csv', self.csv_file(date(2024, 5, 3), 2))
+        self.assertEqual([(row['date'], row['average_heart_rate']) for row in rows],
+                         [(date(2024, 5, 3), 150), (date(2024, 5, 4), 150)])
+        self.assertIn('date', parse_file('bad.csv', b'Foo,Bar\n1,2')[2])
+
+    def test_duplicates_are_counted_not_created(self):
+        WorkoutLog.objects.create(user=self.user, date=date(2024, 5, 3), activity_type='running',
+                                  duration_minutes=30)
+        data = self.csv_file(date(2024, 5, 3), 3)
+        # The second file repeats the first, so only two new workouts exist across both
+        sources = [('a.csv', lambda: data), ('b.csv', lambda: data), ('run.gpx', lambda: GPX_ACTIVITY)]
+        summary = imports.import_workouts(self.user, sources, workers=1, batch_size=2)
+
+        self.assertEqual((summary['parsed'], summary['created'], summary['duplicates']), (7, 3, 4))
+        self.assertEqual(WorkoutLog.objects.filter(user=self.user).count(), 4)
+        again = imports.import_workouts(self.user, sources, workers=1)
+        self.assertEqual((again['created'], again['duplicates']), (0, 7))
+
+    def test_pool_import_matches_a_serial_import(self):
+        files = [(f'{index}.csv', self.csv_file(date(2024, 1, 1) + timedelta(days=index * 10), 5))
+                 for index in range(imports.PARALLEL_MIN_FILES)]
+        sources = [(name, lambda data=data: data) for name, data in files]
+        summary = imports.import_workouts(self.user, sources, workers=2)
+
+        self.assertEqual((summary['created'], summary['duplicates'], summary['errors']), (40, 0, []))
+        serial = [row for _, data in files for row in parse_file('serial.csv', data)[1]]
+        self.assertEqual(
+            sorted(WorkoutLog.objects.filter(user=self.user).values_list('date', flat=True)),
+            sorted(row['date'] for row in serial),
+        )
+
+
+# -----------------------------
+# Async Read View Tests
+# -----------------------------
+@override_settings(ROOT_URLCONF='Athlete.urls_asgi')
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        cache.clear()
+        self.coach = CustomUser.objects.create_user('asynccoach@example.com', 'Async Coach', role='coach')
+        self.athlete = CustomUser.objects.create_user(
+            'asyncathlete@example.com', 'Async Athlete', role='athlete', coach=self.coach,
+        )
+        for day in range(3):
+            WorkoutLog.objects.create(
+                user=self.athlete, date=date(2024, 1, 1) + timedelta(days=day),
+                activity_type='run', duration_minutes=30 + day,
+            )
+        self.token = f'Bearer {AccessToken.for_user(self.athlete)}'
+        self.client = AsyncClient()
+
+    def get(self, path, token=None, **headers):
+        return self.client.get(path, headers={'Authorization': token or self.token, **headers})
+
+    def sync_get(self, path, token=None):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=token or self.token)
+        with override_settings(ROOT_URLCONF='Athlete.urls'):
+            return client.get(path)
+
+    async def test_reads_match_the_sync_views(self):
+        for path in (
+            '/api/accounts/me/', '/api/accounts/dashboard/',
+            '/api/accounts/workouts/?page_size=2', '/api/accounts/workouts/?start=2024-01-02',
+        ):
+            response = await self.get(path)
+            expected = await sync_to_async(self.sync_get)(path)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertEqual(response.json(), json.loads(expected.content), path)
+            if expected.has_header('ETag'):
+                self.assertEqual(response['ETag'], expected['ETag'], path)
+
+    async def test_etag_revalidation_and_errors(self):
+        etag = (await self.get('/api/accounts/workouts/'))['ETag']
+        response = await self.get('/api/accounts/workouts/', **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.get('/api/accounts/workouts/?start=soon')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start', response.json())
+        self.assertEqual((await self.get('/api/accounts/coach/roster/')).status_code, 403)
+        self.assertEqual((await AsyncClient().get('/api/accounts/me/')).status_code, 401)
+
+    async def test_coach_roster_and_writes_pass_through(self):
+        rows = (await self.get('/api/accounts/coach/roster/', f'Bearer {AccessToken.for_user(self.coach)}')).json()
+        self.assertEqual([row['id'] for row in rows], [self.athlete.id])
+
+        response = await self.client.post('/api/accounts/workouts/', {
+            'date': '2024-02-01', 'activity_type': 'swim', 'duration_minutes': 20,
+        }, content_type='application/json', headers={'Authorization': self.token})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(await WorkoutLog.objects.filter(user=self.athlete).acount(), 4)
+
+
+# -----------------------------
+# Log Archive Tests
+# -----------------------------
+class LogArchiveTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('archive@example.com', 'Archive User', role='athlete')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        today = date.today()
+        for offset in (2, 5, 9, 400, 430, 431, 700):
+            WorkoutLog.objects.create(
+                user=self.user, date=today - timedelta(days=offset), activity_type='run',
+                duration_minutes=offset % 90 + 10, distance_km='5.25',
+            )
+        NutritionLog.objects.create(
+            user=self.user, date=today - timedelta(days=500), meal_type='lunch', calories=600,
+            food_items=[{'name': 'Rice', 'calories': 300}],
+        )
+
+    def pages(self, path):
+        results = []
+        while path:
+            response = self.client.get(path)
+            results.extend(response.data['results'])
+            path = response.data['next']
+        return results
+
+    def test_old_rows_move_to_the_archive_and_stay_readable(self):
+        list_path = '/api/accounts/workouts/?page_size=2'
+        before = self.pages(list_path)
+        export_before = self.client.get('/api/accounts/export/workouts.ndjson')
+        export_before = b''.join(export_before.streaming_content)
+
+        call_command('archive_logs', horizon_days=365, stdout=io.StringIO())
+
+        self.assertEqual(WorkoutLog.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(NutritionLog.objects.filter(user=self.user).count(), 0)
+        archived = ArchivedLogChunk.objects.filter(user=self.user, resource='workouts')
+        self.assertEqual(sum(archived.values_list('row_count', flat=True)), 4)
+        # Food statistics keep the archived log's items
+        self.assertEqual(FoodItem.objects.filter(user=self.user, nutrition_log=None).count(), 1)
+
+        self.assertEqual(self.pages(list_path), before)
+        self.assertEqual(len(self.pages('/api/accounts/workouts/?start=2000-01-01&page_size=50')), 7)
+        old = self.pages(f'/api/accounts/workouts/?end={date.today() - timedelta(days=420)}')
+        self.assertEqual(len(old), 3)
+        self.assertEqual(len(self.pages('/api/accounts/nutrition/')), 1)
+        export_after = self.client.get('/api/accounts/export/workouts.ndjson')
+        self.assertEqual(b''.join(export_after.streaming_content), export_before)
+
+    def test_reruns_merge_late_rows_into_existing_months(self):
+        call_command('archive_logs', horizon_days=365, stdout=io.StringIO())
+        late = WorkoutLog.objects.create(
+            user=self.user, date=date.today() - timedelta(days=431), activity_type='swim', duration_minutes=20,
+        )
+        out = io.StringIO()
+        call_command('archive_logs', horizon_days=365, after_user=0, stdout=out)
+        self.assertIn('Archived 1 rows', out.getvalue())
+        self.assertFalse(WorkoutLog.objects.filter(pk=late.pk).exists())
+        self.assertEqual(sum(ArchivedLogChunk.objects.filter(user=self.user).values_list('row_count', flat=True)), 6)
+        ids = [row['id'] for row in self.pages('/api/accounts/workouts/?page_size=3')]
+        self.assertIn(late.pk, ids)
+        self.assertEqual(len(ids), 8)
+
+    def test_archiving_is_invisible_to_counters_and_sync(self):
+        rollups = list(DailyRollup.objects.filter(user=self.user).values_list('date', 'workout_minutes'))
+        etag = self.client.get('/api/accounts/workouts/')['ETag']
+        cursor = self.client.get('/api/accounts/sync/').data['cursor']
+        total = stats.get_stats().total_workouts
+
+        call_command('archive_logs', horizon_days=365, stdout=io.StringIO())
+
+        self.assertEqual(list(DailyRollup.objects.filter(user=self.user).values_list('date', 'workout_minutes')),
+                         rollups)
+        self.assertEqual(self.client.get('/api/accounts/workouts/')['ETag'], etag)
+        self.assertEqual(self.client.get('/api/accounts/sync/', {'since': cursor}).data['deleted']['workouts'], [])
+        self.assertEqual(stats.get_stats().total_workouts, total)
+        self.assertEqual(stats.reconcile().total_workouts, WorkoutLog.objects.count() + 4)
+
+    def test_late_writes_add_to_archived_days(self):
+        fields = ['date', 'workout_count', 'workout_minutes', 'training_load', 'acute_load', 'chronic_load', 'hrv']
+        day = date.today() - timedelta(days=430)
+        HealthMetric.objects.create(user=self.user, metric_type='hrv', value=60, unit='ms', date_recorded=day)
+        before = list(DailyRollup.objects.filter(user=self.user).order_by('date').values(*fields))
+        call_command('archive_logs', horizon_days=365, stdout=io.StringIO())
+        archived = DailyRollup.objects.get(user=self.user, date=day)
+
+        late = WorkoutLog.objects.create(user=self.user, date=day, activity_type='swim', duration_minutes=20)
+        rollup = DailyRollup.objects.get(user=self.user, date=day)
+        self.assertEqual((rollup.workout_count, rollup.workout_minutes), (2, archived.workout_minutes + 20))
+        self.assertAlmostEqual(rollup.training_load, archived.training_load + scoring.workout_load(20))
+        self.assertAlmostEqual(rollup.acute_load, archived.acute_load + scoring.workout_load(20))
+        self.assertEqual(rollup.hrv, 60)
+
+        # Removing the late row leaves the day as archiving found it
+        late.delete()
+        self.assertEqual(list(DailyRollup.objects.filter(user=self.user).order_by('date').values(*fields)), before)
+
+
+# -----------------------------
+# Training Forecast Tests
+# -----------------------------
+class TrainingForecastTests(TestCase):
+    def setUp(self):
+        self.coach = CustomUser.objects.create_user('forecast-coach@example.com', 'Coach', role='coach')
+        self.athlete = CustomUser.objects.create_user('forecast@example.com', 'Athlete', coach=self.coach)
+        self.newcomer = CustomUser.objects.create_user('newcomer@example.com', 'Newcomer', coach=self.coach)
+        self.as_of = date(2025, 6, 30)
+        # Hard Mondays and Thursdays, with readiness following a known fitness-fatigue model
+        loads = np.array([
+            600.0 if day.weekday() in (0, 3) else 200.0
+            for day in (self.as_of - timedelta(days=offset) for offset in range(forecasts.HISTORY_DAYS - 1, -1, -1))
+        ])
+        readiness = 70 + 0.002 * fitness.impulse_response(loads[None], 42)[0] \
+            - 0.008 * fitness.impulse_response(loads[None], 7)[0]
+        DailyRollup.objects.bulk_create([
+            DailyRollup(
+                user=self.athlete, date=self.as_of - timedelta(days=forecasts.HISTORY_DAYS - 1 - index),
+                training_load=load, training_readiness=round(value),
+            )
+            for index, (load, value) in enumerate(zip(loads, readiness))
+        ])
+
+    def test_fit_recovers_the_model_and_forecasts_the_week(self):
+        call_command('forecast_training', as_of='2025-06-30', workers=1, stdout=io.StringIO())
+
+        forecast = TrainingForecast.objects.get(user=self.athlete)
+        self.assertEqual((forecast.tau_fitness, forecast.tau_fatigue), (42, 7))
+        self.assertLess(forecast.rmse, 1)
+        self.assertEqual([day['date'] for day in forecast.days][:2], ['2025-07-01', '2025-07-02'])
+        # Tuesday then Wednesday easy, Thursday hard
+        self.assertEqual([day['load'] for day in forecast.days[:3]], [200, 200, 600])
+        self.assertTrue(all(0 <= day['readiness'] <= 100 for day in forecast.days))
+
+        # Too little history to fit: a flat forecast at the default readiness
+        fallback = TrainingForecast.objects.get(user=self.newcomer)
+        self.assertIsNone(fallback.rmse)
+        self.assertEqual({day['readiness'] for day in fallback.days}, {75})
+
+    def test_reruns_skip_athletes_already_forecast(self):
+        self.assertEqual(forecasts.run(as_of=self.as_of, workers=1, chunk_size=1), 2)
+        self.assertEqual(forecasts.run(as_of=self.as_of, workers=1), 0)
+        self.assertEqual(forecasts.run(as_of=self.as_of, workers=1, restart=True), 2)
+        self.assertEqual(forecasts.run(as_of=self.as_of + timedelta(days=1), workers=1), 2)
+
+    def test_dashboards_read_the_stored_forecast(self):
+        client = APIClient()
+        client.force_authenticate(self.athlete)
+        self.assertIsNone(client.get('/api/accounts/dashboard/').data['forecast'])
+
+        forecasts.run(as_of=self.as_of, workers=1)
+        self.assertEqual(len(client.get('/api/accounts/dashboard/').data['forecast']['days']), 7)
+
+        client.force_authenticate(self.coach)
+        team = client.get('/api/accounts/forecast/?scope=team').data
+        self.assertEqual([row['athlete'] for row in team], [self.athlete.pk, self.newcomer.pk])
+        client.force_authenticate(self.newcomer)
+        self.assertEqual(client.get(f'/api/accounts/forecast/?athlete={self.athlete.pk}').status_code, 403)
+
+
+# -----------------------------
+# Log Admin Tests
+# -----------------------------
+class LogAdminTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser('staff@example.com', 'Staff', 'password123')
+        self.client.force_login(self.admin)
+        for index in range(3):
+            athlete = CustomUser.objects.create_user(f'logs{index}@example.com', f'Athlete {index}')
+            for year in (2023, 2025):
+                WorkoutLog.objects.create(user=athlete, date=date(year, 3, 1), activity_type='run', duration_minutes=30)
+                HealthMetric.objects.create(user=athlete, metric_type='hrv', value=60, date_recorded=date(year, 3, 1))
+                NutritionLog.objects.create(user=athlete, date=date(year, 3, 1), meal_type='lunch', calories=500)
+                InjuryReport.objects.create(
+                    user=athlete, injury_type='strain', severity='minor', description='', date_occurred=date(year, 3, 1),
+                )
+
+    def test_changelists_join_users_and_skip_distinct_year_scans(self):
+        for resource in ('workoutlog', 'healthmetric', 'nutritionlog', 'injuryreport'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f'/admin/accounts/{resource}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, '2024')  # years between the first and last row are listed
+            sql = [query['sql'] for query in queries.captured_queries]
+            self.assertFalse([query for query in sql if 'DISTINCT' in query], resource)
+            # One query for the rows and their users, however many users are listed
+            self.assertEqual(len([query for query in sql if '"accounts_customuser"' in query and 'LIMIT' in query]), 1)
+
+    def test_search_matches_the_exact_email(self):
+        response = self.client.get('/admin/accounts/workoutlog/', {'q': 'logs1@example.com'})
+        self.assertEqual(response.context['cl'].result_count, 2)
+        response = self.client.get('/admin/accounts/workoutlog/', {'q': 'logs1'})
+        self.assertEqual(response.context['cl'].result_count, 0)
+
+
+# -----------------------------
+# Team Provisioning Tests
+# -----------------------------
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TeamProvisioningTests(TestCase):
+    def setUp(self):
+        self.coach = CustomUser.objects.create_user('club-coach@example.com', 'Coach', role='coach')
+        self.client = APIClient()
+        self.client.force_authenticate(self.coach)
+        self.profile = {
+            'age': 21, 'gender': 'female', 'region': 'Nairobi', 'activity_level': 'active',
+            'experience_level': 'advanced', 'timeline': 'long-term', 'sports_activities': ['Running'],
+        }
+
+    def test_coach_provisions_athletes_onto_their_roster(self):
+        response = self.client.post('/api/accounts/team/provision/', {'athletes': [
+            {'email': 'one@Club.example.com', 'full_name': 'One', 'password': 'password123', 'onboarding': self.profile},
+            {'email': 'two@club.example.com', 'full_name': 'Two'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        one = CustomUser.objects.get(email='one@club.example.com')
+        self.assertEqual((one.role, one.coach), ('athlete', self.coach))
+        self.assertTrue(one.check_password('password123'))
+        self.assertEqual(one.onboarding.sports_activities, ['Running'])
+        self.assertFalse(CustomUser.objects.get(email='two@club.example.com').has_usable_password())
+        self.assertEqual(stats.get_stats().active_athletes, 2)
+
+    def test_any_invalid_row_creates_nothing(self):
+        response = self.client.post('/api/accounts/team/provision/', {'athletes': [
+            {'email': 'fine@example.com', 'full_name': 'Fine'},
+            {'email': 'club-coach@example.com', 'full_name': 'Taken'},
+            {'email': 'fine@example.com', 'full_name': 'Again'},
+            {'email': 'short@example.com', 'full_name': 'Short', 'password': 'abc'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3])
+        self.assertIn('password', response.data['errors'][2]['errors'])
+        self.assertFalse(CustomUser.objects.filter(email='fine@example.com').exists())
+
+    def test_athletes_cannot_provision(self):
+        self.client.force_authenticate(CustomUser.objects.create_user('solo@example.com', 'Solo'))
+        response = self.client.post('/api/accounts/team/provision/', {'athletes': [{}]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_command_hashes_in_worker_processes(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write('email,full_name,password,age,gender,region,activity_level,experience_level,timeline,primary_goals\n')
+            for index in range(10):
+                handle.write(
+                    f'csv{index}@example.com,Athlete {index},password{index:03d},'
+                    f'20,male,Berlin,active,beginner,short-term,performance;endurance\n'
+                )
+        self.addCleanup(os.remove, handle.name)
+
+        call_command('provision_team', handle.name, coach=str(self.coach.pk), workers=2, stdout=io.StringIO())
+
+        athlete = CustomUser.objects.get(email='csv7@example.com')
+        self.assertTrue(athlete.check_password('password007'))
+        self.assertEqual(athlete.onboarding.primary_goals, ['performance', 'endurance'])
+        self.assertEqual(self.coach.athletes.count(), 10)
+
+
+# -----------------------------
+# Injury Analytics Tests
+# -----------------------------
+class InjuryAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coach = CustomUser.objects.create_user('injury-coach@example.com', 'Coach', role='coach')
+        self.athlete = CustomUser.objects.create_user('injured@example.com', 'Injured', coach=self.coach)
+        CustomUser.objects.create_user('healthy@example.com', 'Healthy', coach=self.coach)
+        first = date(2025, 1, 1)
+        spike = (date(2025, 5, 4), date(2025, 5, 31))  # the 28 days before the June injury
+        DailyRollup.objects.bulk_create([
+            DailyRollup(
+                user=self.athlete, date=day, workout_minutes=60,
+                training_load=200 if spike[0] <= day <= spike[1] else 100,
+            )
+            for day in (first + timedelta(days=offset) for offset in range(181))
+        ])
+        for injury_type, day in (('Hamstring strain', date(2025, 3, 1)), ('ankle sprain', date(2025, 5, 1)),
+                                 ('hamstring strain ', date(2025, 6, 1))):
+            self.report(injury_type, day)
+        self.client = APIClient()
+        self.client.force_authenticate(self.coach)
+        self.path = '/api/accounts/injuries/analytics/?scope=team&start=2025-04-01&end=2025-06-30'
+
+    def report(self, injury_type, day):
+        InjuryReport.objects.create(
+            user=self.athlete, injury_type=injury_type, severity='moderate', description='', date_occurred=day,
+        )
+
+    def test_load_windows_recurrence_and_incidence(self):
+        data = self.client.get(self.path).data
+
+        self.assertEqual((data['athletes'], data['injuries'], data['trainingHours']), (2, 2, 91.0))
+        self.assertEqual(data['incidencePer1000Hours'], 21.98)
+        types = {row['injuryType']: row for row in data['byType']}
+        self.assertEqual(types['hamstring strain']['recurrences'], 1)
+        self.assertEqual(types['hamstring strain']['meanPreInjuryLoad'], 5600)
+        self.assertEqual(types['hamstring strain']['meanBaselineLoad'], 2800)
+        self.assertEqual(types['ankle sprain']['medianLoadRatio'], 1.0)
+        self.assertEqual(data['preInjuryLoad']['spikeShare'], 0.5)
+
+    def test_results_are_cached_until_a_report_arrives(self):
+        self.client.get(self.path)
+        with self.assertNumQueries(1):
+            self.client.get(self.path)
+
+        self.report('shin splints', date(2025, 6, 20))
+        self.assertEqual(self.client.get(self.path).data['injuries'], 3)
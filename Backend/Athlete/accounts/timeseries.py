@@ -0,0 +1,221 @@
+"""
+Compact storage for high-frequency wearable samples.
+
+Samples are grouped into one IntradayChunk per user, metric and UTC day.
+Times are stored as delta-encoded seconds since midnight (uint16 deltas, or
+uint32 when a gap exceeds ~18 hours); values are scaled to integers and
+delta-encoded as int16 when every step fits, otherwise stored as float32.
+Reads decode whole chunks with NumPy and aggregate into min/max/mean buckets.
+"""
+from datetime import date as date_cls, datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db import transaction
+
+from .models import IntradayChunk
+
+SECONDS_PER_DAY = 86400
+# Keeps a JSON upload under DATA_UPLOAD_MAX_MEMORY_SIZE (2.5 MB by default)
+MAX_SAMPLES_PER_REQUEST = 50000
+
+# Fixed-point scale per metric for the int16 delta encoding
+VALUE_SCALES = {
+    'heart_rate': 1,
+    'hrv': 10,
+    'stress': 1,
+    'spo2': 10,
+}
+
+EPOCH = date_cls(1970, 1, 1)
+# Samples are filed under their UTC date, so timestamps must stay within date.max
+MAX_TIMESTAMP = ((date_cls.max - EPOCH).days + 1) * SECONDS_PER_DAY
+# Larger values would be stored as float32 infinity
+MAX_VALUE = float(np.finfo(np.float32).max)
+
+
+# -----------------------------
+# Encoding
+# -----------------------------
+def encode_times(seconds):
+    """Sorted seconds-of-day -> (encoding, bytes)."""
+    deltas = np.diff(seconds, prepend=0)
+    if deltas.max(initial=0) <= np.iinfo(np.uint16).max:
+        return 'du16', deltas.astype('<u2').tobytes()
+    return 'du32', deltas.astype('<u4').tobytes()
+
+
+def decode_times(encoding, data):
+    dtype = {'du16': '<u2', 'du32': '<u4'}[encoding]
+    return np.cumsum(np.frombuffer(bytes(data), dtype=dtype), dtype=np.int64)
+
+
+def encode_values(values, scale):
+    scaled = np.round(values * scale)
+    deltas = np.diff(scaled, prepend=0)
+    limits = np.iinfo(np.int16)
+    if len(deltas) and deltas.min() >= limits.min and deltas.max() <= limits.max:
+        return f'd16x{scale}', deltas.astype('<i2').tobytes()
+    return 'f32', values.astype('<f4').tobytes()
+
+
+def decode_values(encoding, data):
+    if encoding == 'f32':
+        return np.frombuffer(bytes(data), dtype='<f4').astype(np.float64)
+    scale = int(encoding.split('x', 1)[1])
+    return np.cumsum(np.frombuffer(bytes(data), dtype='<i2'), dtype=np.int64) / scale
+
+
+def _pack(chunk, seconds, values):
+    scale = VALUE_SCALES.get(chunk.metric_type, 1)
+    chunk.time_encoding, chunk.times = encode_times(seconds)
+    chunk.value_encoding, chunk.values = encode_values(values, scale)
+    if chunk.value_encoding != 'f32':
+        # Summaries match what a reader will decode
+        values = np.round(values * scale) / scale
+    chunk.sample_count = len(values)
+    chunk.min_value = float(values.min()) if len(values) else None
+    chunk.max_value = float(values.max()) if len(values) else None
+    chunk.sum_value = float(values.sum())
+
+
+def _merge(seconds, values, new_seconds, new_values):
+    """Sorted union of two sample sets; on equal timestamps the newer sample wins."""
+    seconds = np.concatenate([seconds, new_seconds])
+    values = np.concatenate([values, new_values])
+    # Stable sort keeps arrival order among equal times; keep the last of each run
+    order = np.argsort(seconds, kind='stable')
+    seconds, values = seconds[order], values[order]
+    keep = np.append(seconds[1:] != seconds[:-1], True)
+    return seconds[keep], values[keep]
+
+
+# -----------------------------
+# Write path
+# -----------------------------
+def parse_timestamps(raw):
+    """
+    Epoch seconds or ISO-8601 strings -> int64 epoch seconds. Raises
+    ValueError for times before 1970 or after the year 9999.
+    """
+    parsed = []
+    for value in raw:
+        if isinstance(value, bool):
+            raise TypeError("Timestamps must be numbers or ISO-8601 strings.")
+        if not isinstance(value, (int, float)):
+            moment = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=dt_timezone.utc)
+            value = moment.timestamp()
+        # Also rejects NaN, which fails every comparison
+        if not 0 <= value < MAX_TIMESTAMP:
+            raise ValueError("Timestamps must fall between 1970 and 9999.")
+        parsed.append(int(value))
+    return np.asarray(parsed, dtype=np.int64)
+
+
+def append_samples(user, metric_type, timestamps, values):
+    """
+    Merge samples into the user's day chunks; returns {date: sample_count}.
+
+    timestamps: int64 epoch seconds (UTC); values: float array of equal length.
+    """
+    days = timestamps // SECONDS_PER_DAY
+    seconds = timestamps - days * SECONDS_PER_DAY
+    dates = {int(day): EPOCH + timedelta(days=int(day)) for day in np.unique(days)}
+
+    written = {}
+    with transaction.atomic():
+        existing = {
+            chunk.date: chunk
+            for chunk in IntradayChunk.objects.select_for_update().filter(
+                user=user, metric_type=metric_type, date__in=dates.values()
+            )
+        }
+        new_chunks, changed = [], []
+        for day, date in dates.items():
+            mask = days == day
+            day_seconds, day_values = seconds[mask], values[mask]
+            chunk = existing.get(date)
+            if chunk is None:
+                chunk = IntradayChunk(user=user, metric_type=metric_type, date=date)
+                day_seconds, day_values = _merge(
+                    np.empty(0, np.int64), np.empty(0, np.float64), day_seconds, day_values
+                )
+                new_chunks.append(chunk)
+            else:
+                day_seconds, day_values = _merge(
+                    decode_times(chunk.time_encoding, chunk.times),
+                    decode_values(chunk.value_encoding, chunk.values),
+                    day_seconds, day_values,
+                )
+                changed.append(chunk)
+            _pack(chunk, day_seconds, day_values)
+            written[date] = chunk.sample_count
+
+        IntradayChunk.objects.bulk_create(new_chunks)
+        for chunk in changed:
+            chunk.save()
+    return written
+
+
+# -----------------------------
+# Read path
+# -----------------------------
+def buckets(user, metric_type, start, end, resolution):
+    """
+    min/max/mean/count per `resolution`-second bucket between the start and
+    end dates (inclusive), aligned to UTC midnight of `start`.
+    """
+    chunks = IntradayChunk.objects.filter(
+        user=user, metric_type=metric_type, date__range=(start, end)
+    ).order_by('date')
+    origin = (start - EPOCH).days * SECONDS_PER_DAY
+
+    # Whole-day buckets come straight from the per-chunk summaries
+    if resolution % SECONDS_PER_DAY == 0:
+        rows = chunks.filter(sample_count__gt=0).values_list(
+            'date', 'sample_count', 'min_value', 'max_value', 'sum_value'
+        )
+        grouped = {}
+        for date, count, low, high, total in rows:
+            bucket = ((date - EPOCH).days * SECONDS_PER_DAY - origin) // resolution
+            entry = grouped.setdefault(bucket, [0, low, high, 0.0])
+            entry[0] += count
+            entry[1] = min(entry[1], low)
+            entry[2] = max(entry[2], high)
+            entry[3] += total
+        return [
+            _bucket(origin + bucket * resolution, count, low, high, total / count)
+            for bucket, (count, low, high, total) in sorted(grouped.items())
+        ]
+
+    times, values = [], []
+    for chunk in chunks.only('date', 'time_encoding', 'value_encoding', 'times', 'values'):
+        day_origin = (chunk.date - EPOCH).days * SECONDS_PER_DAY
+        times.append(decode_times(chunk.time_encoding, chunk.times) + day_origin)
+        values.append(decode_values(chunk.value_encoding, chunk.values))
+    if not times:
+        return []
+
+    times, values = np.concatenate(times), np.concatenate(values)
+    bucket_ids = (times - origin) // resolution
+    # Chunks are ordered by date and sorted within, so bucket ids never decrease
+    starts = np.flatnonzero(np.diff(bucket_ids, prepend=bucket_ids[0] - 1))
+    counts = np.diff(np.append(starts, len(values)))
+    lows = np.minimum.reduceat(values, starts)
+    highs = np.maximum.reduceat(values, starts)
+    means = np.add.reduceat(values, starts) / counts
+    return [
+        _bucket(origin + int(bucket_ids[index]) * resolution, int(count), low, high, mean)
+        for index, count, low, high, mean in zip(starts, counts, lows, highs, means)
+    ]
+
+
+def _bucket(epoch_seconds, count, low, high, mean):
+    return {
+        'start': datetime.fromtimestamp(epoch_seconds, tz=dt_timezone.utc).isoformat(),
+        'count': count,
+        'min': round(float(low), 3),
+        'max': round(float(high), 3),
+        'mean': round(float(mean), 3),
+    }
@@ -6,4 +6,31 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('me/', views.current_user_view, name='current_user'),
     path('onboarding/', views.OnboardingView.as_view(), name='onboarding'),
+    path('dashboard/', views.athlete_dashboard_view, name='athlete_dashboard'),
+    path('risk/', views.injury_risk_view, name='injury_risk'),
+    path('forecast/', views.training_forecast_view, name='training_forecast'),
+    path('stress-map/', views.stress_map_view, name='stress_map'),
+    path('live/', views.live_events_view, name='live_events'),
+    path('sync/', views.sync_view, name='sync'),
+    path('intraday/<str:metric_type>/', views.intraday_samples_view, name='intraday_samples'),
+    path('export/<str:resource>.<str:export_format>', views.export_view, name='export'),
+    path('coach/roster/', views.coach_roster_view, name='coach_roster'),
+    path('team/provision/', views.team_provision_view, name='team_provision'),
+    path('athletes/<int:athlete_id>/similar/', views.similar_athletes_view, name='similar_athletes'),
+    path('admin/stats/', views.admin_stats_view, name='admin_stats'),
+
+    # Logs
+    path('workouts/', views.WorkoutLogListCreateView.as_view(), name='workout_list'),
+    path('workouts/<int:pk>/', views.WorkoutLogDetailView.as_view(), name='workout_detail'),
+    path('workouts/import/', views.workout_import_view, name='workout_import'),
+    path('health-metrics/', views.HealthMetricListCreateView.as_view(), name='health_metric_list'),
+    path('health-metrics/bulk/', views.health_metric_bulk_view, name='health_metric_bulk'),
+    path('health-metrics/<int:pk>/', views.HealthMetricDetailView.as_view(), name='health_metric_detail'),
+    path('nutrition/', views.NutritionLogListCreateView.as_view(), name='nutrition_list'),
+    path('nutrition/summary/', views.nutrition_summary_view, name='nutrition_summary'),
+    path('nutrition/foods/', views.nutrition_foods_view, name='nutrition_foods'),
+    path('nutrition/<int:pk>/', views.NutritionLogDetailView.as_view(), name='nutrition_detail'),
+    path('injuries/', views.InjuryReportListCreateView.as_view(), name='injury_list'),
+    path('injuries/analytics/', views.injury_analytics_view, name='injury_analytics'),
+    path('injuries/<int:pk>/', views.InjuryReportDetailView.as_view(), name='injury_detail'),
 ]
@@ -0,0 +1,102 @@
+"""
+Conditional GET for user-scoped resources.
+
+Every write to a user's onboarding or logs bumps that user's ResourceVersion
+counter for the resource. GETs build a weak ETag from the counter, the full
+path (page, cursor and date filters change the representation) and the
+negotiated format, so a matching If-None-Match costs one lookup on the
+small counter table and never touches the log tables.
+"""
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import HealthMetric, InjuryReport, NutritionLog, Onboarding, ResourceVersion, WorkoutLog
+
+MODEL_RESOURCES = {
+    Onboarding: 'onboarding',
+    WorkoutLog: 'workouts',
+    HealthMetric: 'health-metrics',
+    NutritionLog: 'nutrition',
+    InjuryReport: 'injuries',
+}
+
+
+def bump(user_id, resource):
+    ResourceVersion.increment(user_id, resource)
+
+
+def current(user_id, resource):
+    return ResourceVersion.objects.filter(user_id=user_id, resource=resource).values_list(
+        'version', flat=True
+    ).first() or 0
+
+
+async def acurrent(user_id, resource):
+    return await ResourceVersion.objects.filter(user_id=user_id, resource=resource).values_list(
+        'version', flat=True
+    ).afirst() or 0
+
+
+def make_etag(request, tag, renderer_format=None):
+    if renderer_format is None:
+        renderer = getattr(request, 'accepted_renderer', None)
+        renderer_format = renderer.format if renderer else ''
+    variant = f"{request.get_full_path()}|{renderer_format}"
+    digest = hashlib.blake2s(variant.encode(), digest_size=6).hexdigest()
+    return f'W/"{tag}-{digest}"'
+
+
+def matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return '*' in etags or etag.removeprefix('W/') in {tag.removeprefix('W/') for tag in etags}
+
+
+def conditional(request, tag, respond):
+    """
+    Answer 304 when If-None-Match carries the ETag for `tag`; otherwise
+    call respond() and stamp its 200 response with the ETag.
+    """
+    etag = make_etag(request, tag)
+    if matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+    else:
+        response = respond()
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+    # Representations are per user, so shared caches must key on the token
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def resource_tag(user_id, resource):
+    return f'{resource}-{user_id}-{current(user_id, resource)}'
+
+
+async def aresource_tag(user_id, resource):
+    return f'{resource}-{user_id}-{await acurrent(user_id, resource)}'
+
+
+def content_tag(prefix, values):
+    """Tag for payloads built from data already in memory (no counter lookup)."""
+    digest = hashlib.blake2s(repr(values).encode(), digest_size=8).hexdigest()
+    return f'{prefix}-{digest}'
+
+
+class ConditionalGetMixin:
+    """Adds ETag / If-None-Match handling to a generic view's GET for `version_resource`."""
+    version_resource = None
+
+    def get(self, request, *args, **kwargs):
+        return conditional(
+            request,
+            resource_tag(request.user.pk, self.version_resource),
+            lambda: super(ConditionalGetMixin, self).get(request, *args, **kwargs),
+        )
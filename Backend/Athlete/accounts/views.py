@@ -1,17 +1,37 @@
+import logging
+import time
+from datetime import timedelta
+
+import numpy as np
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import AuthenticationFailed, PermissionDenied, ValidationError
+from asgiref.sync import sync_to_async
 from django.contrib.auth import authenticate
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db import connection, transaction
+from django.utils import timezone
 
 # Import your models
 from .models import (
     Onboarding, CustomUser,
     WorkoutLog, HealthMetric,
-    NutritionLog, InjuryReport
+    NutritionLog, InjuryReport,
+    AthleteRiskScore, IntradayChunk, TrainingForecast
+)
+from . import (
+    batch, cohorts, export, forecasts, imports, injuries, live, nutrition, provisioning, risk, rollups, roster,
+    stats, stressmap, sync, timeseries, versions,
 )
+from .authentication import CachedJWTAuthentication
+from .filters import date_bounds, filter_date_range
+from .pagination import KeysetPagination
+from .versions import ConditionalGetMixin
 
 # Import your serializers
 from .serializers import (
@@ -20,12 +40,15 @@ from .serializers import (
     NutritionLogSerializer, InjuryReportSerializer
 )
 
+logger = logging.getLogger(__name__)
+
 # -----------------------------
 # Onboarding View
 # -----------------------------
-class OnboardingView(generics.RetrieveUpdateAPIView):
+class OnboardingView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     serializer_class = OnboardingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_resource = 'onboarding'
 
     def get_object(self):
         return Onboarding.objects.get(user=self.request.user)
@@ -90,7 +113,7 @@ def login_view(request):
             }
         }, status=status.HTTP_200_OK)
 
-    print("Login serializer errors:", serializer.errors)
+    logger.info("Login failed: %s", serializer.errors)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -101,32 +124,43 @@ def login_view(request):
 @permission_classes([permissions.IsAuthenticated])
 def current_user_view(request):
     user = request.user
-    return Response({
+    payload = {
         'id': user.id,
         'email': user.email,
         'name': user.full_name,
         'role': user.role,
         'is_superuser': user.is_superuser
-    }, status=status.HTTP_200_OK)
+    }
+    # Built from the already-authenticated user, so the ETag needs no counter lookup
+    return versions.conditional(
+        request,
+        versions.content_tag(f'me-{user.id}', tuple(payload.values())),
+        lambda: Response(payload, status=status.HTTP_200_OK),
+    )
 
 
 # -----------------------------
 # Workout Log Views
 # -----------------------------
-class WorkoutLogListCreateView(generics.ListCreateAPIView):
+class WorkoutLogListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = WorkoutLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_resource = 'workouts'
+    pagination_class = KeysetPagination
+    archive_resource = 'workouts'
+    date_field = 'date'
 
     def get_queryset(self):
-        return WorkoutLog.objects.filter(user=self.request.user)
+        return filter_date_range(WorkoutLog.objects.filter(user=self.request.user), self.request, self.date_field)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class WorkoutLogDetailView(generics.RetrieveUpdateDestroyAPIView):
+class WorkoutLogDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = WorkoutLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_resource = 'workouts'
 
     def get_queryset(self):
         return WorkoutLog.objects.filter(user=self.request.user)
@@ -135,64 +169,716 @@ class WorkoutLogDetailView(generics.RetrieveUpdateDestroyAPIView):
 # -----------------------------
 # Health Metric Views
 # -----------------------------
-class HealthMetricListCreateView(generics.ListCreateAPIView):
+class HealthMetricListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = HealthMetricSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_resource = 'health-metrics'
+    pagination_class = KeysetPagination
+    archive_resource = 'health-metrics'
+    date_field = 'date_recorded'
 
     def get_queryset(self):
-        return HealthMetric.objects.filter(user=self.request.user)
+        return filter_date_range(HealthMetric.objects.filter(user=self.request.user), self.request, self.date_field)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class HealthMetricDetailView(generics.RetrieveUpdateDestroyAPIView):
+class HealthMetricDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = HealthMetricSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_resource = 'health-metrics'
 
     def get_queryset(self):
         return HealthMetric.objects.filter(user=self.request.user)
 
 
+# -----------------------------
+# Health Metric Bulk Ingest View
+# -----------------------------
+HEALTH_METRIC_BULK_MAX_ROWS = 10000
+HEALTH_METRIC_BULK_BATCH_SIZE = 1000
+
+
+def _reject_client_id_clashes(user, rows, results):
+    """
+    Drop the rows whose client_id another row of the upload, or another
+    stored reading, already uses; the (user, client_id) constraint would
+    otherwise fail the whole batch.
+    """
+    claimed = {}
+    for key, (index, data) in list(rows.items()):
+        client_id = data.get('client_id')
+        if client_id is None:
+            continue
+        if client_id in claimed:
+            results[index].update(status='invalid', errors={'client_id': ["This client_id appears more than once."]})
+            del rows[key]
+        else:
+            claimed[client_id] = key
+    if not claimed:
+        return
+
+    stored = HealthMetric.objects.filter(user=user, client_id__in=claimed).values_list(
+        'client_id', 'metric_type', 'date_recorded'
+    )
+    for client_id, metric_type, date_recorded in stored:
+        key = claimed[client_id]
+        # A re-sync of the same reading keeps its client_id
+        if key != (metric_type, date_recorded):
+            index = rows.pop(key)[0]
+            results[index].update(
+                status='invalid', errors={'client_id': ["Another reading already uses this client_id."]}
+            )
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def health_metric_bulk_view(request):
+    """
+    Upsert a batch of wearable readings in one transaction.
+
+    Accepts either a JSON list of readings or ``{"readings": [...]}``.
+    Rows that collide on (user, metric_type, date_recorded) update the
+    stored value instead of failing, so a device can safely re-sync.
+    """
+    started = time.perf_counter()
+    readings = request.data.get('readings') if isinstance(request.data, dict) else request.data
+
+    if not isinstance(readings, list):
+        return Response({"readings": ["Expected a list of readings."]}, status=status.HTTP_400_BAD_REQUEST)
+    if len(readings) > HEALTH_METRIC_BULK_MAX_ROWS:
+        return Response(
+            {"readings": [f"At most {HEALTH_METRIC_BULK_MAX_ROWS} readings per request."]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = [{'index': index, 'status': 'created'} for index in range(len(readings))]
+
+    # Validate every row in one pass; only re-run the valid subset if some rows failed
+    serializer = HealthMetricSerializer(data=readings, many=True)
+    if serializer.is_valid():
+        valid_indexes = list(range(len(readings)))
+        validated = serializer.validated_data
+    else:
+        errors = serializer.errors
+        if isinstance(errors, list):
+            errors = dict(enumerate(errors))
+        valid_indexes = []
+        for index in range(len(readings)):
+            if errors.get(index):
+                results[index].update(status='invalid', errors=errors[index])
+            else:
+                valid_indexes.append(index)
+        subset = HealthMetricSerializer(data=[readings[index] for index in valid_indexes], many=True)
+        subset.is_valid(raise_exception=True)
+        validated = subset.validated_data
+
+    # Last reading wins when the same key appears twice in one payload
+    rows = {}
+    for index, data in zip(valid_indexes, validated):
+        key = (data['metric_type'], data['date_recorded'])
+        if key in rows:
+            results[rows[key][0]]['status'] = 'superseded'
+        rows[key] = (index, data)
+
+    with transaction.atomic():
+        _reject_client_id_clashes(request.user, rows, results)
+        if rows:
+            existing = set(
+                HealthMetric.objects.filter(
+                    user=request.user,
+                    metric_type__in={metric_type for metric_type, _ in rows},
+                    date_recorded__in={date for _, date in rows},
+                ).values_list('metric_type', 'date_recorded')
+            )
+            for key, (index, _) in rows.items():
+                if key in existing:
+                    results[index]['status'] = 'updated'
+
+            # bulk_create skips SyncedLog.save, so the whole upload shares one sync number
+            sync_seq = sync.next_seq(request.user.id)
+            HealthMetric.objects.bulk_create(
+                [HealthMetric(user=request.user, sync_seq=sync_seq, **data) for _, data in rows.values()],
+                batch_size=HEALTH_METRIC_BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['user', 'metric_type', 'date_recorded'],
+                update_fields=['value', 'unit', 'source', 'sync_seq', 'updated_at'],
+            )
+            # bulk_create skips signals, so refresh the rollups in one pass
+            rollups.refresh_days(request.user.id, {date for _, date in rows})
+            versions.bump(request.user.id, 'health-metrics')
+            risk.score_users([request.user.id])
+            if any(metric_type == 'stress' for metric_type, _ in rows):
+                stressmap.invalidate(request.user.id)
+            live.publish_change(request.user.id, {
+                'type': 'metrics', 'athlete': request.user.id, 'action': 'bulk', 'count': len(rows),
+            })
+
+    elapsed = time.perf_counter() - started
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    return Response({
+        'received': len(readings),
+        'written': len(rows),
+        'counts': counts,
+        'elapsed_seconds': round(elapsed, 4),
+        'rows_per_second': round(len(readings) / elapsed, 1) if elapsed else None,
+        'results': results,
+    }, status=status.HTTP_200_OK if not counts.get('invalid') else status.HTTP_207_MULTI_STATUS)
+
+
 # -----------------------------
 # Nutrition Log Views
 # -----------------------------
-class NutritionLogListCreateView(generics.ListCreateAPIView):
+class NutritionLogListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = NutritionLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_resource = 'nutrition'
+    pagination_class = KeysetPagination
+    archive_resource = 'nutrition'
+    date_field = 'date'
 
     def get_queryset(self):
-        return NutritionLog.objects.filter(user=self.request.user)
+        return filter_date_range(NutritionLog.objects.filter(user=self.request.user), self.request, self.date_field)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class NutritionLogDetailView(generics.RetrieveUpdateDestroyAPIView):
+class NutritionLogDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = NutritionLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_resource = 'nutrition'
 
     def get_queryset(self):
         return NutritionLog.objects.filter(user=self.request.user)
 
 
+# -----------------------------
+# Nutrition Summary Views
+# -----------------------------
+def _requested_users(request):
+    """
+    Users whose rows the requester asked for: their own by default,
+    ?athlete=<id> for one roster athlete, or ?scope=team for the whole roster
+    (every athlete for admins).
+    """
+    user = request.user
+    if user.role == 'admin' or user.is_superuser:
+        visible = CustomUser.objects.filter(role='athlete')
+    elif user.role == 'coach':
+        visible = user.athletes.filter(role='athlete')
+    else:
+        visible = None
+
+    if request.query_params.get('scope') == 'team':
+        if visible is None:
+            raise PermissionDenied("Only coaches can view team data.")
+        return visible
+
+    athlete_id = request.query_params.get('athlete')
+    if athlete_id is None or athlete_id == str(user.pk):
+        return CustomUser.objects.filter(pk=user.pk)
+    if not athlete_id.isdigit():
+        raise ValidationError({"athlete": ["Expected a user id."]})
+    if visible is None or not visible.filter(pk=athlete_id).exists():
+        raise PermissionDenied("You cannot view this athlete's data.")
+    return visible.filter(pk=athlete_id)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def nutrition_summary_view(request):
+    """
+    Intake totals per day or ISO week, summed in the database, e.g.
+    /nutrition/summary/?period=week&start=2024-01-01. Defaults to the last
+    7 days (period=day) or 12 weeks (period=week).
+    """
+    period = request.query_params.get('period', 'day')
+    if period not in nutrition.PERIODS:
+        raise ValidationError({"period": ["Expected 'day' or 'week'."]})
+    users = _requested_users(request)
+    start, end = date_bounds(request)
+    end = end or timezone.localdate()
+    start = start or end - timedelta(days=6 if period == 'day' else 7 * 12 - 1)
+
+    return Response({
+        'period': period,
+        'start': start,
+        'end': end,
+        'results': nutrition.intake_by_period(users, start, end, period),
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def nutrition_foods_view(request):
+    """
+    Most eaten foods from the food-item index, e.g.
+    /nutrition/foods/?scope=team&order=calories, or ?name=oatmeal for one food.
+    """
+    order = request.query_params.get('order', 'count')
+    if order not in nutrition.FOOD_ORDERINGS:
+        raise ValidationError({"order": ["Expected 'count' or 'calories'."]})
+    limit = request.query_params.get('limit', str(nutrition.TOP_FOODS_LIMIT))
+    if not limit.isdigit() or not 1 <= int(limit) <= nutrition.TOP_FOODS_MAX_LIMIT:
+        raise ValidationError({"limit": [f"Expected a number from 1 to {nutrition.TOP_FOODS_MAX_LIMIT}."]})
+    users = _requested_users(request)
+    start, end = date_bounds(request)
+
+    return Response(
+        nutrition.top_foods(users, start, end, order, int(limit), request.query_params.get('name')),
+        status=status.HTTP_200_OK,
+    )
+
+
 # -----------------------------
 # Injury Report Views
 # -----------------------------
-class InjuryReportListCreateView(generics.ListCreateAPIView):
+class InjuryReportListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = InjuryReportSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_resource = 'injuries'
+    pagination_class = KeysetPagination
+    date_field = 'date_occurred'
 
     def get_queryset(self):
-        return InjuryReport.objects.filter(user=self.request.user)
+        return filter_date_range(InjuryReport.objects.filter(user=self.request.user), self.request, self.date_field)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
-class InjuryReportDetailView(generics.RetrieveUpdateDestroyAPIView):
+class InjuryReportDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = InjuryReportSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_resource = 'injuries'
 
     def get_queryset(self):
         return InjuryReport.objects.filter(user=self.request.user)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def injury_analytics_view(request):
+    """
+    Load in the 28 days before each injury against the athlete's baseline,
+    recurrence rates per injury type and incidence per 1,000 training hours,
+    e.g. /injuries/analytics/?scope=team&start=2024-01-01. Defaults to the
+    requester's own injuries over the last year.
+    """
+    users = _requested_users(request)
+    start, end = date_bounds(request)
+    return Response(injuries.analytics(users, start, end), status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# Athlete Dashboard View
+# -----------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def athlete_dashboard_view(request):
+    """
+    Readiness, recovery, risk and the 7-day load series from DailyRollup,
+    plus the stored next-week forecast.
+    """
+    today = timezone.localdate()
+    rows = list(rollups.dashboard_rows(request.user, today))
+    forecast = TrainingForecast.objects.filter(user=request.user).first()
+    return Response(
+        {**rollups.dashboard(rows, today), 'forecast': forecasts.payload(forecast)},
+        status=status.HTTP_200_OK,
+    )
+
+
+# -----------------------------
+# Coach Roster View
+# -----------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def coach_roster_view(request):
+    """Injury risk, readiness and last workout for every athlete on the roster."""
+    return Response(roster.roster_rows(roster.athletes_for(request.user)), status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# Team Provisioning View
+# -----------------------------
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def team_provision_view(request):
+    """
+    Create many athlete accounts at once: {"athletes": [{"email": ...,
+    "full_name": ..., "password": ..., "onboarding": {...}}, ...]}. Password
+    and onboarding are optional. A coach's athletes join their roster; an
+    admin may pass "coach": <id>. All rows are created, or none are and
+    every invalid row is reported.
+    """
+    user = request.user
+    payload = request.data if isinstance(request.data, dict) else {}
+    if user.role == 'coach':
+        coach = user
+    elif user.role == 'admin' or user.is_superuser:
+        coach = None
+        coach_id = payload.get('coach')
+        if coach_id is not None:
+            coach = CustomUser.objects.filter(pk=coach_id, role='coach').first() if str(coach_id).isdigit() else None
+            if coach is None:
+                raise ValidationError({"coach": ["Expected the id of a coach."]})
+    else:
+        raise PermissionDenied("Only coaches and admins can provision athletes.")
+
+    rows = payload.get('athletes')
+    if not isinstance(rows, list) or not rows:
+        raise ValidationError({"athletes": ["Expected a non-empty list of athletes."]})
+    if len(rows) > provisioning.MAX_ROWS:
+        raise ValidationError({"athletes": [f"At most {provisioning.MAX_ROWS} athletes per request."]})
+
+    try:
+        users = provisioning.provision(rows, coach=coach)
+    except provisioning.ProvisioningFailed as exc:
+        return Response({'created': 0, 'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'created': len(users),
+        'athletes': [{'id': athlete.pk, 'email': athlete.email, 'name': athlete.full_name} for athlete in users],
+    }, status=status.HTTP_201_CREATED)
+
+
+# -----------------------------
+# Similar Athletes View
+# -----------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def similar_athletes_view(request, athlete_id):
+    """
+    The ?k= (default 10) athletes whose onboarding profiles are closest to
+    this athlete's, searched within the coach's roster (everyone for admins).
+    """
+    user = request.user
+    if user.role == 'coach':
+        candidates = set(user.athletes.filter(role='athlete', is_active=True).values_list('pk', flat=True))
+        if athlete_id not in candidates:
+            raise PermissionDenied("You can only compare athletes on your roster.")
+    elif user.role == 'admin' or user.is_superuser:
+        candidates = None
+    else:
+        raise PermissionDenied("Only coaches can search for similar athletes.")
+
+    k = request.query_params.get('k', str(cohorts.DEFAULT_NEIGHBOURS))
+    if not k.isdigit() or not 1 <= int(k) <= cohorts.MAX_NEIGHBOURS:
+        raise ValidationError({"k": [f"Expected a number from 1 to {cohorts.MAX_NEIGHBOURS}."]})
+
+    neighbours = cohorts.index.similar(athlete_id, int(k), candidates)
+    if neighbours is None:
+        return Response({"detail": "This athlete has no onboarding profile."}, status=status.HTTP_404_NOT_FOUND)
+
+    users = {
+        row['pk']: row for row in CustomUser.objects.filter(
+            pk__in=[athlete_id, *(neighbour for neighbour, _ in neighbours)]
+        ).values('pk', 'full_name', 'cohort__cohort')
+    }
+    return Response({
+        'athlete': athlete_id,
+        'cohort': users[athlete_id]['cohort__cohort'] if athlete_id in users else None,
+        'results': [
+            {
+                'athlete': neighbour,
+                'name': users[neighbour]['full_name'],
+                'cohort': users[neighbour]['cohort__cohort'],
+                'similarity': similarity,
+            }
+            for neighbour, similarity in neighbours if neighbour in users
+        ],
+    }, status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# Admin Stats View
+# -----------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def admin_stats_view(request):
+    """Admin dashboard figures, read from the PlatformStats snapshot row."""
+    user = request.user
+    if not (user.role == 'admin' or user.is_staff or user.is_superuser):
+        raise PermissionDenied("Only admins can view platform statistics.")
+
+    return Response(stats.as_dashboard(stats.get_stats()), status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# Injury Risk View
+# -----------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def injury_risk_view(request):
+    """The athlete's current workload risk breakdown."""
+    score = AthleteRiskScore.objects.filter(user=request.user).first()
+    if score is None:
+        return Response({'injuryRisk': None}, status=status.HTTP_200_OK)
+
+    return Response({
+        'asOf': score.as_of,
+        'injuryRisk': score.injury_risk,
+        'acuteLoad': score.acute_load,
+        'chronicLoad': score.chronic_load,
+        'acwr': score.acwr,
+        'monotony': score.monotony,
+        'strain': score.strain,
+    }, status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# Training Forecast View
+# -----------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def training_forecast_view(request):
+    """
+    Stored next-week load and readiness forecasts: the requester's own,
+    ?athlete=<id> for one roster athlete or ?scope=team for the roster.
+    """
+    users = _requested_users(request)
+    stored = TrainingForecast.objects.filter(user__in=users).order_by('user_id')
+    return Response([
+        {'athlete': forecast.user_id, **forecasts.payload(forecast)} for forecast in stored
+    ], status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# Body Stress Map View
+# -----------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def stress_map_view(request):
+    """Per-region level, fatigue, joint load and stress for the StressMap page."""
+    return Response(stressmap.get_stress_map(request.user.id), status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# Live Events View (ASGI only)
+# -----------------------------
+def _stream_topics(raw_token):
+    """The athlete ids a token holder may follow: themselves, plus their roster for coaches."""
+    authenticator = CachedJWTAuthentication()
+    user = authenticator.get_user(authenticator.get_validated_token(raw_token))
+    topics = {user.id}
+    if user.role == 'coach':
+        topics.update(user.athletes.filter(is_active=True).values_list('id', flat=True))
+    # The stream outlives the request cycle that would normally close this
+    connection.close()
+    return topics
+
+
+async def live_events_view(request):
+    """
+    Server-Sent Events stream of metric, workout and score changes.
+
+    EventSource cannot set headers, so the access token may also be passed
+    as ``?token=``. Needs an ASGI server; under WSGI the stream would pin a
+    worker thread for its whole lifetime.
+    """
+    if request.method != 'GET':
+        return JsonResponse({"detail": "Method not allowed."}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    header = request.headers.get('Authorization', '')
+    raw_token = header.split(' ', 1)[1] if header.startswith('Bearer ') else request.GET.get('token')
+    if not raw_token:
+        return JsonResponse({"detail": "Authentication credentials were not provided."},
+                            status=status.HTTP_401_UNAUTHORIZED)
+    try:
+        topics = await sync_to_async(_stream_topics)(raw_token)
+    except (InvalidToken, TokenError, AuthenticationFailed) as exc:
+        return JsonResponse({"detail": str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
+
+    subscription = live.broker.subscribe(topics)
+    response = StreamingHttpResponse(live.event_stream(subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# -----------------------------
+# Intraday Samples View
+# -----------------------------
+INTRADAY_MAX_DAYS = 31
+INTRADAY_MAX_RESOLUTION = INTRADAY_MAX_DAYS * timeseries.SECONDS_PER_DAY
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def intraday_samples_view(request, metric_type):
+    """
+    POST appends ``{"samples": [[timestamp, value], ...]}`` (epoch seconds or
+    ISO-8601, UTC days). GET returns min/max/mean buckets for
+    ``?start=&end=`` (at most INTRADAY_MAX_DAYS days) at ``?resolution=``
+    seconds (default 300).
+    """
+    if metric_type not in dict(IntradayChunk.METRIC_TYPES):
+        return Response({"metric_type": [f'"{metric_type}" is not a valid choice.']},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    if request.method == 'POST':
+        samples = request.data.get('samples') if isinstance(request.data, dict) else None
+        if not isinstance(samples, list) or not samples:
+            return Response({"samples": ["Expected a non-empty list of [timestamp, value] pairs."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(samples) > timeseries.MAX_SAMPLES_PER_REQUEST:
+            return Response({"samples": [f"At most {timeseries.MAX_SAMPLES_PER_REQUEST} samples per request."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            raw_times, raw_values = zip(*samples)
+            if any(isinstance(value, bool) for value in raw_values):
+                raise TypeError("Sample values must be numbers.")
+            timestamps = timeseries.parse_timestamps(raw_times)
+            values = np.asarray(raw_values, dtype=np.float64)
+        except (TypeError, ValueError):
+            return Response({"samples": ["Each sample must be a [timestamp, number] pair, timestamped "
+                                         "between 1970 and 9999."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Also false for NaN and infinities
+        if not (np.abs(values) <= timeseries.MAX_VALUE).all():
+            return Response({"samples": ["Values must be finite and within float32 range."]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        written = timeseries.append_samples(request.user, metric_type, timestamps, values)
+        return Response({
+            'received': len(samples),
+            'days': [{'date': date, 'sample_count': count} for date, count in sorted(written.items())],
+        }, status=status.HTTP_201_CREATED)
+
+    start, end = date_bounds(request)
+    start = start or timezone.localdate()
+    end = end or start
+    try:
+        resolution = int(request.query_params.get('resolution', 300))
+    except ValueError:
+        resolution = 0
+    if not 1 <= resolution <= INTRADAY_MAX_RESOLUTION or end < start:
+        return Response({"detail": "Expected start <= end and 1 <= resolution <= "
+                                   f"{INTRADAY_MAX_RESOLUTION} seconds."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if (end - start).days >= INTRADAY_MAX_DAYS:
+        return Response({"end": [f"At most {INTRADAY_MAX_DAYS} days per request."]},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'metric_type': metric_type,
+        'resolution': resolution,
+        'buckets': timeseries.buckets(request.user, metric_type, start, end, resolution),
+    }, status=status.HTTP_200_OK)
+
+
+# -----------------------------
+# Export View
+# -----------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_view(request, resource, export_format):
+    """
+    Stream a full log history as CSV or NDJSON, e.g.
+    /export/workouts.csv?scope=team&start=2024-01-01&gzip=1
+    """
+    if resource not in export.RESOURCES:
+        return Response({"detail": f"Unknown export '{resource}'."}, status=status.HTTP_404_NOT_FOUND)
+    if export_format not in export.FORMATS:
+        return Response({"detail": "Export format must be csv or ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+
+    users = _requested_users(request)
+    start, end = date_bounds(request)
+    compress = request.query_params.get('gzip') in ('1', 'true')
+
+    chunks = export.stream(resource, export_format, users, start, end, compress=compress)
+    if isinstance(request._request, ASGIRequest):
+        chunks = export.async_stream(chunks)
+    response = StreamingHttpResponse(
+        chunks,
+        content_type='application/gzip' if compress else export.FORMATS[export_format],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export.filename(resource, export_format, compress)}"'
+    )
+    return response
+
+
+# -----------------------------
+# Workout Import View
+# -----------------------------
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def workout_import_view(request):
+    """
+    Import GPX, TCX and CSV activity files sent as multipart `files`. Large
+    archives should be sent as one .zip (Django caps a request at 100 files).
+    Progress is pushed to the athlete's live event stream as 'import' events.
+    """
+    sources = imports.upload_sources(request.FILES.getlist('files'))
+    if not sources:
+        return Response({"files": ["Upload at least one .gpx, .tcx, .csv or .zip file."]},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    def progress(summary):
+        live.broker.publish(request.user.id, {
+            'type': 'import', 'athlete': request.user.id,
+            **{key: value for key, value in summary.items() if key != 'errors'},
+        })
+
+    summary = imports.import_workouts(request.user, sources, progress=progress)
+    return Response(summary, status=status.HTTP_201_CREATED if summary['created'] else status.HTTP_200_OK)
+
+
+# -----------------------------
+# Batch View
+# -----------------------------
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def batch_view(request):
+    """
+    Run several log writes in one request and one transaction:
+    {"atomic": true, "operations": [{"method": "create", "resource": "workouts", "data": {...}},
+    {"method": "update", "resource": "health-metrics", "id": 7, "data": {...}}, ...]}.
+    With atomic=false each operation succeeds or fails on its own.
+    """
+    operations, atomic = batch.parse(request.data)
+    committed, results = batch.execute(request.user, operations, atomic, {'request': request})
+    return Response(
+        {'atomic': atomic, 'committed': committed, 'results': results},
+        status=status.HTTP_200_OK if committed else status.HTTP_400_BAD_REQUEST,
+    )
+
+
+# -----------------------------
+# Sync View
+# -----------------------------
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def sync_view(request):
+    """
+    GET ?since=<cursor>&limit=: log rows changed and deleted since the cursor
+    (omit it for a full download), with the cursor to send next time; repeat
+    while "more" is true.
+    POST: upload offline changes as batch operations (best effort unless
+    "atomic": true), with "sync_seq" on updates and deletes for conflict
+    detection and "client_id" on creates so retries are not duplicated.
+    """
+    if request.method == 'POST':
+        payload = request.data
+        if isinstance(payload, dict):
+            payload = {'atomic': False, **payload}
+        operations, atomic = batch.parse(payload)
+        committed, results = batch.execute(request.user, operations, atomic, {'request': request})
+        return Response(
+            {'atomic': atomic, 'committed': committed, 'results': results},
+            status=status.HTTP_200_OK if committed else status.HTTP_400_BAD_REQUEST,
+        )
+
+    limit = request.query_params.get('limit', str(sync.DEFAULT_LIMIT))
+    if not limit.isdigit() or not 1 <= int(limit) <= sync.MAX_LIMIT:
+        raise ValidationError({"limit": [f"Expected a number from 1 to {sync.MAX_LIMIT}."]})
+    return Response(
+        sync.changes_since(request.user, request.query_params.get('since'), int(limit), {'request': request}),
+        status=status.HTTP_200_OK,
+    )